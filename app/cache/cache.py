@@ -1,57 +1,197 @@
 import os
 import json
 import time
-from typing import Any, Optional
+import tempfile
+import threading
+from typing import Any, Callable, Dict, IO, Optional, Tuple
+from app.cache.store import CacheEntry, CacheStore
 
-CACHE_DIR = "/tmp/pigskin-pickem-cache"
-INJURIES_CACHE_FILE = os.path.join(CACHE_DIR, "nfl_injuries.json")
-RATINGS_CACHE_FILE = os.path.join(CACHE_DIR, "madden_ratings.json")
-INJURIES_CACHE_TTL = 60 * 60 * 24  # 24 hours
+CACHE_DIR = os.environ.get("PIGSKIN_CACHE_DIR", "/tmp/pigskin-pickem-cache")
+CACHE_DB_FILE = os.path.join(CACHE_DIR, "cache.sqlite3")
+
+# Cache store namespaces, one per data source
+INJURIES_NAMESPACE = "nfl_injuries"
+INJURY_CHANGES_NAMESPACE = "injury_changes"  # versioned log of player-level injury changes
+RATINGS_NAMESPACE = "madden_ratings"
+MADDEN_PAGES_NAMESPACE = "madden_pages"  # per-page Madden parses and crawl progress
+OL_RANKINGS_NAMESPACE = "ol_rankings"
+HTTP_VALIDATORS_NAMESPACE = "http_validators"
+
+# 24 hours; set PIGSKIN_INJURIES_TTL (seconds) lower to poll more often, e.g. during game week
+INJURIES_CACHE_TTL = int(os.environ.get("PIGSKIN_INJURIES_TTL", 60 * 60 * 24))
 RATINGS_CACHE_TTL = 60 * 60 * 48  # 48 hours
+# Past these ages stale data is no longer served while a refresh runs
+INJURIES_CACHE_MAX_STALENESS = 60 * 60 * 24 * 3  # 3 days
+RATINGS_CACHE_MAX_STALENESS = 60 * 60 * 24 * 7  # 7 days
 
 os.makedirs(CACHE_DIR, exist_ok=True)
 
-def get_cache_data(cache_file: str, ttl: int) -> Optional[Any]:
-    """Generic cache getter with TTL check."""
-    if not os.path.exists(cache_file):
+_store: Optional[CacheStore] = None
+_store_lock = threading.Lock()
+
+def get_store() -> CacheStore:
+    """The process-wide cache store, opened on first use."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = CacheStore(CACHE_DB_FILE)
+        return _store
+
+# In-process memory tier: decoded file payloads keyed by (path, loader) and
+# revalidated against the file's stat signature, so an unchanged cache file is
+# never re-read or re-parsed. Payloads are shared between callers and must be
+# treated as read-only.
+_memory_cache: Dict[Tuple[str, Callable], Tuple[Tuple[int, int, int], Any]] = {}
+_memory_cache_lock = threading.Lock()
+
+def _file_signature(st: os.stat_result) -> Tuple[int, int, int]:
+    """Signature that changes whenever a file is rewritten or replaced."""
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+def file_fingerprint(path: str) -> Optional[Tuple[int, int, int]]:
+    """Stat signature of path, or None if it does not exist."""
+    try:
+        return _file_signature(os.stat(path))
+    except FileNotFoundError:
+        return None
+
+def read_file_cached(path: str, loader: Callable[[IO], Any] = json.load) -> Optional[Tuple[Any, float]]:
+    """
+    Read and decode a file through the memory tier.
+
+    Args:
+        path: File to read
+        loader: Function decoding an open text file (defaults to json.load)
+
+    Returns:
+        Tuple of (decoded payload, file mtime) or None if the file does not exist.
+        Decode errors from the loader are propagated to the caller.
+    """
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
         return None
+    signature = _file_signature(st)
+    key = (path, loader)
+    with _memory_cache_lock:
+        cached = _memory_cache.get(key)
+    if cached is not None and cached[0] == signature:
+        return cached[1], st.st_mtime
+
+    with open(path, "r") as f:
+        data = loader(f)
+    with _memory_cache_lock:
+        _memory_cache[key] = (signature, data)
+    return data, st.st_mtime
+
+def remember_file_data(path: str, data: Any, loader: Callable[[IO], Any] = json.load) -> None:
+    """Prime the memory tier with a payload that was just written to path."""
     try:
-        with open(cache_file, "r") as f:
-            data = json.load(f)
-        if time.time() - data.get("timestamp", 0) > ttl:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return
+    with _memory_cache_lock:
+        _memory_cache[(path, loader)] = (_file_signature(st), data)
+
+def atomic_write_json(path: str, payload: Any) -> None:
+    """
+    Write payload as JSON to path via a temporary file and an atomic rename.
+
+    Readers in this or another process see either the previous file or the
+    complete new one, never a partial write.
+    """
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(payload, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+def clear_memory_cache() -> None:
+    """Drop every payload held by the memory tier."""
+    with _memory_cache_lock:
+        _memory_cache.clear()
+
+def get_cache_entry(cache_file: str) -> Optional[CacheEntry]:
+    """Generic cache getter returning the entry regardless of its age."""
+    try:
+        cached = read_file_cached(cache_file)
+        if cached is None:
             return None
-        return data.get("data")
+        data = cached[0]
+        return CacheEntry(data.get("data"), data.get("timestamp", 0))
     except (json.JSONDecodeError, IOError) as e:
         print(f"Error reading cache file {cache_file}: {e}")
         return None
 
+def get_cache_data(cache_file: str, ttl: int) -> Optional[Any]:
+    """Generic cache getter with TTL check."""
+    entry = get_cache_entry(cache_file)
+    if entry is None or entry.age > ttl:
+        return None
+    return entry.data
+
 def set_cache_data(data: Any, cache_file: str):
     """Generic cache setter."""
     try:
-        # Ensure directory exists
-        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
-        with open(cache_file, "w") as f:
-            json.dump({"timestamp": time.time(), "data": data}, f)
-    except IOError as e:
+        payload = {"timestamp": time.time(), "data": data}
+        atomic_write_json(cache_file, payload)
+        remember_file_data(cache_file, payload)
+    except (IOError, TypeError, ValueError) as e:
         print(f"Error writing cache file {cache_file}: {e}")
 
-# NFL Injuries cache functions
-def get_injuries_cache() -> Optional[Any]:
-    """Get cached NFL injuries data."""
-    return get_cache_data(INJURIES_CACHE_FILE, INJURIES_CACHE_TTL)
+# NFL Injuries cache functions (one record per team)
+def get_injuries_cache(max_age: Optional[float] = None) -> Optional[Any]:
+    """Get cached NFL injuries data younger than max_age (defaults to the TTL)."""
+    ttl = INJURIES_CACHE_TTL if max_age is None else max_age
+    return get_store().get_fresh(INJURIES_NAMESPACE, ttl=ttl)
+
+def get_injuries_cache_entry() -> Optional[CacheEntry]:
+    """Get the cached NFL injuries entry, even if expired."""
+    return get_store().get_entry(INJURIES_NAMESPACE)
 
 def set_injuries_cache(injuries: Any):
     """Set cached NFL injuries data."""
-    set_cache_data(injuries, INJURIES_CACHE_FILE)
+    get_store().set_records(INJURIES_NAMESPACE, injuries, ttl=INJURIES_CACHE_TTL, position_field=None)
+
+def touch_injuries_cache() -> bool:
+    """Extend the freshness of cached NFL injuries data."""
+    return get_store().touch(INJURIES_NAMESPACE)
 
-# Madden Ratings cache functions  
+def get_injury_team_hashes() -> Dict[str, Optional[str]]:
+    """Content hash of each team's cached injuries, by normalized team name."""
+    return get_store().get_record_hashes(INJURIES_NAMESPACE)
+
+def get_injury_change_log() -> Optional[Dict]:
+    """The versioned injury change log, or None if nothing has been logged."""
+    entry = get_store().get_entry(INJURY_CHANGES_NAMESPACE)
+    return entry.data if entry is not None else None
+
+def set_injury_change_log(log: Dict):
+    """Store the versioned injury change log."""
+    get_store().set_entry(INJURY_CHANGES_NAMESPACE, log)
+
+# Madden Ratings cache functions (one record per player)
 def get_ratings_cache() -> Optional[Any]:
     """Get cached Madden ratings data."""
-    return get_cache_data(RATINGS_CACHE_FILE, RATINGS_CACHE_TTL)
+    return get_store().get_fresh(RATINGS_NAMESPACE, ttl=RATINGS_CACHE_TTL)
+
+def get_ratings_cache_entry() -> Optional[CacheEntry]:
+    """Get the cached Madden ratings entry, even if expired."""
+    return get_store().get_entry(RATINGS_NAMESPACE)
 
 def set_ratings_cache(ratings: Any):
     """Set cached Madden ratings data."""
-    set_cache_data(ratings, RATINGS_CACHE_FILE)
+    get_store().set_records(RATINGS_NAMESPACE, ratings, ttl=RATINGS_CACHE_TTL)
 
 # Backward compatibility
 def get_cache() -> Optional[Any]:
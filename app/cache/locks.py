@@ -0,0 +1,70 @@
+import logging
+import os
+import time
+from typing import IO, Optional
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows has no fcntl
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Interval between attempts while waiting for a lock held by another process
+LOCK_POLL_INTERVAL = 0.1
+
+
+class FileLock:
+    """
+    Advisory exclusive lock on a file, shared by every process using the path.
+
+    Built on flock(), so the lock is released by the OS if its holder crashes.
+    Where fcntl is unavailable the lock is a no-op and only in-process
+    coordination applies.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file: Optional[IO] = None
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """
+        Take the lock, waiting up to timeout seconds (forever if None).
+
+        Returns:
+            True if the lock is held, False if the timeout expired first
+        """
+        if fcntl is None:
+            return True
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        f = open(self.path, "a")
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            try:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                self._file = f
+                return True
+            except BlockingIOError:
+                if deadline is not None and time.monotonic() >= deadline:
+                    f.close()
+                    return False
+                time.sleep(LOCK_POLL_INTERVAL)
+
+    def release(self) -> None:
+        """Release the lock if held."""
+        f, self._file = self._file, None
+        if f is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            f.close()
+
+    @property
+    def locked(self) -> bool:
+        """Whether this instance currently holds the lock."""
+        return self._file is not None
+
+    def __enter__(self) -> "FileLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.release()
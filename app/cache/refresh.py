@@ -0,0 +1,194 @@
+import logging
+import os
+import threading
+from typing import Any, Callable, Dict, Optional
+from app.cache.cache import CACHE_DIR, CacheEntry
+from app.cache.locks import FileLock
+from app.cache import response_cache
+from app import metrics, profiling
+
+logger = logging.getLogger(__name__)
+
+
+class _Flight:
+    """A refresh that is currently in progress for one source."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls for the same key into a single execution.
+
+    The first caller for a key runs the function; every caller that arrives
+    while it is running blocks until it finishes and receives the same result,
+    or the same exception if it failed.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights: Dict[str, _Flight] = {}
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        """
+        Run fn for key unless a call for key is already in flight.
+
+        Args:
+            key: Identifier of the work being coalesced (e.g. a data source name)
+            fn: Zero-argument callable performing the work
+
+        Returns:
+            The result of the single shared execution of fn
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = _Flight()
+                self._flights[key] = flight
+
+        if leader:
+            self._run(key, flight, fn)
+        else:
+            logger.info(f"Refresh for '{key}' already in flight, waiting for its result")
+            flight.done.wait()
+
+        if flight.error is not None:
+            raise flight.error
+        return flight.result
+
+    def start(self, key: str, fn: Callable[[], Any]) -> bool:
+        """
+        Run fn for key on a background thread unless a call is already in flight.
+
+        Returns:
+            True if a new background call was started, False if one was running
+        """
+        with self._lock:
+            if key in self._flights:
+                return False
+            flight = _Flight()
+            self._flights[key] = flight
+
+        def background():
+            self._run(key, flight, fn)
+            if flight.error is not None:
+                logger.error(f"Background refresh for '{key}' failed: {flight.error}")
+
+        threading.Thread(target=background, name=f"refresh-{key}", daemon=True).start()
+        return True
+
+    def _run(self, key: str, flight: _Flight, fn: Callable[[], Any]) -> None:
+        """Execute fn as the leader of flight and release its waiters."""
+        try:
+            flight.result = fn()
+        except BaseException as e:
+            flight.error = e
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    def in_flight(self, key: str) -> bool:
+        """Whether a call for key is currently running."""
+        with self._lock:
+            return key in self._flights
+
+
+# Serve expired-but-present entries immediately and refresh them in the
+# background, as long as they are younger than the source's max staleness.
+STALE_WHILE_REVALIDATE = True
+
+# Refreshes are also serialized across server processes sharing CACHE_DIR
+# through one advisory lock file per source. Refresh functions re-check the
+# cache first, so a process that waited on the lock picks up the result the
+# leader published instead of scraping again.
+REFRESH_LOCK_DIR = os.path.join(CACHE_DIR, "locks")
+# Seconds to wait for another process's refresh before refreshing regardless
+REFRESH_LOCK_TIMEOUT = 60 * 10
+
+# Process-wide coalescing of data source refreshes
+_refresh_flights = SingleFlight()
+
+
+def refresh_lock(source: str) -> FileLock:
+    """Cross-process lock guarding refreshes of source."""
+    return FileLock(os.path.join(REFRESH_LOCK_DIR, f"{source}.lock"))
+
+
+def _run_as_leader(source: str, fn: Callable[[], Any]) -> Any:
+    """Run fn while holding the cross-process refresh lock for source."""
+    lock = refresh_lock(source)
+    with metrics.timed("refresh_lock_wait_seconds", source=source):
+        locked = lock.acquire(timeout=REFRESH_LOCK_TIMEOUT)
+    if not locked:
+        logger.warning(f"{source}: refresh lock still held after {REFRESH_LOCK_TIMEOUT}s, refreshing anyway")
+    try:
+        with metrics.timed("refresh_seconds", source=source):
+            profile_name = f"refresh:{source}"
+            if profiling.should_profile(profile_name):
+                result = profiling.profile_call(profile_name, fn)
+            else:
+                result = fn()
+    finally:
+        lock.release()
+    # Responses encoded from the previous data must not outlive it
+    response_cache.invalidate(source)
+    return result
+
+
+def refresh_once(source: str, fn: Callable[[], Any]) -> Any:
+    """Run a refresh for source, sharing it with any concurrent callers."""
+    return _refresh_flights.do(source, lambda: _run_as_leader(source, fn))
+
+
+def refresh_in_background(source: str, fn: Callable[[], Any]) -> bool:
+    """Start a background refresh for source unless one is already running."""
+    return _refresh_flights.start(source, lambda: _run_as_leader(source, fn))
+
+
+def serve_cached(
+    source: str,
+    entry: Optional[CacheEntry],
+    ttl: float,
+    max_staleness: float,
+    refresh_fn: Callable[[], Any],
+) -> Any:
+    """
+    Serve a data source from its cache entry, refreshing it as needed.
+
+    Fresh entries are returned as-is. Expired entries younger than max_staleness
+    are returned immediately while refresh_fn runs in the background (when
+    STALE_WHILE_REVALIDATE is enabled). Otherwise the caller blocks on a
+    coalesced refresh.
+
+    Args:
+        source: Data source name, used as the refresh coalescing key
+        entry: Current cache entry, or None if nothing is cached
+        ttl: Freshness lifetime in seconds
+        max_staleness: Age in seconds past which stale data is not served
+        refresh_fn: Fetches, caches and returns fresh data
+
+    Returns:
+        The cached or freshly fetched data
+    """
+    if entry is not None:
+        age = entry.age
+        if age <= ttl:
+            metrics.increment("cache_requests_total", source=source, result="hit")
+            logger.info(f"{source}: CACHE HIT (age {age:.0f}s)")
+            return entry.data
+        if STALE_WHILE_REVALIDATE and age <= max_staleness:
+            metrics.increment("cache_requests_total", source=source, result="stale")
+            started = refresh_in_background(source, refresh_fn)
+            logger.info(
+                f"{source}: CACHE STALE (age {age:.0f}s) - serving cached data, "
+                f"background refresh {'started' if started else 'already running'}"
+            )
+            return entry.data
+    metrics.increment("cache_requests_total", source=source, result="miss")
+    logger.info(f"{source}: CACHE MISS - refreshing")
+    return refresh_once(source, refresh_fn)
@@ -0,0 +1,157 @@
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+from app.cache.cache import get_store
+from app import metrics
+
+logger = logging.getLogger(__name__)
+
+# Encoded tool responses kept in memory, least recently used evicted first once
+# their serialized size exceeds this many bytes
+RESPONSE_CACHE_MAX_BYTES = 32 * 1024 * 1024
+# Data versions are re-read from the store at most this often, so a cache hit
+# is a dictionary lookup; refreshes in this process invalidate immediately,
+# refreshes published by other processes are seen within this many seconds
+VERSION_CHECK_INTERVAL = 1.0
+
+
+class ResponseCache:
+    """
+    LRU cache of encoded tool responses keyed by (source, tool, arguments, data version).
+
+    Entries hold the finished tool result, so a hit skips both the query and the
+    serialization. Memory is bounded by the responses' serialized size.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple, Tuple[Any, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple) -> Optional[Any]:
+        """The cached response for key, marking it most recently used."""
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is None:
+                return None
+            self._entries.move_to_end(key)
+            return cached[0]
+
+    def put(self, key: Tuple, response: Any, size: int) -> bool:
+        """
+        Cache a response of the given serialized size, evicting as needed.
+
+        Returns:
+            False if the response alone exceeds the memory cap and was not cached
+        """
+        if size > self.max_bytes:
+            return False
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            self._entries[key] = (response, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._bytes -= evicted
+                metrics.increment("response_cache_evictions_total")
+        return True
+
+    def invalidate(self, source: Optional[str] = None) -> int:
+        """Drop the responses built from source (or every response); returns how many."""
+        with self._lock:
+            keys = [key for key in self._entries if source is None or key[0] == source]
+            for key in keys:
+                self._bytes -= self._entries.pop(key)[1]
+        return len(keys)
+
+    def info(self) -> Dict[str, int]:
+        """Entry count, cached bytes and the memory cap."""
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._bytes, "max_bytes": self.max_bytes}
+
+
+# Data version functions by source name; a version of None (nothing cached, or
+# the cached data has expired) bypasses the cache so the source can refresh
+_version_functions: Dict[str, Callable[[], Optional[Hashable]]] = {}
+_versions: Dict[str, Tuple[float, Optional[Hashable]]] = {}
+_versions_lock = threading.Lock()
+
+_cache: Optional[ResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    """The process-wide response cache."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ResponseCache(RESPONSE_CACHE_MAX_BYTES)
+    return _cache
+
+
+def register_source(source: str, version_fn: Callable[[], Optional[Hashable]]) -> None:
+    """Register how to read the current data version of a source."""
+    _version_functions[source] = version_fn
+
+
+def store_version(namespace: str) -> Optional[str]:
+    """Content hash of a store entry while it is fresh, else None."""
+    meta = get_store().get_meta(namespace)
+    if meta is None or (meta.ttl is not None and time.time() - meta.timestamp > meta.ttl):
+        return None
+    return meta.content_hash
+
+
+def read_version(source: str) -> Optional[Hashable]:
+    """Read the current data version of a source from its version function."""
+    try:
+        version = _version_functions[source]()
+    except Exception as e:
+        logger.error(f"Error reading data version of {source}: {e}")
+        version = None
+    with _versions_lock:
+        _versions[source] = (time.monotonic(), version)
+    return version
+
+
+def data_version(source: str) -> Optional[Hashable]:
+    """Current data version of a source, re-read at most every VERSION_CHECK_INTERVAL."""
+    with _versions_lock:
+        checked = _versions.get(source)
+    if checked is not None and time.monotonic() - checked[0] < VERSION_CHECK_INTERVAL:
+        return checked[1]
+    return read_version(source)
+
+
+def normalize_arguments(arguments: Optional[Dict[str, Any]]) -> str:
+    """Canonical form of tool arguments: sorted keys, None-valued arguments dropped."""
+    present = {name: value for name, value in (arguments or {}).items() if value is not None}
+    return json.dumps(present, sort_keys=True, separators=(",", ":"), default=str)
+
+
+def invalidate(source: Optional[str] = None) -> None:
+    """Forget the cached responses and data version of source (or of every source)."""
+    with _versions_lock:
+        if source is None:
+            _versions.clear()
+        else:
+            _versions.pop(source, None)
+    dropped = get_response_cache().invalidate(source)
+    if dropped:
+        logger.info(f"Response cache: dropped {dropped} responses for {source or 'all sources'}")
+
+
+def reset() -> None:
+    """Discard the process-wide response cache and every remembered data version."""
+    global _cache
+    with _versions_lock:
+        _versions.clear()
+    with _cache_lock:
+        _cache = None
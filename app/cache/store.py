@@ -0,0 +1,318 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+from app import metrics
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_KEY = "default"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    timestamp REAL NOT NULL,
+    ttl REAL,
+    content_hash TEXT NOT NULL,
+    payload TEXT,
+    record_count INTEGER,
+    PRIMARY KEY (namespace, key)
+);
+CREATE TABLE IF NOT EXISTS records (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    team TEXT,
+    position TEXT,
+    payload TEXT NOT NULL,
+    content_hash TEXT,
+    PRIMARY KEY (namespace, key, idx)
+);
+CREATE INDEX IF NOT EXISTS records_by_team ON records (namespace, key, team);
+CREATE INDEX IF NOT EXISTS records_by_position ON records (namespace, key, position);
+"""
+
+
+class CacheEntry(NamedTuple):
+    """Cached payload together with the time it was stored."""
+    data: Any
+    timestamp: float
+
+    @property
+    def age(self) -> float:
+        """Seconds since the entry was stored."""
+        return time.time() - self.timestamp
+
+
+class EntryMeta(NamedTuple):
+    """Metadata of a stored entry, readable without decoding its payload."""
+    timestamp: float
+    ttl: Optional[float]
+    content_hash: str
+    record_count: Optional[int]
+
+
+def _dumps(data: Any) -> str:
+    return json.dumps(data, separators=(",", ":"))
+
+
+def _hash(parts: Iterable[str]) -> str:
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\n")
+    return digest.hexdigest()
+
+
+def record_hash(record: Any) -> str:
+    """Content hash of one record, as stored with it by `CacheStore.set_records`."""
+    return _hash([_dumps(record)])
+
+
+def _normalize_team(team: Optional[str]) -> Optional[str]:
+    return team.strip().lower() if isinstance(team, str) else None
+
+
+def _normalize_position(position: Optional[str]) -> Optional[str]:
+    return position.strip().upper() if isinstance(position, str) else None
+
+
+class CacheStore:
+    """
+    Unified cache backend on a local SQLite database in WAL mode.
+
+    Each data source owns a namespace. An entry is stored either as one JSON
+    document or, for record lists such as player ratings, as one row per record
+    with its team and position indexed, so subsets can be read without decoding
+    the whole dataset. Every entry carries its store time, TTL and a content
+    hash. Decoded entries are kept in memory and only re-read when the stored
+    content hash changes.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._memory: Dict[Tuple[str, str], Tuple[str, Any]] = {}
+        self._memory_lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(records)")}
+            if "content_hash" not in columns:
+                # Databases created before records carried their own hash
+                conn.execute("ALTER TABLE records ADD COLUMN content_hash TEXT")
+
+    def _connect(self) -> sqlite3.Connection:
+        """Per-thread connection to the cache database."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def close(self) -> None:
+        """Close this thread's connection."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def get_meta(self, namespace: str, key: str = DEFAULT_KEY) -> Optional[EntryMeta]:
+        """Metadata for an entry, or None if nothing is stored."""
+        row = self._connect().execute(
+            "SELECT timestamp, ttl, content_hash, record_count FROM entries WHERE namespace = ? AND key = ?",
+            (namespace, key),
+        ).fetchone()
+        return EntryMeta(*row) if row else None
+
+    def get_entry(self, namespace: str, key: str = DEFAULT_KEY) -> Optional[CacheEntry]:
+        """
+        Get an entry regardless of its age.
+
+        The metadata and payload are read in one transaction, so a concurrent
+        write from another process can't pair a new hash with old rows.
+
+        Returns:
+            The decoded entry, or None if nothing is stored
+        """
+        conn = self._connect()
+        conn.execute("BEGIN")
+        try:
+            meta = self.get_meta(namespace, key)
+            if meta is None:
+                return None
+            with self._memory_lock:
+                cached = self._memory.get((namespace, key))
+            if cached is not None and cached[0] == meta.content_hash:
+                return CacheEntry(cached[1], meta.timestamp)
+
+            if meta.record_count is None:
+                row = conn.execute(
+                    "SELECT payload FROM entries WHERE namespace = ? AND key = ?", (namespace, key)
+                ).fetchone()
+                payloads = None
+            else:
+                payloads = conn.execute(
+                    "SELECT payload FROM records WHERE namespace = ? AND key = ? ORDER BY idx", (namespace, key)
+                ).fetchall()
+        finally:
+            conn.execute("COMMIT")
+
+        with metrics.timed("json_decode_seconds", namespace=namespace):
+            if payloads is None:
+                data = json.loads(row[0])
+            else:
+                data = [json.loads(payload) for (payload,) in payloads]
+        self._remember(namespace, key, meta.content_hash, data)
+        return CacheEntry(data, meta.timestamp)
+
+    def get_fresh(self, namespace: str, key: str = DEFAULT_KEY, ttl: Optional[float] = None) -> Optional[Any]:
+        """Get an entry's data if it is younger than ttl (or its stored TTL)."""
+        meta = self.get_meta(namespace, key)
+        if meta is None:
+            return None
+        limit = ttl if ttl is not None else meta.ttl
+        if limit is not None and time.time() - meta.timestamp > limit:
+            return None
+        entry = self.get_entry(namespace, key)
+        return entry.data if entry else None
+
+    def set_entry(self, namespace: str, data: Any, key: str = DEFAULT_KEY, ttl: Optional[float] = None) -> CacheEntry:
+        """Store data as a single JSON document."""
+        payload = _dumps(data)
+        content_hash = _hash([payload])
+        timestamp = time.time()
+        conn = self._connect()
+        with conn:
+            conn.execute("DELETE FROM records WHERE namespace = ? AND key = ?", (namespace, key))
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (namespace, key, timestamp, ttl, content_hash, payload, record_count) "
+                "VALUES (?, ?, ?, ?, ?, ?, NULL)",
+                (namespace, key, timestamp, ttl, content_hash, payload),
+            )
+        self._remember(namespace, key, content_hash, data)
+        return CacheEntry(data, timestamp)
+
+    def set_records(
+        self,
+        namespace: str,
+        records: List[Dict],
+        key: str = DEFAULT_KEY,
+        ttl: Optional[float] = None,
+        team_field: Optional[str] = "team",
+        position_field: Optional[str] = "position",
+    ) -> CacheEntry:
+        """
+        Store a list of records one row per record, indexing team and position.
+
+        Each row keeps the content hash of its record, and only rows whose
+        record changed are rewritten. Unchanged content (same overall hash)
+        only refreshes the entry's timestamp.
+        """
+        payloads = [_dumps(record) for record in records]
+        content_hash = _hash(payloads)
+        timestamp = time.time()
+        conn = self._connect()
+        with conn:
+            current = conn.execute(
+                "SELECT content_hash FROM entries WHERE namespace = ? AND key = ?", (namespace, key)
+            ).fetchone()
+            if current is None or current[0] != content_hash:
+                stored = dict(
+                    conn.execute("SELECT idx, content_hash FROM records WHERE namespace = ? AND key = ?", (namespace, key))
+                )
+                changed = []
+                for idx, (record, payload) in enumerate(zip(records, payloads)):
+                    row_hash = _hash([payload])
+                    if stored.get(idx) != row_hash:
+                        changed.append((idx, record, payload, row_hash))
+                conn.executemany(
+                    "INSERT OR REPLACE INTO records (namespace, key, idx, team, position, payload, content_hash) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        (
+                            namespace,
+                            key,
+                            idx,
+                            _normalize_team(record.get(team_field)) if team_field else None,
+                            _normalize_position(record.get(position_field)) if position_field else None,
+                            payload,
+                            row_hash,
+                        )
+                        for idx, record, payload, row_hash in changed
+                    ),
+                )
+                conn.execute(
+                    "DELETE FROM records WHERE namespace = ? AND key = ? AND idx >= ?", (namespace, key, len(records))
+                )
+                metrics.increment("records_written_total", len(changed), namespace=namespace)
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (namespace, key, timestamp, ttl, content_hash, payload, record_count) "
+                "VALUES (?, ?, ?, ?, ?, NULL, ?)",
+                (namespace, key, timestamp, ttl, content_hash, len(records)),
+            )
+        self._remember(namespace, key, content_hash, records)
+        return CacheEntry(records, timestamp)
+
+    def get_record_hashes(self, namespace: str, key: str = DEFAULT_KEY) -> Dict[str, Optional[str]]:
+        """Stored content hash of each record of an entry, by its indexed team."""
+        rows = self._connect().execute(
+            "SELECT team, content_hash FROM records WHERE namespace = ? AND key = ? AND team IS NOT NULL",
+            (namespace, key),
+        ).fetchall()
+        return dict(rows)
+
+    def get_records(
+        self,
+        namespace: str,
+        key: str = DEFAULT_KEY,
+        team: Optional[str] = None,
+        position: Optional[str] = None,
+    ) -> List[Dict]:
+        """Read the records of an entry matching team and/or position, in stored order."""
+        query = "SELECT payload FROM records WHERE namespace = ? AND key = ?"
+        params: List[Any] = [namespace, key]
+        if team is not None:
+            query += " AND team = ?"
+            params.append(_normalize_team(team))
+        if position is not None:
+            query += " AND position = ?"
+            params.append(_normalize_position(position))
+        query += " ORDER BY idx"
+        rows = self._connect().execute(query, params).fetchall()
+        with metrics.timed("json_decode_seconds", namespace=namespace):
+            return [json.loads(payload) for (payload,) in rows]
+
+    def touch(self, namespace: str, key: str = DEFAULT_KEY) -> bool:
+        """Restamp an entry as freshly stored without changing its data."""
+        conn = self._connect()
+        with conn:
+            cursor = conn.execute(
+                "UPDATE entries SET timestamp = ? WHERE namespace = ? AND key = ?", (time.time(), namespace, key)
+            )
+        return cursor.rowcount > 0
+
+    def delete(self, namespace: str, key: str = DEFAULT_KEY) -> None:
+        """Remove an entry and its records."""
+        conn = self._connect()
+        with conn:
+            conn.execute("DELETE FROM records WHERE namespace = ? AND key = ?", (namespace, key))
+            conn.execute("DELETE FROM entries WHERE namespace = ? AND key = ?", (namespace, key))
+        with self._memory_lock:
+            self._memory.pop((namespace, key), None)
+
+    def clear_memory(self) -> None:
+        """Drop every decoded entry held in memory."""
+        with self._memory_lock:
+            self._memory.clear()
+
+    def _remember(self, namespace: str, key: str, content_hash: str, data: Any) -> None:
+        with self._memory_lock:
+            self._memory[(namespace, key)] = (content_hash, data)
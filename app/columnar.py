@@ -0,0 +1,160 @@
+from typing import Any, Dict, List, Optional
+
+# Response formats accepted by the tabular tools
+RECORDS_FORMAT = "records"
+COLUMNAR_FORMAT = "columnar"
+RESPONSE_FORMATS = (RECORDS_FORMAT, COLUMNAR_FORMAT)
+
+# A string column is dictionary-encoded when its distinct values number at
+# most this fraction of its non-null cells
+DICTIONARY_MAX_RATIO = 0.5
+
+
+def _is_record_list(value: Any) -> bool:
+    return isinstance(value, list) and bool(value) and all(isinstance(item, dict) for item in value)
+
+
+def _flatten(record: Dict, prefix: str, row: Dict[str, Any], children: Dict[str, List]) -> None:
+    """Flatten nested objects into dotted columns; collect nested record lists."""
+    for key, value in record.items():
+        name = f"{prefix}{key}"
+        if value is None:
+            continue
+        if isinstance(value, dict):
+            _flatten(value, f"{name}.", row, children)
+        elif _is_record_list(value):
+            children.setdefault(name, []).append(value)
+        else:
+            row[name] = value
+
+
+def to_columnar(records: List[Dict]) -> Dict[str, Any]:
+    """
+    Encode a list of records as a compact column-oriented table.
+
+    - Column names are listed once; each record becomes a row array.
+    - Nested objects are flattened into dotted column names.
+    - None values are elided: all-null columns are dropped, columns are ordered
+      densest first and trailing nulls are trimmed from every row.
+    - Repetitive string columns (team, position, source...) are dictionary
+      encoded: rows hold integer codes into `dictionaries[column]`.
+    - Nested lists of records (a player's ratings, a team's injuries) become a
+      child table under `children[column]`, whose `parent` array holds the
+      index of the owning row.
+
+    Returns:
+        Dict with "columns", "rows" and, when used, "dictionaries" and "children"
+    """
+    flat_rows: List[Dict[str, Any]] = []
+    nested: Dict[str, List] = {}
+    nested_parents: Dict[str, List[int]] = {}
+    for index, record in enumerate(records):
+        row: Dict[str, Any] = {}
+        children: Dict[str, List] = {}
+        _flatten(record, "", row, children)
+        flat_rows.append(row)
+        for name, lists in children.items():
+            for items in lists:
+                nested.setdefault(name, []).extend(items)
+                nested_parents.setdefault(name, []).extend([index] * len(items))
+
+    # Densest columns first (ties keep first-seen order) so nulls trail
+    counts: Dict[str, int] = {}
+    for row in flat_rows:
+        for name in row:
+            counts[name] = counts.get(name, 0) + 1
+    columns = sorted(counts, key=lambda name: -counts[name])
+
+    dictionaries: Dict[str, List] = {}
+    codes: Dict[str, Dict[Any, int]] = {}
+    for name in columns:
+        values = [row[name] for row in flat_rows if name in row]
+        if not all(isinstance(v, str) for v in values):
+            continue
+        distinct = list(dict.fromkeys(values))
+        if len(distinct) <= len(values) * DICTIONARY_MAX_RATIO:
+            dictionaries[name] = distinct
+            codes[name] = {value: code for code, value in enumerate(distinct)}
+
+    rows = []
+    for row in flat_rows:
+        cells = [
+            (codes[name][row[name]] if name in codes else row[name]) if name in row else None
+            for name in columns
+        ]
+        while cells and cells[-1] is None:
+            cells.pop()
+        rows.append(cells)
+
+    table: Dict[str, Any] = {"columns": columns, "rows": rows}
+    if dictionaries:
+        table["dictionaries"] = dictionaries
+    if nested:
+        table["children"] = {
+            name: {"parent": nested_parents[name], **to_columnar(items)} for name, items in nested.items()
+        }
+    return table
+
+
+def _set_path(record: Dict, name: str, value: Any) -> None:
+    *parents, leaf = name.split(".")
+    for part in parents:
+        record = record.setdefault(part, {})
+    record[leaf] = value
+
+
+def _set_path_list(record: Dict, name: str, item: Dict) -> None:
+    *parents, leaf = name.split(".")
+    for part in parents:
+        record = record.setdefault(part, {})
+    record.setdefault(leaf, []).append(item)
+
+
+def from_columnar(table: Dict[str, Any]) -> List[Dict]:
+    """
+    Decode a table produced by `to_columnar` back into records.
+
+    None values and empty nested objects, which the encoding elides, are absent
+    from the decoded records.
+    """
+    columns = table["columns"]
+    dictionaries = table.get("dictionaries", {})
+    records = []
+    for cells in table["rows"]:
+        record: Dict[str, Any] = {}
+        for name, cell in zip(columns, cells):
+            if cell is None:
+                continue
+            _set_path(record, name, dictionaries[name][cell] if name in dictionaries else cell)
+        records.append(record)
+    for name, child in table.get("children", {}).items():
+        for parent, item in zip(child["parent"], from_columnar(child)):
+            _set_path_list(records[parent], name, item)
+    return records
+
+
+def check_format(format: str) -> str:
+    """Validate a tool's response format argument."""
+    if format not in RESPONSE_FORMATS:
+        raise ValueError(f"format must be one of: {', '.join(RESPONSE_FORMATS)}")
+    return format
+
+
+def encode_response(result: Any, format: str, items_key: Optional[str] = None) -> Any:
+    """
+    Apply a response format to a tool result.
+
+    Args:
+        result: A list of records, or a page envelope holding them under items_key
+        format: "records" (unchanged) or "columnar"
+        items_key: Key of the records in a page envelope
+
+    Returns:
+        The result, with its records columnar-encoded and tagged
+        `"format": "columnar"` when requested
+    """
+    if check_format(format) == RECORDS_FORMAT:
+        return result
+    if isinstance(result, dict) and items_key in result:
+        return {**result, items_key: to_columnar(result[items_key]), "format": COLUMNAR_FORMAT}
+    return {"format": COLUMNAR_FORMAT, **to_columnar(result)}
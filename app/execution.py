@@ -0,0 +1,88 @@
+import asyncio
+import functools
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple, TypeVar
+from app import profiling
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Worker threads shared by all tools for blocking resource calls (scraping,
+# CSV loading, cache I/O), keeping the server's event loop free.
+MAX_WORKERS = 16
+# Maximum concurrent executions per tool; tools not listed use the default.
+# Full-dataset tools are capped lower so they cannot occupy every worker
+# while a refresh is running and starve the cheap filtered queries.
+DEFAULT_TOOL_CONCURRENCY = 4
+TOOL_CONCURRENCY_LIMITS: Dict[str, int] = {
+    "get_player_ratings": 2,
+    "get_player_ratings_stats": 2,
+    "get_nfl_injuries": 2,
+    "get_ol_rankings": 2,
+}
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+_tool_semaphores: Dict[str, Tuple[asyncio.AbstractEventLoop, asyncio.Semaphore]] = {}
+
+
+def set_max_workers(workers: int) -> None:
+    """Size the shared worker pool; takes effect when the pool is next created."""
+    global MAX_WORKERS
+    if workers < 1:
+        raise ValueError("workers must be at least 1")
+    MAX_WORKERS = workers
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """Create the shared worker pool on first use."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="tool")
+        return _executor
+
+
+def _tool_semaphore(tool: str) -> asyncio.Semaphore:
+    """Per-tool concurrency limiter bound to the running event loop."""
+    loop = asyncio.get_running_loop()
+    cached = _tool_semaphores.get(tool)
+    if cached is None or cached[0] is not loop:
+        limit = TOOL_CONCURRENCY_LIMITS.get(tool, DEFAULT_TOOL_CONCURRENCY)
+        cached = _tool_semaphores[tool] = (loop, asyncio.Semaphore(limit))
+    return cached[1]
+
+
+async def run_blocking(tool: str, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Run a blocking resource call for a tool on the shared worker pool.
+
+    Calls sampled by the profiling hook run under the profiler on their worker.
+
+    Args:
+        tool: Name of the calling tool, used for its concurrency limit
+        fn: Blocking function to execute
+        *args, **kwargs: Arguments for fn
+
+    Returns:
+        The result of fn
+    """
+    call = functools.partial(fn, *args, **kwargs)
+    if profiling.should_profile(tool):
+        call = functools.partial(profiling.profile_call, tool, call)
+    async with _tool_semaphore(tool):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_get_executor(), call)
+
+
+def shutdown_executor() -> None:
+    """Stop the worker pool, waiting for running calls to finish."""
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=True, cancel_futures=True)
+        logger.info("Tool worker pool stopped")
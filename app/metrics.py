@@ -0,0 +1,214 @@
+import logging
+import math
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Prefix of every metric name in the Prometheus text dump
+METRICS_PREFIX = "pigskin_"
+# When set, the Prometheus text dump is rewritten to this file periodically
+METRICS_FILE = os.environ.get("PIGSKIN_METRICS_FILE")
+METRICS_DUMP_INTERVAL = 15.0  # seconds
+
+# Histogram buckets for durations (seconds) and sizes (bytes)
+SECONDS_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+BYTES_BUCKETS = tuple(1024 * 4 ** i for i in range(9))  # 1 KiB .. 64 MiB
+
+LabelSet = Tuple[Tuple[str, str], ...]
+
+
+def _label_set(labels: Dict[str, object]) -> LabelSet:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+class Histogram:
+    """Observation count, sum, extremes and cumulative bucket counts."""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self.bucket_counts = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.sum += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.bucket_counts[i] += 1
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "avg": round(self.sum / self.count, 6) if self.count else 0.0,
+            "min": round(self.min, 6) if self.count else 0.0,
+            "max": round(self.max, 6) if self.count else 0.0,
+        }
+
+
+class MetricsRegistry:
+    """Thread-safe in-process counters and histograms, keyed by name and labels."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[LabelSet, float]] = {}
+        self._histograms: Dict[str, Dict[LabelSet, Histogram]] = {}
+        self.started_at = time.time()
+
+    def increment(self, name: str, value: float = 1, **labels: object) -> None:
+        """Add value to a counter."""
+        key = _label_set(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name: str, value: float, buckets: Optional[Sequence[float]] = None, **labels: object) -> None:
+        """Record an observation in a histogram (byte buckets for *_bytes names)."""
+        key = _label_set(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                if buckets is None:
+                    buckets = BYTES_BUCKETS if name.endswith("_bytes") else SECONDS_BUCKETS
+                histogram = series[key] = Histogram(buckets)
+            histogram.observe(value)
+
+    @contextmanager
+    def timed(self, name: str, **labels: object) -> Iterator[None]:
+        """Observe the wall time of the enclosed block, in seconds."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def snapshot(self) -> Dict:
+        """Every counter value and histogram summary, by metric name."""
+        with self._lock:
+            counters = {
+                name: [{"labels": dict(key), "value": value} for key, value in sorted(series.items())]
+                for name, series in sorted(self._counters.items())
+            }
+            histograms = {
+                name: [{"labels": dict(key), **histogram.summary()} for key, histogram in sorted(series.items())]
+                for name, series in sorted(self._histograms.items())
+            }
+        return {
+            "uptime_seconds": round(time.time() - self.started_at, 1),
+            "counters": counters,
+            "histograms": histograms,
+        }
+
+    def render_prometheus(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        lines: List[str] = []
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                metric = METRICS_PREFIX + name
+                lines.append(f"# TYPE {metric} counter")
+                for key, value in sorted(series.items()):
+                    lines.append(f"{metric}{_format_labels(key)} {_format_value(value)}")
+            for name, series in sorted(self._histograms.items()):
+                metric = METRICS_PREFIX + name
+                lines.append(f"# TYPE {metric} histogram")
+                for key, histogram in sorted(series.items()):
+                    for bound, count in zip(histogram.buckets, histogram.bucket_counts):
+                        le = (("le", _format_value(bound)),)
+                        lines.append(f"{metric}_bucket{_format_labels(key + le)} {count}")
+                    lines.append(f'{metric}_bucket{_format_labels(key + (("le", "+Inf"),))} {histogram.count}')
+                    lines.append(f"{metric}_sum{_format_labels(key)} {_format_value(histogram.sum)}")
+                    lines.append(f"{metric}_count{_format_labels(key)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        """Drop every recorded metric."""
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+            self.started_at = time.time()
+
+
+def _format_labels(labels: LabelSet) -> str:
+    if not labels:
+        return ""
+    pairs = (
+        name + '="' + value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+        for name, value in labels
+    )
+    return "{" + ",".join(pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+# Process-wide registry used by the server, resources and scrapers
+registry = MetricsRegistry()
+increment = registry.increment
+observe = registry.observe
+timed = registry.timed
+snapshot = registry.snapshot
+render_prometheus = registry.render_prometheus
+
+
+def write_prometheus(path: str) -> None:
+    """Atomically replace path with the current Prometheus text dump."""
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(render_prometheus())
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+_dump_stop: Optional[threading.Event] = None
+_dump_thread: Optional[threading.Thread] = None
+
+
+def start_metrics_dump(path: str, interval: float = METRICS_DUMP_INTERVAL) -> None:
+    """Rewrite the Prometheus dump at path every interval seconds."""
+    global _dump_stop, _dump_thread
+    if _dump_thread is not None:
+        return
+    stop = threading.Event()
+
+    def run():
+        while not stop.wait(interval):
+            try:
+                write_prometheus(path)
+            except OSError as e:
+                logger.error(f"Error writing metrics file {path}: {e}")
+
+    _dump_stop, _dump_thread = stop, threading.Thread(target=run, name="metrics-dump", daemon=True)
+    _dump_thread.start()
+    logger.info(f"Writing Prometheus metrics to {path} every {interval:.0f}s")
+
+
+def stop_metrics_dump(path: Optional[str] = None) -> None:
+    """Stop the periodic dump, writing a final one to path if given."""
+    global _dump_stop, _dump_thread
+    stop, thread = _dump_stop, _dump_thread
+    _dump_stop, _dump_thread = None, None
+    if stop is not None:
+        stop.set()
+        thread.join(timeout=5)
+    if path:
+        try:
+            write_prometheus(path)
+        except OSError as e:
+            logger.error(f"Error writing metrics file {path}: {e}")
@@ -0,0 +1,160 @@
+import base64
+import hashlib
+import json
+from typing import Any, Dict, List, Optional, Sequence
+
+# Page size limits for tools that accept `limit`
+MAX_PAGE_SIZE = 500
+
+
+def version_token(version: Any) -> str:
+    """Short stable token identifying one data version."""
+    return hashlib.sha256(repr(version).encode("utf-8")).hexdigest()[:16]
+
+
+def query_token(*parts: Any) -> str:
+    """Token binding a cursor to the query (filters and sort order) it pages."""
+    return hashlib.sha256(json.dumps(parts, default=str).encode("utf-8")).hexdigest()[:12]
+
+
+def encode_cursor(version: str, offset: int, query: str, limit: Optional[int] = None) -> str:
+    """Opaque cursor for the page starting at offset of a query on one data version."""
+    raw = json.dumps({"v": version, "o": offset, "q": query, "l": limit}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, query: str) -> Dict[str, Any]:
+    """
+    Decode a cursor produced by `encode_cursor` for the same query.
+
+    Returns:
+        Dict with the cursor's data version ("v"), offset ("o") and page size ("l")
+
+    Raises:
+        ValueError: If the cursor is malformed or belongs to another query
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        offset = int(data["o"])
+        version = str(data["v"])
+        cursor_query = str(data["q"])
+        limit = data.get("l")
+        limit = None if limit is None else int(limit)
+    except (ValueError, KeyError, TypeError):
+        raise ValueError("Invalid cursor")
+    if cursor_query != query or offset < 0:
+        raise ValueError("Cursor does not belong to this query; request the first page again")
+    return {"v": version, "o": offset, "l": limit}
+
+
+def check_limit(limit: Optional[int]) -> Optional[int]:
+    """Validate a page size."""
+    if limit is not None and not 1 <= limit <= MAX_PAGE_SIZE:
+        raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+    return limit
+
+
+def _path_value(record: Any, path: Sequence[str]) -> Any:
+    """Value at a dotted path; through lists, the first non-None element value."""
+    value = record
+    for i, key in enumerate(path):
+        if isinstance(value, list):
+            for item in value:
+                found = _path_value(item, path[i:])
+                if found is not None:
+                    return found
+            return None
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return value
+
+
+def sort_records(records: List[Dict], sort_by: Optional[str]) -> List[Dict]:
+    """
+    Sort records by a dotted field path; prefix with "-" for descending.
+
+    A path through a list (e.g. "ratings.overall") uses the first element that
+    has a value. Records without a value sort last in either direction.
+    """
+    if not sort_by:
+        return records
+    descending = sort_by.startswith("-")
+    path = sort_by.lstrip("-+").split(".")
+    present, missing = [], []
+    for record in records:
+        (missing if _path_value(record, path) is None else present).append(record)
+    try:
+        present.sort(key=lambda r: _path_value(r, path), reverse=descending)
+    except TypeError:
+        # Mixed value types: fall back to comparing as text
+        present.sort(key=lambda r: str(_path_value(r, path)), reverse=descending)
+    return present + missing
+
+
+def _field_tree(fields: Sequence[str]) -> Dict[str, Any]:
+    """Nested dict of the requested dotted paths; None marks a whole subtree."""
+    tree: Dict[str, Any] = {}
+    for field in fields:
+        node = tree
+        parts = [p for p in field.strip().split(".") if p]
+        for i, part in enumerate(parts):
+            if i == len(parts) - 1:
+                node[part] = None
+            else:
+                child = node.get(part, {})
+                if child is None:
+                    break  # already selected whole
+                node = node.setdefault(part, child)
+    return tree
+
+
+def _project(value: Any, tree: Optional[Dict[str, Any]]) -> Any:
+    if tree is None:
+        return value
+    if isinstance(value, list):
+        return [_project(item, tree) for item in value]
+    if not isinstance(value, dict):
+        return value
+    return {key: _project(value[key], subtree) for key, subtree in tree.items() if key in value}
+
+
+def project_records(records: List[Dict], fields: Optional[Sequence[str]]) -> List[Dict]:
+    """
+    Keep only the given dotted field paths of each record.
+
+    Paths apply through lists, so "ratings.overall" keeps the overall value of
+    every entry in a player's ratings list. Records are copied, never mutated.
+    """
+    if not fields:
+        return records
+    tree = _field_tree(fields)
+    return [_project(record, tree) for record in records]
+
+
+def paginate(
+    records: List[Dict],
+    version: str,
+    query: str,
+    limit: Optional[int],
+    offset: int = 0,
+    fields: Optional[Sequence[str]] = None,
+    items_key: str = "items",
+) -> Dict[str, Any]:
+    """
+    Cut one page out of an already filtered and sorted record list.
+
+    Returns:
+        Dict with the page's records under items_key, the total match count,
+        the data version and `next_cursor` (None on the last page)
+    """
+    end = len(records) if limit is None else offset + limit
+    page = records[offset:end]
+    return {
+        items_key: project_records(page, fields),
+        "total": len(records),
+        "offset": offset,
+        "version": version,
+        "next_cursor": encode_cursor(version, end, query, limit) if end < len(records) else None,
+    }
@@ -0,0 +1,10 @@
+# Player name matching shared by the resources that look players up by name
+
+
+def normalize_player_name(name: str) -> str:
+    """Normalize player name for matching across sources."""
+    # Remove common suffixes and normalize
+    name = name.strip().lower()
+    name = name.replace(" iii", "").replace(" ii", "").replace(" jr.", "").replace(" sr.", "")
+    name = name.replace("'", "").replace("'", "")  # Handle apostrophes
+    return name
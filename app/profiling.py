@@ -0,0 +1,175 @@
+import cProfile
+import io
+import logging
+import os
+import pstats
+import random
+import re
+import threading
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, Iterable, Optional, Set, TypeVar
+
+from app import metrics
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Opt-in per-call profiling of tool work, configured by `configure` (the
+# server entry point's --profile-* flags). Disabled while PROFILE_DIR is None.
+# Besides tool calls, data source refreshes are profiled as "refresh:<source>"
+# and Madden page parses (in their worker processes) as "parse:madden_ratings".
+PROFILE_DIR: Optional[str] = None
+# Fraction of eligible calls that are profiled (0.0 - 1.0)
+PROFILE_RATE = 1.0
+# Only these tools (or refresh:/parse: names) are profiled; empty means all of them
+PROFILE_TOOLS: Set[str] = set()
+# Also trace allocations with tracemalloc (noticeably slower than cProfile alone)
+PROFILE_MEMORY = False
+# Functions and allocation sites listed in each call's text report
+PROFILE_TOP_N = 30
+# Frames kept per allocation traceback
+TRACEMALLOC_FRAMES = 10
+
+# cProfile and tracemalloc are process-wide, so only one call is profiled at a
+# time; calls arriving while another is being profiled run unprofiled.
+_profile_lock = threading.Lock()
+_sequence = 0
+
+
+def configure(
+    directory: Optional[str],
+    rate: float = 1.0,
+    tools: Optional[Iterable[str]] = None,
+    memory: bool = False,
+) -> None:
+    """
+    Enable (or with directory None, disable) per-call profiling.
+
+    Args:
+        directory: Where the per-call reports are written
+        rate: Fraction of eligible calls to profile
+        tools: Tool names to profile; None or empty profiles every tool
+        memory: Also record tracemalloc top allocations
+    """
+    global PROFILE_DIR, PROFILE_RATE, PROFILE_TOOLS, PROFILE_MEMORY
+    PROFILE_DIR = directory
+    PROFILE_RATE = max(0.0, min(1.0, rate))
+    PROFILE_TOOLS = set(tools or ())
+    PROFILE_MEMORY = memory
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+        logger.info(
+            f"Profiling {', '.join(sorted(PROFILE_TOOLS)) or 'all tools'} at rate {PROFILE_RATE:g} "
+            f"(memory: {'on' if memory else 'off'}) into {directory}"
+        )
+
+
+def should_profile(tool: str) -> bool:
+    """Whether this call of tool is sampled for profiling."""
+    if not PROFILE_DIR:
+        return False
+    if PROFILE_TOOLS and tool not in PROFILE_TOOLS:
+        return False
+    return PROFILE_RATE >= 1.0 or random.random() < PROFILE_RATE
+
+
+def current_config() -> Dict[str, Any]:
+    """The `configure` arguments in effect, to hand to worker processes."""
+    return {"directory": PROFILE_DIR, "rate": PROFILE_RATE, "tools": sorted(PROFILE_TOOLS), "memory": PROFILE_MEMORY}
+
+
+def profile_in_process(config: Dict[str, Any], name: str, fn: Callable[..., T], *args: Any) -> T:
+    """
+    Profile fn under config, configuring this process first if needed.
+
+    For calls sampled in the server process but run in a spawned worker
+    process, which starts with profiling disabled.
+    """
+    if PROFILE_DIR != config["directory"]:
+        configure(**config)
+    return profile_call(name, fn, *args)
+
+
+def profile_call(tool: str, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Run fn under cProfile (and tracemalloc when enabled) and write its reports.
+
+    Writes `<stem>.prof` (pstats data, e.g. for snakeviz) and `<stem>.txt`
+    (top functions by cumulative time and top allocation sites) to PROFILE_DIR.
+    Runs fn unprofiled if another call is already being profiled.
+    """
+    if not _profile_lock.acquire(blocking=False):
+        return fn(*args, **kwargs)
+    try:
+        directory = PROFILE_DIR
+        memory = PROFILE_MEMORY
+        started_tracing = memory and not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+        before = tracemalloc.take_snapshot() if memory else None
+        if memory:
+            tracemalloc.reset_peak()
+
+        profiler = cProfile.Profile()
+        started = time.perf_counter()
+        error: Optional[BaseException] = None
+        profiler.enable()
+        try:
+            return fn(*args, **kwargs)
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            profiler.disable()
+            elapsed = time.perf_counter() - started
+            after = tracemalloc.take_snapshot() if memory else None
+            peak = tracemalloc.get_traced_memory()[1] if memory else None
+            if started_tracing:
+                tracemalloc.stop()
+            try:
+                _write_reports(directory, tool, profiler, elapsed, before, after, peak, error)
+            except Exception as e:
+                logger.error(f"Error writing profile for {tool}: {e}")
+    finally:
+        _profile_lock.release()
+
+
+def _write_reports(
+    directory: str,
+    tool: str,
+    profiler: cProfile.Profile,
+    elapsed: float,
+    before: Optional[tracemalloc.Snapshot],
+    after: Optional[tracemalloc.Snapshot],
+    peak: Optional[int],
+    error: Optional[BaseException],
+) -> str:
+    """Write the .prof and .txt reports of one profiled call; returns their path stem."""
+    global _sequence
+    _sequence += 1
+    safe_tool = re.sub(r"[^A-Za-z0-9_.-]", "_", tool)
+    stem = os.path.join(
+        directory, f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{_sequence:04d}-{safe_tool}"
+    )
+    os.makedirs(directory, exist_ok=True)
+    profiler.dump_stats(f"{stem}.prof")
+
+    report = io.StringIO()
+    report.write(f"tool: {tool}\nwall time: {elapsed:.3f}s\n")
+    if error is not None:
+        report.write(f"raised: {error!r}\n")
+    report.write("\n== cProfile: top functions by cumulative time ==\n")
+    pstats.Stats(profiler, stream=report).sort_stats("cumulative").print_stats(PROFILE_TOP_N)
+    if after is not None:
+        report.write(f"\n== tracemalloc: peak traced memory {peak / 1024:.1f} KiB ==\n")
+        report.write("== tracemalloc: top allocation sites during the call ==\n")
+        for stat in after.compare_to(before, "lineno")[:PROFILE_TOP_N]:
+            report.write(f"{stat}\n")
+    with open(f"{stem}.txt", "w") as f:
+        f.write(report.getvalue())
+
+    metrics.increment("profiled_calls_total", tool=tool)
+    logger.info(f"Profiled {tool} ({elapsed:.3f}s): {stem}.txt")
+    return stem
@@ -1,11 +1,285 @@
+import logging
+import threading
+import time
+from functools import partial
 from app.scraper.nfl_injuries import fetch_nfl_injuries
-from app.cache.cache import get_injuries_cache, set_injuries_cache
-from typing import List, Dict
+from app.cache.cache import (
+    INJURIES_CACHE_MAX_STALENESS,
+    INJURIES_NAMESPACE,
+    INJURIES_CACHE_TTL,
+    CacheEntry,
+    get_injuries_cache,
+    get_injuries_cache_entry,
+    get_injury_change_log,
+    get_injury_team_hashes,
+    set_injuries_cache,
+    set_injury_change_log,
+    touch_injuries_cache,
+)
+from app.cache.refresh import serve_cached
+from app.cache.response_cache import register_source, store_version
+from app.cache.store import record_hash
+from app.player_names import normalize_player_name
+from app import metrics
+from typing import Any, List, Dict, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Refreshes that changed something kept in the change log; get_injury_changes
+# answers older `since` versions with the full injury list
+INJURY_CHANGE_HISTORY = 100
+
+# Shorthands accepted for ESPN's injury statuses
+INJURY_STATUS_ALIASES = {
+    "ir": "injured reserve",
+    "pup": "physically unable to perform",
+    "dtd": "day-to-day",
+    "day to day": "day-to-day",
+    "nfi": "non-football injury",
+}
+# Injury fields left out of indexed query results unless details are requested
+INJURY_DETAIL_FIELDS = ("status_update",)
+
+register_source(INJURIES_NAMESPACE, partial(store_version, INJURIES_NAMESPACE))
 
 def get_all_injuries() -> List[Dict]:
-    injuries = get_injuries_cache()
+    """Get NFL injuries, serving stale data while a background refresh runs."""
+    return serve_cached(
+        INJURIES_NAMESPACE,
+        get_injuries_cache_entry(),
+        INJURIES_CACHE_TTL,
+        INJURIES_CACHE_MAX_STALENESS,
+        _refresh_injuries,
+    )
+
+def _refresh_injuries(max_age: Optional[float] = None) -> List[Dict]:
+    """
+    Scrape and cache injuries unless a concurrent refresh already did.
+    
+    Args:
+        max_age: Cached data younger than this many seconds is kept (defaults to the TTL)
+    """
+    injuries = get_injuries_cache(max_age)
     if injuries is not None:
         return injuries
-    injuries = fetch_nfl_injuries()
-    set_injuries_cache(injuries)
+    entry = get_injuries_cache_entry()
+    injuries = fetch_nfl_injuries(conditional=entry is not None)
+    if injuries is None:
+        # ESPN reports the page unchanged: keep the cached data, now fresh again
+        touch_injuries_cache()
+        logger.info("NFL injuries: NOT MODIFIED - extended cache freshness without re-parsing")
+        return entry.data
+    _publish_injuries(injuries, entry)
     return injuries
+
+def _team_key(team_injuries: Any) -> Optional[str]:
+    """Normalized team name of a team's injury record, as the cache store indexes it."""
+    if not isinstance(team_injuries, dict) or not isinstance(team_injuries.get("team"), str):
+        return None
+    return team_injuries["team"].strip().lower()
+
+def _diff_team(team: str, previous: List[Dict], current: List[Dict]) -> List[Dict]:
+    """Player-level changes between two injury lists of one team."""
+    before = {injury.get("player"): injury for injury in previous}
+    after = {injury.get("player"): injury for injury in current}
+    changes = []
+    for player, injury in after.items():
+        old = before.get(player)
+        if old is None:
+            changes.append({"change": "added", "team": team, **injury})
+        elif old != injury:
+            fields = {field: old.get(field) for field in set(old) | set(injury) if old.get(field) != injury.get(field)}
+            changes.append({"change": "changed", "team": team, **injury, "previous": fields})
+    for player, injury in before.items():
+        if player not in after:
+            changes.append({"change": "removed", "team": team, **injury})
+    return changes
+
+def _publish_injuries(injuries: List[Dict], previous: Optional[CacheEntry]) -> None:
+    """
+    Cache freshly scraped injuries and log what changed since the last refresh.
+
+    Teams are compared by the content hash stored with their cached record, so
+    only teams whose injuries changed are rewritten and diffed player by player.
+    """
+    previous_hashes = get_injury_team_hashes() if previous is not None else {}
+    current = {_team_key(team): team for team in injuries if _team_key(team) is not None}
+    changed_teams = [key for key, team in current.items() if previous_hashes.get(key) != record_hash(team)]
+    removed_teams = [key for key in previous_hashes if key not in current]
+
+    set_injuries_cache(injuries)
+    metrics.increment("injury_teams_changed_total", len(changed_teams) + len(removed_teams))
+    logger.info(
+        f"NFL injuries: CACHE UPDATED - stored {len(injuries)} injury records, "
+        f"{len(changed_teams) + len(removed_teams)} teams changed"
+    )
+
+    before = {}
+    if previous is not None:
+        before = {_team_key(team): team for team in previous.data if _team_key(team) is not None}
+    changes = []
+    for key in changed_teams + removed_teams:
+        old, new = before.get(key, {}), current.get(key, {})
+        team = new.get("team") or old.get("team")
+        changes.extend(_diff_team(team, old.get("injuries") or [], new.get("injuries") or []))
+    _log_changes(changes, baseline=previous is None)
+
+def _log_changes(changes: List[Dict], baseline: bool = False) -> None:
+    """
+    Append a refresh's changes to the versioned change log.
+
+    A baseline (nothing cached before) starts a new log whose history begins at
+    its version; refreshes that changed nothing keep the current version.
+    """
+    log = get_injury_change_log()
+    if log is None or baseline:
+        version = (log or {}).get("version", 0) + 1
+        set_injury_change_log({"version": version, "floor": version, "history": []})
+        return
+    if not changes:
+        return
+    version = log["version"] + 1
+    history = log["history"] + [{"version": version, "timestamp": time.time(), "changes": changes}]
+    history = history[-INJURY_CHANGE_HISTORY:]
+    floor = max(log["floor"], history[0]["version"] - 1)
+    set_injury_change_log({"version": version, "floor": floor, "history": history})
+
+def query_injury_changes(since: Optional[int] = None) -> Dict:
+    """
+    Injury changes since a version returned by an earlier call.
+
+    Without `since`, or when it is older than the kept history (or not a
+    version this log issued), every current injury is returned as "added" with
+    full=True, and the client should replace what it holds.
+
+    Returns:
+        {"version": current version, "since": since, "full": bool, "changes": [...]};
+        incremental changes carry the version that introduced them, oldest first
+    """
+    # Read the log before the injuries: a refresh landing in between then gets
+    # re-sent on the next call instead of being labelled as already delivered
+    log = get_injury_change_log() or {"version": 0, "floor": 0, "history": []}
+    injuries = get_all_injuries()
+    version = log["version"]
+    if since is None or since < log["floor"] or since > version:
+        changes = [
+            {"change": "added", "team": team.get("team"), **injury}
+            for team in injuries if isinstance(team, dict)
+            for injury in team.get("injuries") or []
+        ]
+        return {"version": version, "since": since, "full": True, "changes": changes}
+    changes = [
+        {**change, "version": entry["version"]}
+        for entry in log["history"] if entry["version"] > since
+        for change in entry["changes"]
+    ]
+    return {"version": version, "since": since, "full": False, "changes": changes}
+
+def normalize_injury_status(status: str) -> str:
+    """Normalize an injury status for lookup, resolving shorthands like 'IR'."""
+    status = " ".join(status.strip().lower().split())
+    return INJURY_STATUS_ALIASES.get(status, status)
+
+def _team_nickname(team: str) -> str:
+    """Last word of a normalized team name ('kansas city chiefs' -> 'chiefs')."""
+    return team.rsplit(" ", 1)[-1]
+
+class InjuriesSnapshot(NamedTuple):
+    """Cached injuries as flat per-player records, with lookup indexes."""
+    injuries: List[Dict]
+    records: List[Dict]
+    by_team: Dict[str, List[Dict]]
+    by_player: Dict[str, List[Dict]]
+    by_position: Dict[str, List[Dict]]
+    by_status: Dict[str, List[Dict]]
+    by_status_position: Dict[Tuple[str, str], List[Dict]]
+
+# Latest built snapshot; replaced wholesale so readers never see a partial index
+_snapshot: Optional[InjuriesSnapshot] = None
+_snapshot_lock = threading.Lock()
+
+def _build_snapshot(injuries: List[Dict]) -> InjuriesSnapshot:
+    """Flatten injuries to one record per player and index them by team, player, position and status."""
+    records: List[Dict] = []
+    by_team: Dict[str, List[Dict]] = {}
+    by_player: Dict[str, List[Dict]] = {}
+    by_position: Dict[str, List[Dict]] = {}
+    by_status: Dict[str, List[Dict]] = {}
+    by_status_position: Dict[Tuple[str, str], List[Dict]] = {}
+
+    for team_injuries in injuries:
+        team = _team_key(team_injuries)
+        if team is None:
+            continue
+        team_records = by_team.setdefault(team, [])
+        # The nickname ('chiefs') resolves to the same records
+        by_team.setdefault(_team_nickname(team), team_records)
+        for injury in team_injuries.get("injuries") or []:
+            record = {"team": team_injuries["team"], **injury}
+            position = (injury.get("position") or "").strip().upper()
+            status = normalize_injury_status(injury.get("status") or "")
+            records.append(record)
+            team_records.append(record)
+            by_player.setdefault(normalize_player_name(injury.get("player") or ""), []).append(record)
+            by_position.setdefault(position, []).append(record)
+            by_status.setdefault(status, []).append(record)
+            by_status_position.setdefault((status, position), []).append(record)
+
+    return InjuriesSnapshot(injuries, records, by_team, by_player, by_position, by_status, by_status_position)
+
+def get_injuries_snapshot() -> InjuriesSnapshot:
+    """Get the indexed injuries, rebuilding the indexes only when the cached injuries changed."""
+    global _snapshot
+    injuries = get_all_injuries()
+    snapshot = _snapshot
+    if snapshot is not None and snapshot.injuries is injuries:
+        return snapshot
+
+    with _snapshot_lock:
+        snapshot = _snapshot
+        if snapshot is not None and snapshot.injuries is injuries:
+            return snapshot
+        logger.info("NFL injuries data changed, rebuilding indexes")
+        snapshot = _build_snapshot(injuries)
+        _snapshot = snapshot
+    return snapshot
+
+def _summaries(records: List[Dict], details: bool) -> List[Dict]:
+    """Injury records, without the long detail fields unless requested."""
+    if details:
+        return records
+    return [{k: v for k, v in record.items() if k not in INJURY_DETAIL_FIELDS} for record in records]
+
+def get_injuries_by_team(team: str, details: bool = False) -> List[Dict]:
+    """
+    Get one team's injured players, by full team name or nickname (e.g. 'Chiefs').
+    """
+    return _summaries(get_injuries_snapshot().by_team.get(" ".join(team.strip().lower().split()), []), details)
+
+def get_injuries_by_status(status: str, position: Optional[str] = None, details: bool = False) -> List[Dict]:
+    """
+    Get injured players with a status (e.g. 'Questionable', 'Out', 'IR'),
+    optionally only at one position (e.g. 'WR').
+    """
+    snapshot = get_injuries_snapshot()
+    status = normalize_injury_status(status)
+    if position is None:
+        return _summaries(snapshot.by_status.get(status, []), details)
+    return _summaries(snapshot.by_status_position.get((status, position.strip().upper()), []), details)
+
+def get_injury_status_for_players(players: List[str], details: bool = False) -> Dict:
+    """
+    Look up the injury report entries of the given players by name.
+
+    Returns:
+        {"injuries": [...], "not_listed": [requested names with no injury report entry]}
+    """
+    snapshot = get_injuries_snapshot()
+    injuries, not_listed = [], []
+    for name in players:
+        matches = snapshot.by_player.get(normalize_player_name(name))
+        if matches:
+            injuries.extend(matches)
+        else:
+            not_listed.append(name)
+    return {"injuries": _summaries(injuries, details), "not_listed": not_listed}
@@ -1,7 +1,8 @@
 import os
 import json
 import logging
-from typing import List, Dict
+from functools import partial
+from typing import List, Dict, Optional
 from datetime import datetime, timedelta
 from app.scraper.pff_ol_rankings import (
     fetch_pff_ol_rankings,
@@ -9,43 +10,50 @@ from app.scraper.pff_ol_rankings import (
     get_top_ol_rankings,
     get_ol_rankings_by_rank_range
 )
+from app.cache.cache import OL_RANKINGS_NAMESPACE, CacheEntry, get_store
+from app.cache.refresh import serve_cached
+from app.cache.response_cache import register_source, store_version
 
 logger = logging.getLogger(__name__)
 
+register_source(OL_RANKINGS_NAMESPACE, partial(store_version, OL_RANKINGS_NAMESPACE))
+
 # Cache configuration
-CACHE_DIR = "/tmp/pigskin-pickem-cache"
-OL_RANKINGS_CACHE_FILE = os.path.join(CACHE_DIR, "pff_ol_rankings.json")
 CACHE_TTL_HOURS = 48
+CACHE_MAX_STALENESS_HOURS = 24 * 7  # stale data past this age is not served
 
-def get_ol_rankings_cache() -> List[Dict]:
+def get_ol_rankings_cache(max_age: Optional[float] = None) -> List[Dict]:
     """
     Get offensive line rankings from cache if available and not expired.
     
+    Args:
+        max_age: Maximum age in seconds of cached data (defaults to the TTL)
+    
     Returns:
         Cached OL rankings or None if cache miss/expired
     """
     try:
-        if not os.path.exists(OL_RANKINGS_CACHE_FILE):
-            logger.info("OL rankings cache file does not exist")
-            return None
-        
-        # Check file modification time
-        file_mtime = datetime.fromtimestamp(os.path.getmtime(OL_RANKINGS_CACHE_FILE))
-        age = datetime.now() - file_mtime
-        
-        if age > timedelta(hours=CACHE_TTL_HOURS):
-            logger.info(f"OL rankings cache expired (age: {age})")
+        ttl = CACHE_TTL_HOURS * 3600 if max_age is None else max_age
+        rankings = get_store().get_fresh(OL_RANKINGS_NAMESPACE, ttl=ttl)
+        if rankings is None:
+            logger.info("OL rankings cache missing or expired")
             return None
         
-        with open(OL_RANKINGS_CACHE_FILE, 'r') as f:
-            data = json.load(f)
-            logger.info(f"OL rankings cache hit: {len(data)} teams")
-            return data
+        logger.info(f"OL rankings cache hit: {len(rankings)} teams")
+        return rankings
             
     except Exception as e:
         logger.error(f"Error reading OL rankings cache: {e}")
         return None
 
+def get_ol_rankings_cache_entry() -> Optional[CacheEntry]:
+    """Get the cached OL rankings entry, even if expired."""
+    try:
+        return get_store().get_entry(OL_RANKINGS_NAMESPACE)
+    except Exception as e:
+        logger.error(f"Error reading OL rankings cache: {e}")
+        return None
+
 def set_ol_rankings_cache(rankings: List[Dict]) -> None:
     """
     Cache offensive line rankings data.
@@ -54,17 +62,18 @@ def set_ol_rankings_cache(rankings: List[Dict]) -> None:
         rankings: OL rankings data to cache
     """
     try:
-        # Ensure cache directory exists
-        os.makedirs(CACHE_DIR, exist_ok=True)
-        
-        with open(OL_RANKINGS_CACHE_FILE, 'w') as f:
-            json.dump(rankings, f, indent=2)
-        
+        get_store().set_records(
+            OL_RANKINGS_NAMESPACE, rankings, ttl=CACHE_TTL_HOURS * 3600, position_field=None
+        )
         logger.info(f"OL rankings cached: {len(rankings)} teams")
         
     except Exception as e:
         logger.error(f"Error caching OL rankings: {e}")
 
+def touch_ol_rankings_cache() -> None:
+    """Mark the cached OL rankings as fresh without rewriting them."""
+    get_store().touch(OL_RANKINGS_NAMESPACE)
+
 def get_all_ol_rankings() -> List[Dict]:
     """
     Get all offensive line rankings (cached, refreshed every 48h).
@@ -74,16 +83,37 @@ def get_all_ol_rankings() -> List[Dict]:
     """
     logger.info("Fetching offensive line rankings")
     
-    # Try to get from cache first
-    rankings = get_ol_rankings_cache()
+    # Serve from cache (stale entries refresh in the background); on a miss
+    # fetch fresh data, shared with any concurrent callers
+    return serve_cached(
+        OL_RANKINGS_NAMESPACE,
+        get_ol_rankings_cache_entry(),
+        CACHE_TTL_HOURS * 3600,
+        CACHE_MAX_STALENESS_HOURS * 3600,
+        _refresh_ol_rankings,
+    )
+
+def _refresh_ol_rankings(max_age: Optional[float] = None) -> List[Dict]:
+    """
+    Scrape and cache OL rankings unless a concurrent refresh already did.
+    
+    Args:
+        max_age: Cached data younger than this many seconds is kept (defaults to the TTL)
+    
+    Returns:
+        List of all team OL rankings
+    """
+    rankings = get_ol_rankings_cache(max_age)
     if rankings is not None:
-        logger.info("Using cached offensive line rankings")
         return rankings
-    
-    # Cache miss, fetch fresh data
-    logger.info("Cache miss, fetching fresh offensive line rankings")
     try:
-        rankings = fetch_pff_ol_rankings()
+        entry = get_ol_rankings_cache_entry()
+        rankings = fetch_pff_ol_rankings(conditional=entry is not None)
+        if rankings is None:
+            # Article unchanged upstream: extend the cached entry instead of re-parsing
+            touch_ol_rankings_cache()
+            logger.info(f"OL rankings not modified, extended cache freshness for {len(entry.data)} teams")
+            return entry.data
         set_ol_rankings_cache(rankings)
         logger.info(f"Successfully cached {len(rankings)} team OL rankings")
         return rankings
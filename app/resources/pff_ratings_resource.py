@@ -1,60 +1,135 @@
-import pandas as pd
+import csv
+import math
 import os
+import time
 from typing import List, Dict, Optional
 import logging
 from pathlib import Path
+from app import metrics
+from app.cache.cache import file_fingerprint, read_file_cached
 
 logger = logging.getLogger(__name__)
 
 # Path to the PFF CSV file
 PFF_CSV_PATH = Path(__file__).parent.parent.parent / "data" / "pff_ratings.csv"
 
+# Output fields with the CSV column names accepted for each (in priority
+# order) and the value used when none of them is present
+PFF_COLUMN_ALIASES = [
+    ("name", ["Full Name", "name", "player", "player_name"], ""),
+    ("position", ["Position", "position", "pos"], ""),
+    ("team", ["Team Abbreviation", "team", "team_name"], ""),
+    ("overall_rank", ["Overall Rank", "overall", "rating", "grade"], 0),
+    ("position_rank", ["Position Rank", "rank", "position_rank"], None),
+    ("bye_week", ["Bye Week", "bye"], None),
+    ("adp", ["ADP", "adp"], None),
+    ("projected_points", ["Projected Points", "projected_points", "points"], None),
+    ("auction_value", ["Auction Value", "auction_value", "value"], None),
+]
+
+# CSV cell values treated as missing: pandas' default NA markers, as read_csv used them
+PFF_MISSING_VALUES = {
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+    "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null",
+}
+
+def _is_missing(value) -> bool:
+    """Whether a CSV value should be left out of a rating (None, blank, N/A or NaN)."""
+    if value is None or value in PFF_MISSING_VALUES:
+        return True
+    return isinstance(value, float) and math.isnan(value)
+
+def _convert_column(values: List[str]) -> List:
+    """
+    Convert a CSV column to ints, else floats, else leave it as strings.
+    
+    Like pandas type inference, the whole column gets one type, and an int
+    column with missing cells becomes float (pandas has no int NaN); missing
+    cells become None.
+    """
+    present = [v for v in values if not _is_missing(v)]
+    for convert in (int, float):
+        try:
+            for value in present:
+                convert(value)
+        except ValueError:
+            continue
+        if convert is int and len(present) < len(values):
+            convert = float
+        return [None if _is_missing(v) else convert(v) for v in values]
+    return [None if _is_missing(v) else v for v in values]
+
+def _parse_pff_csv(f) -> List[Dict]:
+    """
+    Parse an open PFF CSV export into rating dictionaries.
+    
+    Column aliases are resolved once for the file and each column is converted
+    in bulk, rather than resolving fallbacks row by row.
+    """
+    logger.info(f"Loading PFF ratings from {PFF_CSV_PATH}")
+    started = time.perf_counter()
+    
+    # Skip the export title line and any blank lines before the header
+    rows = csv.reader(f)
+    next(rows, None)
+    rows = [row for row in rows if any(cell.strip() for cell in row)]
+    header, rows = (rows[0], rows[1:]) if rows else ([], [])
+    
+    fields = []
+    columns = []
+    for field, aliases, default in PFF_COLUMN_ALIASES:
+        column = next((alias for alias in aliases if alias in header), None)
+        if column is not None:
+            index = header.index(column)
+            values = _convert_column([row[index] if index < len(row) else "" for row in rows])
+        else:
+            values = [default] * len(rows)
+        if field == "position":
+            values = [v.upper() if isinstance(v, str) else v for v in values]
+        fields.append(field)
+        columns.append(values)
+    
+    ratings = []
+    for row in zip(*columns):
+        # Clean up the data - remove missing values
+        rating = {field: value for field, value in zip(fields, row) if not _is_missing(value)}
+        rating["source"] = "Pro Football Focus"
+        ratings.append(rating)
+    
+    metrics.observe("parse_seconds", time.perf_counter() - started, source="pff_ratings")
+    logger.info(f"Successfully loaded {len(ratings)} PFF ratings")
+    return ratings
+
 def load_pff_ratings() -> List[Dict]:
     """
     Load PFF player ratings from CSV file.
     
+    The parsed ratings are memoized and only re-read when the CSV file changes.
+    
     Returns:
-        List of dictionaries containing player rating data
+        List of dictionaries containing player rating data (shared, read-only)
     """
     try:
-        if not PFF_CSV_PATH.exists():
+        cached = read_file_cached(str(PFF_CSV_PATH), _parse_pff_csv)
+        if cached is None:
             logger.error(f"PFF ratings file not found at {PFF_CSV_PATH}")
             logger.info("Please place your PFF ratings CSV file at: data/pff_ratings.csv")
             return []
-        
-        logger.info(f"Loading PFF ratings from {PFF_CSV_PATH}")
-        
-        # Read CSV with skiprows=1 to skip the empty first line
-        df = pd.read_csv(PFF_CSV_PATH, skiprows=1)
-        
-        # Convert DataFrame to list of dictionaries
-        ratings = []
-        for _, row in df.iterrows():
-            # Handle the specific column structure of the user's CSV
-            rating = {
-                "name": row.get("Full Name", row.get("name", row.get("player", row.get("player_name", "")))),
-                "position": row.get("Position", row.get("position", row.get("pos", ""))).upper(),
-                "team": row.get("Team Abbreviation", row.get("team", row.get("team_name", ""))),
-                "overall_rank": row.get("Overall Rank", row.get("overall", row.get("rating", row.get("grade", 0)))),
-                "position_rank": row.get("Position Rank", row.get("rank", row.get("position_rank", None))),
-                "bye_week": row.get("Bye Week", row.get("bye", None)),
-                "adp": row.get("ADP", row.get("adp", None)),
-                "projected_points": row.get("Projected Points", row.get("projected_points", row.get("points", None))),
-                "auction_value": row.get("Auction Value", row.get("auction_value", row.get("value", None))),
-                "source": "Pro Football Focus"
-            }
-            
-            # Clean up the data - remove None values and empty strings
-            rating = {k: v for k, v in rating.items() if v is not None and v != "" and v != "null" and v != "N/A"}
-            ratings.append(rating)
-        
-        logger.info(f"Successfully loaded {len(ratings)} PFF ratings")
-        return ratings
+        return cached[0]
         
     except Exception as e:
         logger.error(f"Error loading PFF ratings: {e}")
         return []
 
+def get_pff_ratings_fingerprint() -> Optional[tuple]:
+    """
+    Fingerprint of the PFF CSV file; changes whenever the file is modified.
+    
+    Returns:
+        Opaque comparable value, or None if the file does not exist
+    """
+    return file_fingerprint(str(PFF_CSV_PATH))
+
 def get_all_pff_ratings() -> List[Dict]:
     """
     Get all PFF player ratings.
@@ -1,68 +1,101 @@
 import os
 import json
 import logging
-from typing import List, Dict, Optional
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Dict, NamedTuple, Optional, Tuple, Union
 from datetime import datetime, timedelta
 from app.scraper.madden_ratings import fetch_madden_ratings
-from app.resources.pff_ratings_resource import get_all_pff_ratings
+from app.resources.pff_ratings_resource import get_all_pff_ratings, get_pff_ratings_fingerprint
+from app.cache.cache import RATINGS_NAMESPACE, CacheEntry, get_store
+from app.player_names import normalize_player_name
+from app.cache.refresh import serve_cached
+from app.cache.response_cache import register_source, store_version
+from app.pagination import (
+    check_limit,
+    decode_cursor,
+    paginate,
+    project_records,
+    query_token,
+    sort_records,
+    version_token,
+)
 
 logger = logging.getLogger(__name__)
 
 # Cache configuration
-CACHE_DIR = "/tmp/pigskin-pickem-cache"
-MADDEN_CACHE_FILE = os.path.join(CACHE_DIR, "madden_ratings.json")
 CACHE_TTL_HOURS = 48
+CACHE_MAX_STALENESS_HOURS = 24 * 7  # stale data past this age is not served
 
-def get_madden_cache() -> Optional[List[Dict]]:
-    """Get Madden ratings from cache if available and not expired."""
+def get_madden_cache(max_age: Optional[float] = None) -> Optional[List[Dict]]:
+    """Get Madden ratings from cache if younger than max_age seconds (defaults to the TTL)."""
     try:
-        if not os.path.exists(MADDEN_CACHE_FILE):
-            logger.info("Madden cache file does not exist")
+        ttl = CACHE_TTL_HOURS * 3600 if max_age is None else max_age
+        ratings = get_store().get_fresh(RATINGS_NAMESPACE, ttl=ttl)
+        if ratings is None:
+            logger.info("Madden cache missing or expired")
             return None
         
-        # Check file modification time
-        file_mtime = datetime.fromtimestamp(os.path.getmtime(MADDEN_CACHE_FILE))
-        age = datetime.now() - file_mtime
-        
-        if age > timedelta(hours=CACHE_TTL_HOURS):
-            logger.info(f"Madden cache expired (age: {age})")
-            return None
-        
-        with open(MADDEN_CACHE_FILE, 'r') as f:
-            data = json.load(f)
-            logger.info(f"Madden cache hit: {len(data)} players")
-            return data
+        logger.info(f"Madden cache hit: {len(ratings)} players")
+        return ratings
             
     except Exception as e:
         logger.error(f"Error reading Madden cache: {e}")
         return None
 
+def get_madden_cache_entry() -> Optional[CacheEntry]:
+    """Get the cached Madden entry, even if expired."""
+    try:
+        return get_store().get_entry(RATINGS_NAMESPACE)
+    except Exception as e:
+        logger.error(f"Error reading Madden cache: {e}")
+        return None
+
 def set_madden_cache(ratings: List[Dict]) -> None:
-    """Cache Madden ratings data."""
+    """Cache Madden ratings data, one indexed row per player."""
     try:
-        # Ensure cache directory exists
-        os.makedirs(CACHE_DIR, exist_ok=True)
-        
-        with open(MADDEN_CACHE_FILE, 'w') as f:
-            json.dump(ratings, f, indent=2)
-        
+        get_store().set_records(RATINGS_NAMESPACE, ratings, ttl=CACHE_TTL_HOURS * 3600)
         logger.info(f"Madden ratings cached: {len(ratings)} players")
         
     except Exception as e:
         logger.error(f"Error caching Madden ratings: {e}")
 
+def get_cached_madden_ratings(team: Optional[str] = None, position: Optional[str] = None) -> List[Dict]:
+    """
+    Read a subset of the cached Madden ratings without decoding the whole dataset.
+    
+    Args:
+        team: Team name to filter by (case-insensitive)
+        position: Position to filter by (case-insensitive)
+        
+    Returns:
+        Matching cached players, empty if nothing is cached
+    """
+    return get_store().get_records(RATINGS_NAMESPACE, team=team, position=position)
+
 def get_all_madden_ratings() -> List[Dict]:
     """Get all Madden ratings (cached, refreshed every 48h)."""
     logger.info("Fetching Madden ratings")
     
-    # Try to get from cache first
-    ratings = get_madden_cache()
+    # Serve from cache (stale entries refresh in the background); on a miss
+    # fetch fresh data, shared with any concurrent callers
+    return serve_cached(
+        RATINGS_NAMESPACE,
+        get_madden_cache_entry(),
+        CACHE_TTL_HOURS * 3600,
+        CACHE_MAX_STALENESS_HOURS * 3600,
+        _refresh_madden_ratings,
+    )
+
+def _refresh_madden_ratings(max_age: Optional[float] = None) -> List[Dict]:
+    """Crawl and cache Madden ratings unless a concurrent refresh already did.
+    
+    Cached data younger than max_age seconds (defaults to the TTL) is kept.
+    """
+    ratings = get_madden_cache(max_age)
     if ratings is not None:
-        logger.info("Using cached Madden ratings")
         return ratings
-    
-    # Cache miss, fetch fresh data
-    logger.info("Cache miss, fetching fresh Madden ratings")
     try:
         ratings = fetch_madden_ratings()
         set_madden_cache(ratings)
@@ -72,14 +105,6 @@ def get_all_madden_ratings() -> List[Dict]:
         logger.error(f"Error fetching Madden ratings: {e}")
         raise
 
-def normalize_player_name(name: str) -> str:
-    """Normalize player name for matching across sources."""
-    # Remove common suffixes and normalize
-    name = name.strip().lower()
-    name = name.replace(" iii", "").replace(" ii", "").replace(" jr.", "").replace(" sr.", "")
-    name = name.replace("'", "").replace("'", "")  # Handle apostrophes
-    return name
-
 def create_player_key(name: str, position: str) -> str:
     """Create a unique key for a player using name and position."""
     normalized_name = normalize_player_name(name)
@@ -114,16 +139,76 @@ def match_players_by_name(madden_players: List[Dict], pff_players: List[Dict]) -
     
     return player_map
 
+# Memoized combine result keyed by data version, plus counters showing how
+# often the merge actually runs
+_combined: Optional[Tuple[tuple, List[Dict]]] = None
+_combine_lock = threading.Lock()
+_combine_counters = {"recombinations": 0, "memo_hits": 0, "invalidations": 0}
+
 def combine_player_ratings() -> List[Dict]:
     """
     Combine Madden and PFF ratings into unified player objects.
     Each player will have ratings from both sources if available.
+    
+    The result is memoized under the data version (Madden cache time and PFF
+    CSV fingerprint) and only recombined when either input changes.
     """
-    logger.info("Combining Madden and PFF ratings")
+    return _get_combined()[1]
+
+def _madden_is_fresh() -> bool:
+    """Whether the cached Madden entry exists and is within its TTL (a metadata read, no decode)."""
+    meta = get_store().get_meta(RATINGS_NAMESPACE)
+    return meta is not None and time.time() - meta.timestamp <= CACHE_TTL_HOURS * 3600
+
+def _get_combined() -> Tuple[tuple, List[Dict]]:
+    """
+    Memoized (data version, combined players).
+
+    The memo is trusted without loading the sources only while the Madden
+    entry is fresh; otherwise the sources are loaded through the cache, so an
+    expired entry triggers its stale-while-revalidate refresh (or a blocking
+    one past the maximum staleness).
+    """
+    global _combined
+    combined = _combined
+    if combined is not None and _madden_is_fresh() and combined[0] == _ratings_data_version():
+        # Counters are only touched under the lock so concurrent tool calls
+        # don't lose increments
+        with _combine_lock:
+            _combine_counters["memo_hits"] += 1
+        return combined
     
-    # Get ratings from both sources
-    madden_ratings = get_all_madden_ratings()
-    pff_ratings = get_all_pff_ratings()
+    with _combine_lock:
+        madden_ratings, pff_ratings = get_all_madden_ratings(), get_all_pff_ratings()
+        # Read the version only once the sources are loaded, so a cold start
+        # memoizes under the version of the data it combined
+        version = _ratings_data_version()
+        combined = _combined
+        if combined is not None and combined[0] == version:
+            _combine_counters["memo_hits"] += 1
+            return combined
+        combined = (version, _combine_sources(madden_ratings, pff_ratings))
+        _combine_counters["recombinations"] += 1
+        _combined = combined
+    return combined
+
+def invalidate_player_ratings() -> None:
+    """Drop the memoized combined dataset and its indexes, forcing a recombine."""
+    global _combined, _snapshot
+    with _combine_lock:
+        _combined = None
+        _snapshot = None
+        _combine_counters["invalidations"] += 1
+    logger.info("Combined player ratings invalidated")
+
+def get_combine_cache_info() -> Dict:
+    """Counters for the combined ratings memo (recombinations, memo hits, invalidations)."""
+    with _combine_lock:
+        return dict(_combine_counters)
+
+def _combine_sources(madden_ratings: List[Dict], pff_ratings: List[Dict]) -> List[Dict]:
+    """Merge Madden and PFF player lists into unified player objects."""
+    logger.info("Combining Madden and PFF ratings")
     
     logger.info(f"Madden ratings: {len(madden_ratings)} players")
     logger.info(f"PFF ratings: {len(pff_ratings)} players")
@@ -175,60 +260,175 @@ def combine_player_ratings() -> List[Dict]:
     logger.info(f"Combined ratings: {len(combined_players)} unique players")
     return combined_players
 
+class RatingsSnapshot(NamedTuple):
+    """Combined player ratings for one data version, with lookup indexes."""
+    version: tuple
+    token: str
+    players: List[Dict]
+    by_key: Dict[str, Dict]
+    by_position: Dict[str, List[Dict]]
+    by_team: Dict[str, List[Dict]]
+    by_source: Dict[str, List[Dict]]
+
+# Latest published snapshot; replaced wholesale so readers never see a partial index
+_snapshot: Optional[RatingsSnapshot] = None
+_snapshot_lock = threading.Lock()
+# Recently published snapshots by version token, so pagination cursors keep
+# paging the data they started on across a refresh
+SNAPSHOT_HISTORY = 4
+_snapshot_history: "OrderedDict[str, RatingsSnapshot]" = OrderedDict()
+
+def _ratings_data_version() -> tuple:
+    """Version of the combined dataset: Madden content hash and PFF CSV fingerprint."""
+    madden_meta = get_store().get_meta(RATINGS_NAMESPACE)
+    return (madden_meta.content_hash if madden_meta else None, get_pff_ratings_fingerprint())
+
+def _ratings_response_version() -> Optional[tuple]:
+    """Data version of cached ratings responses; None while the Madden entry is missing or expired."""
+    madden_version = store_version(RATINGS_NAMESPACE)
+    return None if madden_version is None else (madden_version, get_pff_ratings_fingerprint())
+
+register_source(RATINGS_NAMESPACE, _ratings_response_version)
+
+def _build_snapshot(version: tuple, players: List[Dict]) -> RatingsSnapshot:
+    """Index combined players by normalized key, position, team and source."""
+    by_key: Dict[str, Dict] = {}
+    by_position: Dict[str, List[Dict]] = {}
+    by_team: Dict[str, List[Dict]] = {}
+    by_source: Dict[str, List[Dict]] = {}
+    
+    for player in players:
+        by_key[create_player_key(player.get("name", ""), player.get("position", ""))] = player
+        by_position.setdefault(player.get("position", "").upper(), []).append(player)
+        by_team.setdefault(player.get("team", "").lower(), []).append(player)
+        seen_sources = set()
+        for rating in player.get("ratings", []):
+            source = rating.get("source", "").lower()
+            if source in seen_sources:
+                continue
+            seen_sources.add(source)
+            # Copy with only the matching source rating
+            filtered_player = player.copy()
+            filtered_player["ratings"] = [rating]
+            by_source.setdefault(source, []).append(filtered_player)
+    
+    return RatingsSnapshot(version, version_token(version), players, by_key, by_position, by_team, by_source)
+
+def get_ratings_snapshot() -> RatingsSnapshot:
+    """
+    Get the indexed combined dataset, rebuilding the indexes only when the
+    combined dataset has been recombined for a new data version.
+    """
+    global _snapshot
+    version, players = _get_combined()
+    snapshot = _snapshot
+    if snapshot is not None and snapshot.players is players:
+        return snapshot
+    
+    with _snapshot_lock:
+        snapshot = _snapshot
+        if snapshot is not None and snapshot.players is players:
+            return snapshot
+        logger.info("Player ratings data changed, rebuilding indexes")
+        snapshot = _build_snapshot(version, players)
+        _snapshot = snapshot
+        _snapshot_history[snapshot.token] = snapshot
+        _snapshot_history.move_to_end(snapshot.token)
+        while len(_snapshot_history) > SNAPSHOT_HISTORY:
+            _snapshot_history.popitem(last=False)
+    return snapshot
+
+def _snapshot_for_cursor(token: str) -> RatingsSnapshot:
+    """The snapshot a cursor was issued against."""
+    with _snapshot_lock:
+        snapshot = _snapshot_history.get(token)
+    if snapshot is None:
+        raise ValueError("Cursor expired: the ratings have been refreshed since; request the first page again")
+    return snapshot
+
+def query_player_ratings(
+    by: Optional[str] = None,
+    value: Optional[str] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    fields: Optional[List[str]] = None,
+    sort_by: Optional[str] = None,
+) -> Union[List[Dict], Dict]:
+    """
+    Query combined player ratings with optional sorting, projection and paging.
+    
+    Args:
+        by: Index to filter on ("source", "position" or "team"), or None for all players
+        value: Value to filter by
+        limit: Page size; with limit or cursor a page envelope is returned
+        cursor: `next_cursor` of the previous page (its page size is kept unless
+            limit is given)
+        fields: Dotted field paths to keep (e.g. ["name", "ratings.overall"])
+        sort_by: Dotted field path to sort by, "-" prefixed for descending
+        
+    Returns:
+        The matching players as a list, or with limit/cursor a dict holding the
+        page under "players", "total", "version" and "next_cursor". Every page
+        of a cursor chain comes from the snapshot the first page was read from.
+    """
+    check_limit(limit)
+    query = query_token(by, value.lower() if isinstance(value, str) else value, sort_by)
+    if cursor:
+        position = decode_cursor(cursor, query)
+        snapshot, offset = _snapshot_for_cursor(position["v"]), position["o"]
+        limit = limit or position["l"]
+    else:
+        snapshot, offset = get_ratings_snapshot(), 0
+    
+    if by is None:
+        players = snapshot.players
+    elif by == "source":
+        players = snapshot.by_source.get(value.lower(), [])
+    elif by == "position":
+        players = snapshot.by_position.get(value.upper(), [])
+    elif by == "team":
+        players = snapshot.by_team.get(value.lower(), [])
+    else:
+        raise ValueError(f"Unknown filter '{by}'")
+    
+    players = sort_records(players, sort_by)
+    if limit is None and not cursor:
+        return project_records(players, fields)
+    return paginate(players, snapshot.token, query, limit, offset, fields, items_key="players")
+
 def get_all_player_ratings() -> List[Dict]:
     """
     Get all player ratings from multiple sources (cached, refreshed every 48h).
     Returns unified player objects with ratings from all available sources.
     """
-    return combine_player_ratings()
+    return get_ratings_snapshot().players
 
 def get_player_ratings_by_source(source: str) -> List[Dict]:
     """
     Get player ratings from a specific source (e.g., 'Madden NFL', 'Pro Football Focus').
     Returns players that have ratings from the specified source.
     """
-    all_players = get_all_player_ratings()
-    source_lower = source.lower()
-    
-    filtered_players = []
-    for player in all_players:
-        for rating in player.get("ratings", []):
-            if rating.get("source", "").lower() == source_lower:
-                # Create a copy with only the matching source rating
-                filtered_player = player.copy()
-                filtered_player["ratings"] = [rating]
-                filtered_players.append(filtered_player)
-                break
-    
-    return filtered_players
+    return get_ratings_snapshot().by_source.get(source.lower(), [])
 
 def get_player_ratings_by_position(position: str) -> List[Dict]:
     """
     Get player ratings filtered by position (e.g., 'QB', 'RB', 'WR', 'TE', 'K', 'DEF').
     Returns players at the specified position with ratings from all sources.
     """
-    all_players = get_all_player_ratings()
-    position_upper = position.upper()
-    
-    return [
-        player for player in all_players 
-        if player.get("position", "").upper() == position_upper
-    ]
+    return get_ratings_snapshot().by_position.get(position.upper(), [])
 
 def get_player_ratings_by_team(team: str) -> List[Dict]:
     """
     Get player ratings filtered by team name.
     Returns players on the specified team with ratings from all sources.
     """
-    all_players = get_all_player_ratings()
-    team_lower = team.lower()
-    
-    return [
-        player for player in all_players 
-        if player.get("team", "").lower() == team_lower
-    ]
-
+    return get_ratings_snapshot().by_team.get(team.lower(), [])
 
+def get_player_rating(name: str, position: str) -> Optional[Dict]:
+    """
+    Get the combined ratings for one player, matched by normalized name and position.
+    """
+    return get_ratings_snapshot().by_key.get(create_player_key(name, position))
 
 def get_player_ratings_stats() -> Dict:
     """
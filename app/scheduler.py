@@ -0,0 +1,224 @@
+import functools
+import logging
+import random
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+from app.cache.cache import CacheEntry
+from app.cache.refresh import refresh_once
+
+logger = logging.getLogger(__name__)
+
+# Keep every scraped source warm from inside the server process: prewarm all
+# sources at startup, then refresh each one ahead of its TTL so tool calls
+# almost never wait on a scrape.
+SCHEDULER_ENABLED = True
+# Refresh once an entry reaches this fraction of its TTL
+REFRESH_AHEAD_FRACTION = 0.8
+# Random head start in seconds (up to this much earlier) per refresh, so
+# sources and server processes do not all refresh at the same moment
+REFRESH_JITTER = 60 * 30
+# The head start is also capped at this fraction of a source's TTL, so short
+# TTLs (e.g. PIGSKIN_INJURIES_TTL during game week) still refresh near their age
+REFRESH_JITTER_TTL_FRACTION = 0.1
+# Random delay in seconds before the startup prewarm
+PREWARM_JITTER = 5.0
+# Maximum sources refreshed at the same time
+SCHEDULER_CONCURRENCY = 2
+# Delay before retrying a source whose refresh failed
+REFRESH_RETRY_DELAY = 60 * 5
+# Upper bound on how long the scheduler sleeps between checks, so refreshes
+# made by tool calls or other processes are picked up
+SCHEDULER_POLL_INTERVAL = 60.0
+
+
+class ScheduledSource(NamedTuple):
+    """A cached data source kept warm by the scheduler."""
+    name: str
+    ttl: float
+    get_entry: Callable[[], Optional[CacheEntry]]
+    refresh: Callable[..., Any]  # accepts max_age, re-checks the cache first
+    warm: Optional[Callable[[], Any]] = None  # builds derived in-memory state
+
+
+def default_sources() -> List[ScheduledSource]:
+    """The scraped sources served by the tools."""
+    from app.cache.cache import INJURIES_CACHE_TTL, INJURIES_NAMESPACE, OL_RANKINGS_NAMESPACE, RATINGS_NAMESPACE
+    from app.resources import nfl_injuries_resource, ol_rankings_resource, player_ratings_resource
+
+    return [
+        ScheduledSource(
+            INJURIES_NAMESPACE,
+            INJURIES_CACHE_TTL,
+            nfl_injuries_resource.get_injuries_cache_entry,
+            nfl_injuries_resource._refresh_injuries,
+        ),
+        ScheduledSource(
+            RATINGS_NAMESPACE,
+            player_ratings_resource.CACHE_TTL_HOURS * 3600,
+            player_ratings_resource.get_madden_cache_entry,
+            player_ratings_resource._refresh_madden_ratings,
+            player_ratings_resource.get_ratings_snapshot,
+        ),
+        ScheduledSource(
+            OL_RANKINGS_NAMESPACE,
+            ol_rankings_resource.CACHE_TTL_HOURS * 3600,
+            ol_rankings_resource.get_ol_rankings_cache_entry,
+            ol_rankings_resource._refresh_ol_rankings,
+        ),
+    ]
+
+
+class RefreshScheduler:
+    """
+    Background thread refreshing cached sources ahead of their TTL.
+
+    Refreshes go through `refresh_once`, so they coalesce with tool-triggered
+    refreshes and hold the cross-process refresh lock.
+    """
+
+    def __init__(
+        self,
+        sources: List[ScheduledSource],
+        concurrency: int = SCHEDULER_CONCURRENCY,
+        refresh_ahead: float = REFRESH_AHEAD_FRACTION,
+        jitter: float = REFRESH_JITTER,
+        prewarm_jitter: float = PREWARM_JITTER,
+        retry_delay: float = REFRESH_RETRY_DELAY,
+        poll_interval: float = SCHEDULER_POLL_INTERVAL,
+    ):
+        self.sources = list(sources)
+        self.concurrency = concurrency
+        self.refresh_ahead = refresh_ahead
+        self.jitter = jitter
+        self.prewarm_jitter = prewarm_jitter
+        self.retry_delay = retry_delay
+        self.poll_interval = poll_interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._running: Dict[str, Future] = {}
+        self._head_start: Dict[str, float] = {}
+        self._retry_at: Dict[str, float] = {}
+
+    def start(self) -> None:
+        """Start the scheduler thread (prewarming every source first)."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="scheduler")
+        self._thread = threading.Thread(target=self._run, name="refresh-scheduler", daemon=True)
+        self._thread.start()
+        logger.info(f"Refresh scheduler started for {', '.join(s.name for s in self.sources)}")
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop scheduling; refreshes already running are left to finish."""
+        self._stop.set()
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join(timeout)
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+        logger.info("Refresh scheduler stopped")
+
+    def _run(self) -> None:
+        if self._stop.wait(random.uniform(0, self.prewarm_jitter)):
+            return
+        delay = self._tick()
+        self._prewarm_fresh()
+        while not self._stop.wait(delay):
+            delay = self._tick()
+
+    def _tick(self) -> float:
+        """Submit every due refresh and return the seconds until the next check."""
+        delay = self.poll_interval
+        for source in self.sources:
+            if self._is_running(source):
+                continue
+            try:
+                due_in = self._due_in(source)
+            except Exception as e:
+                logger.error(f"Scheduler could not read cache for '{source.name}': {e}")
+                due_in = self.retry_delay
+            if due_in <= 0:
+                self._submit(source)
+            else:
+                delay = min(delay, due_in)
+        return max(delay, 0.01)
+
+    def _prewarm_fresh(self) -> None:
+        """Build derived state for sources whose cache is fresh enough to keep."""
+        for source in self.sources:
+            if source.warm is not None and not self._is_running(source):
+                self._executor.submit(self._warm, source)
+
+    def _warm(self, source: ScheduledSource) -> None:
+        try:
+            source.warm()
+        except Exception as e:
+            logger.error(f"Prewarming '{source.name}' failed: {e}")
+
+    def _due_in(self, source: ScheduledSource) -> float:
+        """Seconds until source should be refreshed (<= 0 when due)."""
+        retry_at = self._retry_at.get(source.name)
+        if retry_at is not None:
+            return retry_at - time.time()
+        entry = source.get_entry()
+        if entry is None:
+            return 0.0
+        if source.name not in self._head_start:
+            self._head_start[source.name] = random.uniform(0, self._jitter(source))
+        return self._refresh_age(source) - self._head_start[source.name] - entry.age
+
+    def _refresh_age(self, source: ScheduledSource) -> float:
+        """Age at which source is refreshed ahead of its TTL."""
+        return source.ttl * self.refresh_ahead
+
+    def _jitter(self, source: ScheduledSource) -> float:
+        """Largest random head start for source's refreshes."""
+        return min(self.jitter, source.ttl * REFRESH_JITTER_TTL_FRACTION)
+
+    def _submit(self, source: ScheduledSource) -> None:
+        self._retry_at.pop(source.name, None)
+        self._head_start.pop(source.name, None)
+        max_age = max(self._refresh_age(source) - self._jitter(source), 0.0)
+        self._running[source.name] = self._executor.submit(self._refresh, source, max_age)
+
+    def _is_running(self, source: ScheduledSource) -> bool:
+        future = self._running.get(source.name)
+        return future is not None and not future.done()
+
+    def _refresh(self, source: ScheduledSource, max_age: float) -> None:
+        """Refresh one source, keeping cached data younger than max_age."""
+        started = time.perf_counter()
+        try:
+            refresh_once(source.name, functools.partial(source.refresh, max_age=max_age))
+            if source.warm is not None:
+                source.warm()
+            logger.info(f"Scheduled refresh of '{source.name}' done in {time.perf_counter() - started:.1f}s")
+        except Exception as e:
+            logger.error(f"Scheduled refresh of '{source.name}' failed, retrying in {self.retry_delay:.0f}s: {e}")
+            self._retry_at[source.name] = time.time() + self.retry_delay
+
+
+_scheduler: Optional[RefreshScheduler] = None
+
+
+def start_scheduler(sources: Optional[List[ScheduledSource]] = None) -> RefreshScheduler:
+    """Start the process-wide refresh scheduler."""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = RefreshScheduler(default_sources() if sources is None else sources)
+        _scheduler.start()
+    return _scheduler
+
+
+def stop_scheduler() -> None:
+    """Stop the process-wide refresh scheduler if it is running."""
+    global _scheduler
+    scheduler, _scheduler = _scheduler, None
+    if scheduler is not None:
+        scheduler.stop(timeout=5)
@@ -0,0 +1,236 @@
+import asyncio
+import importlib.util
+import logging
+import threading
+import time
+from typing import Any, Awaitable, Dict, Optional, TypeVar
+from urllib.parse import urlsplit
+
+import httpx
+from app import metrics
+from app.cache.cache import HTTP_VALIDATORS_NAMESPACE, get_store
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Connection pool configuration shared by every scraper
+HTTP_TIMEOUT = 30.0
+MAX_CONNECTIONS = 20
+MAX_KEEPALIVE_CONNECTIONS = 10
+KEEPALIVE_EXPIRY = 60.0
+# HTTP/2 is used when enabled and the optional `h2` package is installed
+HTTP2_ENABLED = True
+# Maximum concurrent requests per host; hosts not listed use the default
+DEFAULT_HOST_CONNECTION_LIMIT = 4
+HOST_CONNECTION_LIMITS: Dict[str, int] = {
+    "www.ea.com": 6,
+}
+
+# Conditional GET validators (ETag / Last-Modified) per URL are persisted in the
+# cache store so they survive restarts alongside the cached data they describe.
+
+# The process-wide client lives on a dedicated event loop thread so that both
+# synchronous scrapers and async crawls share one connection pool.
+_lock = threading.Lock()
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_thread: Optional[threading.Thread] = None
+_client: Optional[httpx.AsyncClient] = None
+_host_semaphores: Dict[str, asyncio.Semaphore] = {}
+_validators: Optional[Dict[str, Dict[str, str]]] = None
+
+
+def _http2_available() -> bool:
+    """Whether HTTP/2 is enabled and its optional dependency is installed."""
+    if not HTTP2_ENABLED:
+        return False
+    if importlib.util.find_spec("h2") is None:
+        logger.info("HTTP/2 disabled: install the 'h2' package to enable it")
+        return False
+    return True
+
+
+def _build_client() -> httpx.AsyncClient:
+    """Create the pooled client used by all scrapers."""
+    return httpx.AsyncClient(
+        timeout=HTTP_TIMEOUT,
+        http2=_http2_available(),
+        follow_redirects=True,
+        limits=httpx.Limits(
+            max_connections=MAX_CONNECTIONS,
+            max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=KEEPALIVE_EXPIRY,
+        ),
+    )
+
+
+def _ensure_loop() -> asyncio.AbstractEventLoop:
+    """Start the HTTP event loop thread on first use."""
+    global _loop, _loop_thread
+    with _lock:
+        if _loop is None:
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=loop.run_forever, name="http-client", daemon=True)
+            thread.start()
+            _loop, _loop_thread = loop, thread
+            logger.info("Started shared HTTP client loop")
+        return _loop
+
+
+def get_client() -> httpx.AsyncClient:
+    """Return the process-wide client, creating it on first use.
+
+    Must be called from coroutines running on the HTTP loop (see `run_http`).
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        _client = _build_client()
+    return _client
+
+
+def _host_semaphore(url: str) -> asyncio.Semaphore:
+    """Per-host concurrency limiter (created on the HTTP loop)."""
+    host = urlsplit(url).hostname or ""
+    semaphore = _host_semaphores.get(host)
+    if semaphore is None:
+        limit = HOST_CONNECTION_LIMITS.get(host, DEFAULT_HOST_CONNECTION_LIMIT)
+        semaphore = _host_semaphores[host] = asyncio.Semaphore(limit)
+    return semaphore
+
+
+async def get(url: str, **kwargs: Any) -> httpx.Response:
+    """GET url through the shared client, honoring the per-host limit.
+
+    Records the fetch duration and response size per host (one per scraped page).
+    """
+    host = urlsplit(url).hostname or ""
+    async with _host_semaphore(url):
+        started = time.perf_counter()
+        try:
+            response = await get_client().get(url, **kwargs)
+        except Exception:
+            metrics.increment("scrape_pages_total", host=host, status="error")
+            raise
+        metrics.observe("scrape_page_seconds", time.perf_counter() - started, host=host)
+    metrics.increment("scrape_pages_total", host=host, status=response.status_code)
+    metrics.observe("scrape_response_bytes", len(response.content), host=host)
+    return response
+
+
+def _read_validators() -> Dict[str, Dict[str, str]]:
+    entry = get_store().get_entry(HTTP_VALIDATORS_NAMESPACE)
+    return dict(entry.data) if entry is not None and entry.data else {}
+
+
+async def _load_validators() -> Dict[str, Dict[str, str]]:
+    """Validators by URL, loaded from the cache store on first use."""
+    global _validators
+    if _validators is None:
+        # Store I/O runs in a thread so it never stalls requests on the HTTP loop
+        loaded = await asyncio.to_thread(_read_validators)
+        if _validators is None:
+            _validators = loaded
+    return _validators
+
+
+async def _save_validators(validators: Dict[str, Dict[str, str]]) -> None:
+    await asyncio.to_thread(get_store().set_entry, HTTP_VALIDATORS_NAMESPACE, dict(validators))
+
+
+async def conditional_get(url: str, revalidate: bool = True, **kwargs: Any) -> Optional[httpx.Response]:
+    """GET url, revalidating with the validators from its last 200 response.
+
+    Sends If-None-Match / If-Modified-Since when validators are known and
+    revalidate is set. Validators of every 200 response are recorded, so an
+    unconditional first fetch already lets the next one revalidate.
+
+    Returns:
+        The response, or None if the server answered 304 Not Modified
+    """
+    validators = await _load_validators()
+    headers = dict(kwargs.pop("headers", None) or {})
+    known = validators.get(url, {})
+    if revalidate and "etag" in known:
+        headers["If-None-Match"] = known["etag"]
+    if revalidate and "last_modified" in known:
+        headers["If-Modified-Since"] = known["last_modified"]
+
+    response = await get(url, headers=headers, **kwargs)
+    if response.status_code == 304:
+        logger.info(f"Not modified since last fetch: {url}")
+        return None
+
+    if response.is_success:
+        fresh = {}
+        if response.headers.get("etag"):
+            fresh["etag"] = response.headers["etag"]
+        if response.headers.get("last-modified"):
+            fresh["last_modified"] = response.headers["last-modified"]
+        if fresh != known:
+            if fresh:
+                validators[url] = fresh
+            else:
+                validators.pop(url, None)
+            await _save_validators(validators)
+    return response
+
+
+def forget_validators(url: str) -> None:
+    """Drop the validators for url so its next conditional GET is unconditional."""
+    run_http(_forget_validators(url))
+
+
+async def _forget_validators(url: str) -> None:
+    validators = await _load_validators()
+    if validators.pop(url, None) is not None:
+        await _save_validators(validators)
+
+
+def run_http(coro: Awaitable[T]) -> T:
+    """Run a coroutine on the HTTP loop and block until it completes."""
+    loop = _ensure_loop()
+    if threading.current_thread() is _loop_thread:
+        raise RuntimeError("run_http() cannot be called from the HTTP loop itself")
+    return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
+
+async def run_http_async(coro: Awaitable[T]) -> T:
+    """Await a coroutine on the HTTP loop from another event loop."""
+    loop = _ensure_loop()
+    return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, loop))
+
+
+def http_get(url: str, **kwargs: Any) -> httpx.Response:
+    """Blocking GET through the shared client."""
+    return run_http(get(url, **kwargs))
+
+
+def http_get_if_modified(url: str, revalidate: bool = True, **kwargs: Any) -> Optional[httpx.Response]:
+    """Blocking conditional GET; returns None on 304 Not Modified.
+
+    With revalidate=False the request is unconditional, but the response's
+    validators are still recorded for the next conditional GET.
+    """
+    return run_http(conditional_get(url, revalidate=revalidate, **kwargs))
+
+
+def close_http_client() -> None:
+    """Close the shared client and stop the HTTP loop thread."""
+    global _loop, _loop_thread, _client
+    with _lock:
+        loop, thread, client = _loop, _loop_thread, _client
+        _loop, _loop_thread, _client = None, None, None
+    if loop is None:
+        return
+    try:
+        if client is not None and not client.is_closed:
+            asyncio.run_coroutine_threadsafe(client.aclose(), loop).result(timeout=10)
+    except Exception as e:
+        logger.warning(f"Error closing shared HTTP client: {e}")
+    finally:
+        _host_semaphores.clear()
+        loop.call_soon_threadsafe(loop.stop)
+        if thread is not None:
+            thread.join(timeout=10)
+        loop.close()
+        logger.info("Shared HTTP client closed")
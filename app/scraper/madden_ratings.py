@@ -1,36 +1,39 @@
+import asyncio
+import hashlib
 import httpx
-from bs4 import BeautifulSoup
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from typing import List, Dict, Optional
 import logging
 import re
+from app import metrics, profiling
+from app.cache.cache import MADDEN_PAGES_NAMESPACE, get_store
+from app.scraper import http_client
 
 logger = logging.getLogger(__name__)
 
 MADDEN_RATINGS_URL = "https://www.ea.com/games/madden-nfl/ratings"
+MADDEN_PAGE_CONCURRENCY = 4  # ratings pages fetched in parallel during a crawl
+# Worker processes parsing page HTML during a crawl, so CPU-bound parsing runs
+# in parallel and off the GIL the tools share; 0 parses in a thread instead
+MADDEN_PARSE_WORKERS = min(MADDEN_PAGE_CONCURRENCY, os.cpu_count() or 1)
+# A crawl interrupted by a failed page resumes from the pages it completed if
+# retried within this many seconds; older progress is discarded
+MADDEN_RESUME_MAX_AGE = 60 * 60 * 6
+CRAWL_PROGRESS_KEY = "crawl"
+# Profiling name of page parses (see app.profiling)
+PARSE_PROFILE_NAME = "parse:madden_ratings"
 
 
 def fetch_madden_ratings() -> List[Dict]:
     """Fetch and parse Madden NFL player ratings from EA's website across all pages."""
     logger.info("Fetching Madden NFL ratings from EA website (all pages)")
 
-    players: List[Dict] = []
-
     try:
-        # Fetch initial/base page first
-        base_players = _fetch_madden_ratings_page(None)
-        logger.info(f"Base page returned {len(base_players)} players")
-        players.extend(base_players)
-
-        # Then iterate subsequent pages using the page query param until no results
-        page = 2
-        while True:
-            page_players = _fetch_madden_ratings_page(page)
-            logger.info(f"Page {page} returned {len(page_players)} players")
-            if not page_players:
-                break
-            players.extend(page_players)
-            page += 1
-
+        players = http_client.run_http(_crawl_madden_ratings(MADDEN_PAGE_CONCURRENCY))
         logger.info(f"Successfully extracted {len(players)} total player ratings across pages")
         return players
 
@@ -39,54 +42,454 @@ def fetch_madden_ratings() -> List[Dict]:
         raise
 
 
-def _fetch_madden_ratings_page(page: Optional[int]) -> List[Dict]:
-    """Fetch a single page of Madden ratings. If page is None, fetch the base page.
-    Returns a list of parsed player dicts. Does not raise on HTTP errors; logs and returns [].
+async def fetch_madden_ratings_async(concurrency: int = MADDEN_PAGE_CONCURRENCY) -> List[Dict]:
+    """Fetch all Madden ratings pages with up to `concurrency` requests in flight.
+
+    The base page is fetched alongside the numbered pages (`?page=2`, `?page=3`, ...),
+    which are crawled until the first page that returns no players. Results are
+    returned in page order, exactly as a serial crawl would produce them.
+
+    Raises:
+        MaddenPageError: If a page fails, rather than returning a truncated crawl,
+            or the base page has no players (e.g. after a markup change)
     """
+    return await http_client.run_http_async(_crawl_madden_ratings(concurrency))
+
+
+class MaddenPageError(Exception):
+    """A ratings page could not be fetched or parsed, so the crawl cannot tell
+    whether more data follows it."""
+
+
+class CrawlProgress:
+    """
+    Pages completed by the current crawl, persisted so an interrupted crawl resumes.
+
+    Each completed page is cached in the store under its page key with the
+    content hash of its HTML and its parsed players. The progress record lists
+    the page keys the running crawl has completed; a crawl that starts while a
+    progress record younger than MADDEN_RESUME_MAX_AGE exists takes those pages
+    from the cache instead of fetching them again.
+
+    Store reads and writes run in threads, off the shared HTTP loop, and pages
+    completed while a progress write is in flight are saved by one next write.
+    """
+
+    def __init__(self, started: float, pages: List[str]):
+        self.started = started
+        self.pages = pages
+        self._saved = len(pages)
+        self._save_lock = asyncio.Lock()
+
+    @classmethod
+    def load(cls) -> "CrawlProgress":
+        """The interrupted crawl to resume, or a new crawl."""
+        entry = get_store().get_entry(MADDEN_PAGES_NAMESPACE, CRAWL_PROGRESS_KEY)
+        if entry is not None and time.time() - entry.data["started"] <= MADDEN_RESUME_MAX_AGE:
+            logger.info(f"Resuming Madden crawl with {len(entry.data['pages'])} pages already done")
+            return cls(entry.data["started"], list(entry.data["pages"]))
+        return cls(time.time(), [])
+
+    async def resumed_players(self, page: Optional[int]) -> Optional[List[Dict]]:
+        """Players of page if this crawl already completed it."""
+        key = _page_key(page)
+        if key not in self.pages:
+            return None
+        cached = await asyncio.to_thread(_cached_page, key)
+        return cached["players"] if cached is not None else None
+
+    async def done(self, page: Optional[int]) -> None:
+        """Record page as completed."""
+        key = _page_key(page)
+        if key in self.pages:
+            return
+        self.pages.append(key)
+        async with self._save_lock:
+            if self._saved == len(self.pages):
+                return  # saved by the write this one waited behind
+            pages = list(self.pages)
+            await asyncio.to_thread(
+                get_store().set_entry,
+                MADDEN_PAGES_NAMESPACE,
+                {"started": self.started, "pages": pages},
+                key=CRAWL_PROGRESS_KEY,
+            )
+            self._saved = len(pages)
+
+    def finish(self) -> None:
+        """Mark the crawl complete: the next one starts from the first page."""
+        get_store().delete(MADDEN_PAGES_NAMESPACE, CRAWL_PROGRESS_KEY)
+
+
+def _page_key(page: Optional[int]) -> str:
+    return "base" if page is None else str(page)
+
+
+def _cached_page(key: str) -> Optional[Dict]:
+    """Last cached parse of a page: its content hash and players."""
+    entry = get_store().get_entry(MADDEN_PAGES_NAMESPACE, key)
+    return entry.data if entry is not None else None
+
+
+async def _crawl_madden_ratings(concurrency: int) -> List[Dict]:
+    """Crawl every ratings page; runs on the shared HTTP client's loop.
+
+    Raises:
+        MaddenPageError: If a page fails, or the base page has no players;
+            pages completed so far are kept for the next crawl to resume from
+    """
+    progress = await asyncio.to_thread(CrawlProgress.load)
+    pool = _start_parse_pool(MADDEN_PARSE_WORKERS)
     try:
-        url = MADDEN_RATINGS_URL if page is None else f"{MADDEN_RATINGS_URL}?page={page}"
-        logger.info(f"Fetching Madden ratings page: {url}")
-        response = httpx.get(url, timeout=30)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, "html.parser")
+        base_task = asyncio.create_task(_crawl_page(None, pool, progress))
+        try:
+            pages = await _crawl_numbered_pages(concurrency, pool, progress)
+        except BaseException:
+            base_task.cancel()
+            await asyncio.gather(base_task, return_exceptions=True)
+            raise
+        base_players = await base_task
+    finally:
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+    if not base_players:
+        # The base page always lists players: none means the markup changed or
+        # the page is broken, not that there is no data to cache
+        raise MaddenPageError("Base ratings page returned no players; refusing to replace the cached ratings")
+    await asyncio.to_thread(progress.finish)
 
-        players: List[Dict] = []
-        player_rows = soup.find_all("tr", class_="Table_row__eoyUr")
-        logger.info(f"Found {len(player_rows)} player rows on current page")
+    logger.info(f"Base page returned {len(base_players)} players")
+    players: List[Dict] = list(base_players)
+    for page_players in pages:
+        players.extend(page_players)
+    return players
 
-        for row in player_rows:
-            try:
-                player_data = extract_player_data(row)
-                if player_data:
-                    players.append(player_data)
-            except Exception as e:
-                logger.warning(f"Error extracting player data from row: {e}")
-                continue
 
-        return players
+async def _crawl_numbered_pages(
+    concurrency: int, pool: Optional[ProcessPoolExecutor] = None, progress: Optional[CrawlProgress] = None
+) -> List[List[Dict]]:
+    """Crawl `?page=N` pages from 2 upwards in a sliding window of `concurrency` requests.
+
+    Once a page comes back empty no further pages are started, in-flight pages
+    beyond it are cancelled, and only the pages before it are returned, in order.
+    A page that fails stops the crawl the same way; its error is raised unless
+    an earlier page turns out to be the end of the data.
+    """
+    results: Dict[int, List[Dict]] = {}
+    in_flight: Dict[asyncio.Task, int] = {}
+    cancelled: List[asyncio.Task] = []
+    next_page = 2
+    end_page: Optional[int] = None  # first page that returned no players
+    failed_page: Optional[int] = None  # first page that failed
+    failure: Optional[MaddenPageError] = None
+
+    try:
+        while True:
+            while len(in_flight) < concurrency and end_page is None and failed_page is None:
+                task = asyncio.create_task(_crawl_page(next_page, pool, progress))
+                in_flight[task] = next_page
+                next_page += 1
+            if not in_flight:
+                break
+
+            done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                page = in_flight.pop(task)
+                try:
+                    page_players = task.result()
+                except MaddenPageError as e:
+                    logger.error(f"Page {page} failed: {e}")
+                    if failed_page is None or page < failed_page:
+                        failed_page, failure = page, e
+                    continue
+                logger.info(f"Page {page} returned {len(page_players)} players")
+                if page_players:
+                    results[page] = page_players
+                elif end_page is None or page < end_page:
+                    end_page = page
 
-    except httpx.RequestError as e:
-        logger.error(f"Network error fetching Madden ratings page {page}: {e}")
+            stops = [page for page in (end_page, failed_page) if page is not None]
+            if stops:
+                # Stop speculative fetches past the end of the data or a failed page
+                for task, page in list(in_flight.items()):
+                    if page > min(stops):
+                        task.cancel()
+                        cancelled.append(task)
+                        del in_flight[task]
+    finally:
+        for task in in_flight:
+            task.cancel()
+            cancelled.append(task)
+        await asyncio.gather(*cancelled, return_exceptions=True)
+
+    if failure is not None and (end_page is None or failed_page < end_page):
+        raise failure
+    return [results[page] for page in sorted(results) if end_page is None or page < end_page]
+
+
+def _madden_page_url(page: Optional[int]) -> str:
+    """URL of a ratings page; page None is the base page."""
+    return MADDEN_RATINGS_URL if page is None else f"{MADDEN_RATINGS_URL}?page={page}"
+
+
+async def _crawl_page(
+    page: Optional[int], pool: Optional[ProcessPoolExecutor], progress: Optional[CrawlProgress]
+) -> List[Dict]:
+    """One page of a crawl: taken from the crawl being resumed, else fetched."""
+    if progress is not None:
+        players = await progress.resumed_players(page)
+        if players is not None:
+            metrics.increment("madden_pages_total", result="resumed")
+            return players
+    players = await _fetch_madden_ratings_page_async(page, pool)
+    if progress is not None and players:
+        await progress.done(page)
+    return players
+
+
+async def _fetch_madden_ratings_page_async(
+    page: Optional[int], pool: Optional[ProcessPoolExecutor] = None
+) -> List[Dict]:
+    """Fetch a single page of Madden ratings on the shared HTTP loop; page None is the base page.
+    Returns a list of parsed player dicts, empty past the end of the data.
+
+    The page is parsed in pool when one is given, unless its HTML is identical
+    to the last cached parse of the page, whose players are then reused.
+    A 200 page without player rows or a 404 marks the end of the data.
+
+    Raises:
+        MaddenPageError: If the page could not be fetched or parsed
+    """
+    url = _madden_page_url(page)
+    logger.info(f"Fetching Madden ratings page: {url}")
+    try:
+        response = await http_client.get(url, timeout=30)
+    except Exception as e:
+        raise MaddenPageError(f"Error fetching Madden ratings page {page}: {e}") from e
+    if response.status_code == 404:
+        logger.info(f"Madden ratings page {page} not found: end of data")
         return []
+    try:
+        response.raise_for_status()
     except httpx.HTTPStatusError as e:
-        logger.error(f"HTTP error fetching Madden ratings page {page}: {e}")
-        return []
+        raise MaddenPageError(f"HTTP error fetching Madden ratings page {page}: {e}") from e
+
+    html = response.text
+    content_hash = hashlib.sha256(html.encode("utf-8")).hexdigest()
+    key = _page_key(page)
+    cached = await asyncio.to_thread(_cached_page, key)
+    if cached is not None and cached["content_hash"] == content_hash:
+        metrics.increment("madden_pages_total", result="unchanged")
+        return cached["players"]
+
+    try:
+        with metrics.timed("parse_seconds", source="madden_ratings"):
+            players = await _parse_in_pool(pool, html)
     except Exception as e:
-        logger.error(f"Unexpected error fetching page {page}: {e}")
-        return []
+        raise MaddenPageError(f"Error parsing Madden ratings page {page}: {e}") from e
+    metrics.increment("madden_pages_total", result="parsed")
+    if players:
+        await asyncio.to_thread(
+            get_store().set_entry, MADDEN_PAGES_NAMESPACE, {"content_hash": content_hash, "players": players}, key=key
+        )
+    return players
+
+
+def _start_parse_pool(workers: int) -> Optional[ProcessPoolExecutor]:
+    """
+    Process pool for one crawl's page parsing, or None to parse in-process.
+
+    The pool lives only as long as its crawl. Each crawl therefore pays for
+    spawning workers that re-import the app, which overlaps the first page
+    fetches. Crawls are roughly two days apart, and that cost is cheaper than
+    keeping the worker processes resident in between.
+    """
+    if workers <= 0:
+        return None
+    try:
+        # Spawned rather than forked: the server process runs the HTTP loop
+        # and tool worker threads, whose held locks a fork would copy
+        return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+    except (OSError, ValueError) as e:
+        logger.warning(f"Could not start Madden parse workers, parsing in-process: {e}")
+        return None
+
+
+def _parse_page(html: str, profile: Optional[Dict] = None) -> List[Dict]:
+    """Parse a page, under the profiler when the server sampled it (profile is its profiling config)."""
+    if profile is not None:
+        return profiling.profile_in_process(profile, PARSE_PROFILE_NAME, _parse_madden_ratings_html, html)
+    return _parse_madden_ratings_html(html)
+
+
+async def _parse_in_pool(pool: Optional[ProcessPoolExecutor], html: str) -> List[Dict]:
+    """
+    Parse a page in pool, falling back to a thread if there is no usable pool.
+
+    Never parses on the calling (HTTP) loop itself, which would stall every
+    other request sharing it for the length of a parse.
+    """
+    profile = profiling.current_config() if profiling.should_profile(PARSE_PROFILE_NAME) else None
+    if pool is not None:
+        try:
+            return await asyncio.get_running_loop().run_in_executor(pool, _parse_page, html, profile)
+        except (BrokenProcessPool, RuntimeError) as e:
+            logger.warning(f"Madden parse worker unavailable, parsing in-process: {e}")
+    return await asyncio.to_thread(_parse_page, html, profile)
+
+
+# Class names of the EA ratings table
+PLAYER_ROW_CLASS = "Table_row__eoyUr"
+PLAYER_NAME_CLASS = "Table_profileLabel__tuyG0"
+PLAYER_POSITION_CLASS = "Table_tag__vKZKn"
+PLAYER_OVERALL_CLASS = "Table_statCellValue__zn5Cx"
+# Start of the first player row; the fast path only tokenizes the page from here
+PLAYER_ROW_START_PATTERN = re.compile(r"<tr\b[^>]*\b" + PLAYER_ROW_CLASS)
+
+TEAM_NAME_PATTERN = re.compile(r"([A-Za-z\s]+(?:Bills|Dolphins|Patriots|Jets|Ravens|Bengals|Browns|Steelers|Texans|Colts|Jaguars|Titans|Broncos|Chiefs|Raiders|Chargers|Cowboys|Giants|Eagles|Commanders|Bears|Lions|Packers|Vikings|Falcons|Panthers|Saints|Buccaneers|Cardinals|Rams|49ers|Seahawks))")
+NFL_TEAMS = [
+    "Buffalo Bills", "Miami Dolphins", "New England Patriots", "New York Jets",
+    "Baltimore Ravens", "Cincinnati Bengals", "Cleveland Browns", "Pittsburgh Steelers",
+    "Houston Texans", "Indianapolis Colts", "Jacksonville Jaguars", "Tennessee Titans",
+    "Denver Broncos", "Kansas City Chiefs", "Las Vegas Raiders", "Los Angeles Chargers",
+    "Dallas Cowboys", "New York Giants", "Philadelphia Eagles", "Washington Commanders",
+    "Chicago Bears", "Detroit Lions", "Green Bay Packers", "Minnesota Vikings",
+    "Atlanta Falcons", "Carolina Panthers", "New Orleans Saints", "Tampa Bay Buccaneers",
+    "Arizona Cardinals", "Los Angeles Rams", "San Francisco 49ers", "Seattle Seahawks",
+]
+# Team image alt text -> team name. Seeded with the 32 team names, which is
+# what EA's alt text holds; other alt texts are resolved with
+# TEAM_NAME_PATTERN once and remembered (up to TEAM_LOOKUP_MAX_SIZE entries)
+TEAM_LOOKUP_MAX_SIZE = 1024
+_team_lookup: Dict[str, str] = {team: team for team in NFL_TEAMS}
+
+
+def team_from_alt_text(alt_text: str) -> str:
+    """Team name in a team image's alt text, "Unknown" if there is none."""
+    team = _team_lookup.get(alt_text)
+    if team is None:
+        team_match = TEAM_NAME_PATTERN.search(alt_text)
+        team = team_match.group(1).strip() if team_match else "Unknown"
+        if len(_team_lookup) < TEAM_LOOKUP_MAX_SIZE:
+            _team_lookup[alt_text] = team
+    return team
+
+
+def _parse_madden_ratings_html(html: str) -> List[Dict]:
+    """Parse the player rows of one ratings page.
+
+    Uses the fast path, which only builds the player rows, and falls back to
+    parsing the whole page when it finds no rows (e.g. after a markup change).
+    """
+    players = _parse_madden_rows_fast(html)
+    if players is None:
+        players = _parse_madden_ratings_html_full(html)
+    return players
+
+
+def _parse_madden_rows_fast(html: str) -> Optional[List[Dict]]:
+    """Parse only the player rows of a page; None if the page has none.
+
+    The page is cut down to the span from the first player row to the last
+    closing row tag, and only the player rows within it are built.
+    """
+    from bs4 import BeautifulSoup, SoupStrainer  # imported on first parse to keep server startup fast
+    first_row = PLAYER_ROW_START_PATTERN.search(html)
+    if first_row is None:
+        return None
+    rows_html = html[first_row.start():html.rfind("</tr>") + len("</tr>")]
+    rows = BeautifulSoup(rows_html, "html.parser", parse_only=SoupStrainer("tr", class_=PLAYER_ROW_CLASS))
+    player_rows = rows.find_all("tr", class_=PLAYER_ROW_CLASS)
+    if not player_rows:
+        return None
+    logger.info(f"Found {len(player_rows)} player rows on current page")
+
+    players: List[Dict] = []
+    for row in player_rows:
+        try:
+            player_data = _extract_player_data_fast(row)
+            if player_data:
+                players.append(player_data)
+        except Exception as e:
+            logger.warning(f"Error extracting player data from row: {e}")
+            continue
+
+    return players
+
+
+def _parse_madden_ratings_html_full(html: str) -> List[Dict]:
+    """Parse the player rows of one ratings page from a tree of the whole page."""
+    from bs4 import BeautifulSoup  # imported on first parse to keep server startup fast
+    soup = BeautifulSoup(html, "html.parser")
+
+    players: List[Dict] = []
+    player_rows = soup.find_all("tr", class_=PLAYER_ROW_CLASS)
+    logger.info(f"Found {len(player_rows)} player rows on current page")
+
+    for row in player_rows:
+        try:
+            player_data = extract_player_data(row)
+            if player_data:
+                players.append(player_data)
+        except Exception as e:
+            logger.warning(f"Error extracting player data from row: {e}")
+            continue
+
+    return players
+
+
+def _extract_player_data_fast(row) -> Optional[Dict]:
+    """Single-pass equivalent of `extract_player_data`: one walk over the row's tags."""
+    name_element = position_element = ovr_element = team_img = None
+    for element in row.find_all(True):
+        if element.name == "span":
+            classes = element.get("class") or ()
+            if name_element is None and PLAYER_NAME_CLASS in classes:
+                name_element = element
+            if position_element is None and PLAYER_POSITION_CLASS in classes:
+                position_element = element
+            if ovr_element is None and PLAYER_OVERALL_CLASS in classes:
+                ovr_element = element
+        elif element.name == "img" and team_img is None and element.get("alt") is not None:
+            team_img = element
+
+    if not name_element:
+        return None
+    name = name_element.text.strip()
+    position = position_element.text.strip() if position_element else "Unknown"
+    alt_text = team_img.get("alt") if team_img else None
+    team = team_from_alt_text(alt_text) if alt_text else "Unknown"
+
+    overall = None
+    if ovr_element:
+        try:
+            overall = int(ovr_element.text.strip())
+        except ValueError:
+            logger.warning(f"Could not parse overall rating for {name}: {ovr_element.text}")
+
+    if not name or overall is None:
+        return None
+
+    return {
+        "name": name,
+        "position": position,
+        "team": team,
+        "overall": overall,
+        "source": "Madden NFL"
+    }
 
 
 def extract_player_data(row) -> Optional[Dict]:
     """Extract player data from a table row."""
     try:
         # Extract player name
-        name_element = row.find("span", class_="Table_profileLabel__tuyG0")
+        name_element = row.find("span", class_=PLAYER_NAME_CLASS)
         if not name_element:
             return None
         name = name_element.text.strip()
 
         # Extract position
-        position_element = row.find("span", class_="Table_tag__vKZKn")
+        position_element = row.find("span", class_=PLAYER_POSITION_CLASS)
         position = position_element.text.strip() if position_element else "Unknown"
 
         # Extract team (from alt text of team image)
@@ -95,12 +498,12 @@ def extract_player_data(row) -> Optional[Dict]:
         if team_img and team_img.get("alt"):
             alt_text = team_img.get("alt")
             # Extract team name from alt text (e.g., "Buffalo Bills" from alt text)
-            team_match = re.search(r"([A-Za-z\s]+(?:Bills|Dolphins|Patriots|Jets|Ravens|Bengals|Browns|Steelers|Texans|Colts|Jaguars|Titans|Broncos|Chiefs|Raiders|Chargers|Cowboys|Giants|Eagles|Commanders|Bears|Lions|Packers|Vikings|Falcons|Panthers|Saints|Buccaneers|Cardinals|Rams|49ers|Seahawks))", alt_text)
+            team_match = TEAM_NAME_PATTERN.search(alt_text)
             if team_match:
                 team = team_match.group(1).strip()
 
         # Extract overall rating (OVR)
-        ovr_element = row.find("span", class_="Table_statCellValue__zn5Cx")
+        ovr_element = row.find("span", class_=PLAYER_OVERALL_CLASS)
         overall = None
         if ovr_element:
             try:
@@ -1,14 +1,31 @@
-import httpx
-from bs4 import BeautifulSoup
-from typing import List, Dict
+from typing import List, Dict, Optional
+from app import metrics
+from app.scraper.http_client import forget_validators, http_get_if_modified
 
 ESPN_INJURIES_URL = "https://www.espn.com/nfl/injuries"
 
-def fetch_nfl_injuries() -> List[Dict]:
-    """Fetch and parse NFL injuries from ESPN."""
-    response = httpx.get(ESPN_INJURIES_URL, timeout=10)
+def fetch_nfl_injuries(conditional: bool = False) -> Optional[List[Dict]]:
+    """Fetch and parse NFL injuries from ESPN.
+
+    With conditional=True the request is revalidated against the previous
+    response and None is returned, without parsing, if the page is unchanged.
+    """
+    response = http_get_if_modified(ESPN_INJURIES_URL, revalidate=conditional, timeout=10)
+    if response is None:
+        return None
     response.raise_for_status()
-    soup = BeautifulSoup(response.text, "html.parser")
+    try:
+        with metrics.timed("parse_seconds", source="nfl_injuries"):
+            return _parse_injuries_html(response.text)
+    except Exception:
+        # Don't let a later 304 vouch for a page we never managed to parse
+        forget_validators(ESPN_INJURIES_URL)
+        raise
+
+def _parse_injuries_html(html: str) -> List[Dict]:
+    """Parse the per-team injury tables of the ESPN injuries page."""
+    from bs4 import BeautifulSoup  # imported on first parse to keep server startup fast
+    soup = BeautifulSoup(html, "html.parser")
     teams = []
     for team_section in soup.select(".Table__Title, .Table__Scroller"):
         if 'Table__Title' in team_section.get('class', []):
@@ -1,26 +1,47 @@
-import httpx
 import logging
-from bs4 import BeautifulSoup
-from typing import List, Dict
+from typing import List, Dict, Optional
 import re
+import time
+from app import metrics
+from app.scraper.http_client import forget_validators, http_get_if_modified
 
 logger = logging.getLogger(__name__)
 
-def fetch_pff_ol_rankings() -> List[Dict]:
+PFF_OL_RANKINGS_URL = "https://www.pff.com/news/nfl-2025-nfl-offensive-line-rankings"
+
+
+class OLRankingsError(Exception):
+    """The PFF article could not be fetched or yielded no rankings, so there is
+    nothing to replace the cached rankings with."""
+
+
+def fetch_pff_ol_rankings(conditional: bool = False) -> Optional[List[Dict]]:
     """
     Scrape PFF offensive line rankings from their website.
     
+    Args:
+        conditional: Revalidate against the previous response (ETag / Last-Modified)
+        
     Returns:
-        List of dictionaries containing team OL rankings and details
+        List of dictionaries containing team OL rankings and details, or None
+        if conditional and the article has not changed since the last fetch
+
+    Raises:
+        OLRankingsError: If the article could not be fetched or parsed, or
+            listed no teams (e.g. after a markup change)
     """
-    url = "https://www.pff.com/news/nfl-2025-nfl-offensive-line-rankings"
+    url = PFF_OL_RANKINGS_URL
     
     try:
         logger.info(f"Fetching PFF offensive line rankings from {url}")
         
-        with httpx.Client(timeout=30.0) as client:
-            response = client.get(url)
-            response.raise_for_status()
+        response = http_get_if_modified(url, revalidate=conditional, timeout=30.0)
+        if response is None:
+            logger.info("PFF offensive line rankings not modified, skipping parse")
+            return None
+        response.raise_for_status()
+        parse_started = time.perf_counter()
+        from bs4 import BeautifulSoup  # imported on first parse to keep server startup fast
             
         soup = BeautifulSoup(response.text, 'html.parser')
         
@@ -110,12 +131,19 @@ def fetch_pff_ol_rankings() -> List[Dict]:
             
             teams.append(team_data)
         
+        metrics.observe("parse_seconds", time.perf_counter() - parse_started, source="ol_rankings")
+        if not teams:
+            raise OLRankingsError("PFF offensive line rankings article listed no teams")
         logger.info(f"Successfully scraped {len(teams)} team offensive line rankings")
         return teams
         
     except Exception as e:
         logger.error(f"Error fetching PFF offensive line rankings: {e}")
-        return []
+        # Don't let a later 304 vouch for a page we never managed to parse
+        forget_validators(url)
+        if isinstance(e, OLRankingsError):
+            raise
+        raise OLRankingsError(f"Error fetching PFF offensive line rankings: {e}") from e
 
 def get_ol_rankings_by_team(team_name: str) -> Dict:
     """
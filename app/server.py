@@ -1,12 +1,18 @@
+import asyncio
+import time
 from fastmcp import FastMCP, Context
-from app.scraper.nfl_injuries import fetch_nfl_injuries
-from app.cache.cache import get_cache, set_cache
+from fastmcp.server.middleware import Middleware
+from app.resources.nfl_injuries_resource import (
+    get_all_injuries,
+    get_injuries_by_status as query_injuries_by_status,
+    get_injuries_by_team as query_injuries_by_team,
+    get_injury_status_for_players as query_injury_status_for_players,
+    query_injury_changes,
+)
 from app.resources.player_ratings_resource import (
-    get_all_player_ratings, 
-    get_player_ratings_by_source as get_ratings_by_source,
-    get_player_ratings_by_position as get_ratings_by_position,
-    get_player_ratings_by_team as get_ratings_by_team,
-    get_player_ratings_stats
+    get_combine_cache_info,
+    get_player_ratings_stats,
+    query_player_ratings,
 )
 from app.resources.ol_rankings_resource import (
     get_all_ol_rankings,
@@ -15,7 +21,14 @@ from app.resources.ol_rankings_resource import (
     get_ol_rankings_by_rank_range_cached,
     get_ol_rankings_stats
 )
-from typing import List, Dict
+from app.scraper.http_client import close_http_client
+from app.execution import run_blocking, set_max_workers, shutdown_executor
+from app.columnar import check_format, encode_response
+from app import metrics
+from app.cache import response_cache
+from app.cache.cache import INJURIES_NAMESPACE, OL_RANKINGS_NAMESPACE, RATINGS_NAMESPACE
+from app.scheduler import SCHEDULER_ENABLED, start_scheduler, stop_scheduler
+from typing import List, Dict, Optional, Union
 import logging
 
 # Configure logging
@@ -24,105 +37,352 @@ logger = logging.getLogger(__name__)
 
 mcp = FastMCP("FantasyFootballAssistant")
 
-@mcp.tool()
-async def get_nfl_injuries(ctx: Context) -> List[Dict]:
+def _response_size(result) -> int:
+    """Serialized size in bytes of a tool result's text content."""
+    return sum(len(block.text.encode("utf-8")) for block in result.content if hasattr(block, "text"))
+
+class ToolMetricsMiddleware(Middleware):
+    """Count tool calls and record their latency and serialized response size."""
+
+    async def on_call_tool(self, context, call_next):
+        tool = context.message.name
+        started = time.perf_counter()
+        try:
+            result = await call_next(context)
+        except Exception:
+            metrics.increment("tool_calls_total", tool=tool, status="error")
+            raise
+        finally:
+            metrics.observe("tool_duration_seconds", time.perf_counter() - started, tool=tool)
+        metrics.increment("tool_calls_total", tool=tool, status="ok")
+        metrics.observe("tool_response_bytes", _response_size(result), tool=tool)
+        return result
+
+# Read-only tools whose encoded responses are cached, by the data source they read
+CACHED_TOOL_SOURCES = {
+    "get_nfl_injuries": INJURIES_NAMESPACE,
+    "get_injury_changes": INJURIES_NAMESPACE,
+    "get_injuries_by_team": INJURIES_NAMESPACE,
+    "get_injuries_by_status": INJURIES_NAMESPACE,
+    "get_injury_status_for_players": INJURIES_NAMESPACE,
+    "get_player_ratings": RATINGS_NAMESPACE,
+    "get_player_ratings_by_source": RATINGS_NAMESPACE,
+    "get_player_ratings_by_position": RATINGS_NAMESPACE,
+    "get_player_ratings_by_team": RATINGS_NAMESPACE,
+    "get_player_ratings_stats": RATINGS_NAMESPACE,
+    "get_ol_rankings": OL_RANKINGS_NAMESPACE,
+    "get_ol_rankings_by_team": OL_RANKINGS_NAMESPACE,
+    "get_top_ol_rankings": OL_RANKINGS_NAMESPACE,
+    "get_ol_rankings_by_rank_range": OL_RANKINGS_NAMESPACE,
+    "get_ol_rankings_stats": OL_RANKINGS_NAMESPACE,
+}
+
+class ResponseCacheMiddleware(Middleware):
+    """Serve repeated read-only tool calls on unchanged data from the encoded response cache."""
+
+    async def on_call_tool(self, context, call_next):
+        tool = context.message.name
+        source = CACHED_TOOL_SOURCES.get(tool)
+        if source is None:
+            return await call_next(context)
+        # Version reads hit SQLite (and stat the PFF CSV): keep them off the event loop
+        version = await asyncio.to_thread(response_cache.data_version, source)
+        if version is None:
+            # Nothing fresh cached: let the tool serve and refresh the source
+            metrics.increment("response_cache_requests_total", tool=tool, result="bypass")
+            return await call_next(context)
+        
+        key = (source, tool, response_cache.normalize_arguments(context.message.arguments), version)
+        cache = response_cache.get_response_cache()
+        result = cache.get(key)
+        if result is not None:
+            metrics.increment("response_cache_requests_total", tool=tool, result="hit")
+            return result
+        metrics.increment("response_cache_requests_total", tool=tool, result="miss")
+        result = await call_next(context)
+        # Keep the response only if no refresh landed while the tool ran
+        if await asyncio.to_thread(response_cache.read_version, source) == version:
+            cache.put(key, result, _response_size(result))
+        return result
+
+mcp.add_middleware(ToolMetricsMiddleware())
+mcp.add_middleware(ResponseCacheMiddleware())
+
+# Compact response encoding shared by the tabular tools
+FORMAT_HELP = (
+    " Optional: format='columnar' returns {columns, rows} with column names listed once,"
+    " nulls elided and repeated strings coded against `dictionaries`; nested lists"
+    " become `children` tables whose `parent` holds the owning row index."
+)
+
+def _formatted(fn, format: str, *args, items_key: Optional[str] = None, **kwargs):
+    """Call fn and encode its result in the requested response format."""
+    check_format(format)
+    return encode_response(fn(*args, **kwargs), format, items_key=items_key)
+
+def _served_count(result: Union[List[Dict], Dict], items_key: str = "players") -> int:
+    """Number of records in a tool result, paged or not, in either format."""
+    if isinstance(result, dict):
+        result = result.get(items_key, result)
+    return len(result["rows"]) if isinstance(result, dict) else len(result)
+
+@mcp.tool(description="Get the latest NFL injuries (cached, refreshed every 24h)." + FORMAT_HELP)
+async def get_nfl_injuries(ctx: Context, format: str = "records") -> Union[List[Dict], Dict]:
     """Get the latest NFL injuries (cached, refreshed every 24h)."""
-    logger.info("Tool called: get_nfl_injuries")
-    injuries = get_cache()
-    if injuries is None:
-        logger.info("NFL injuries: CACHE MISS - fetching fresh data from website")
-        injuries = fetch_nfl_injuries()
-        set_cache(injuries)
-        logger.info(f"NFL injuries: CACHE UPDATED - stored {len(injuries)} injury records")
-    else:
-        logger.info(f"NFL injuries: CACHE HIT - serving {len(injuries)} cached injury records")
+    logger.info(f"Tool called: get_nfl_injuries (format={format})")
+    injuries = await run_blocking("get_nfl_injuries", _formatted, get_all_injuries, format)
+    logger.info(f"NFL injuries: served {_served_count(injuries)} team injury reports (cache status logged by resource)")
     return injuries
 
-@mcp.tool()
-async def get_player_ratings(ctx: Context) -> List[Dict]:
+@mcp.tool(description=(
+    "Get NFL injury changes since a version returned by an earlier call: players added,"
+    " changed (with the previous values of the changed fields) or removed, and the current"
+    " version to pass as `since` next time. Without `since`, or when it is too old, returns"
+    " every current injury as 'added' with full=true."
+))
+async def get_injury_changes(ctx: Context, since: Optional[int] = None) -> Dict:
+    """Get NFL injury changes since a change log version."""
+    logger.info(f"Tool called: get_injury_changes (since={since})")
+    changes = await run_blocking("get_injury_changes", query_injury_changes, since)
+    logger.info(f"NFL injuries: served {len(changes['changes'])} changes up to version {changes['version']}")
+    return changes
+
+INJURY_DETAILS_HELP = " Entries omit ESPN's status update text unless details=true."
+
+@mcp.tool(description="Get one team's injured players, by full team name or nickname (e.g. 'Chiefs')." + INJURY_DETAILS_HELP)
+async def get_injuries_by_team(ctx: Context, team: str, details: bool = False) -> List[Dict]:
+    """Get one team's injured players."""
+    logger.info(f"Tool called: get_injuries_by_team (team={team})")
+    injuries = await run_blocking("get_injuries_by_team", query_injuries_by_team, team, details)
+    logger.info(f"NFL injuries: served {len(injuries)} injuries for team {team}")
+    return injuries
+
+@mcp.tool(description=(
+    "Get injured players with a status (e.g. 'Questionable', 'Doubtful', 'Out', 'IR'),"
+    " optionally at one position (e.g. 'WR' for all questionable WRs)."
+) + INJURY_DETAILS_HELP)
+async def get_injuries_by_status(ctx: Context, status: str, position: Optional[str] = None, details: bool = False) -> List[Dict]:
+    """Get injured players with a status, optionally at one position."""
+    logger.info(f"Tool called: get_injuries_by_status (status={status}, position={position})")
+    injuries = await run_blocking("get_injuries_by_status", query_injuries_by_status, status, position, details)
+    logger.info(f"NFL injuries: served {len(injuries)} injuries with status {status}")
+    return injuries
+
+@mcp.tool(description=(
+    "Get the injury report entries of the given players by name; players absent from the"
+    " injury report are listed under not_listed."
+) + INJURY_DETAILS_HELP)
+async def get_injury_status_for_players(ctx: Context, players: List[str], details: bool = False) -> Dict:
+    """Get the injury report entries of the given players."""
+    logger.info(f"Tool called: get_injury_status_for_players ({len(players)} players)")
+    result = await run_blocking("get_injury_status_for_players", query_injury_status_for_players, players, details)
+    logger.info(f"NFL injuries: {len(result['injuries'])} injuries for {len(players)} requested players")
+    return result
+
+# Paging, projection and sorting options shared by the player ratings tools
+RATINGS_QUERY_HELP = (
+    " Optional: limit (page size, max 500) and cursor (next_cursor of the previous page)"
+    " return a page envelope {players, total, version, next_cursor}; fields keeps only the"
+    " given dotted paths (e.g. ['name', 'team', 'ratings.source', 'ratings.overall']);"
+    " sort_by orders by a dotted path, '-' prefix for descending (e.g. '-ratings.overall')."
+) + FORMAT_HELP
+
+@mcp.tool(description="Get all player ratings from multiple sources (Madden NFL + PFF) with ratings from all available sources for each player." + RATINGS_QUERY_HELP)
+async def get_player_ratings(
+    ctx: Context,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    fields: Optional[List[str]] = None,
+    sort_by: Optional[str] = None,
+    format: str = "records",
+) -> Union[List[Dict], Dict]:
     """Get all player ratings from multiple sources (Madden NFL + PFF) with ratings from all available sources for each player."""
-    logger.info("Tool called: get_player_ratings")
-    ratings = get_all_player_ratings()
-    logger.info(f"Player ratings: served {len(ratings)} players with unified ratings from all sources")
+    logger.info(f"Tool called: get_player_ratings (limit={limit}, cursor={'yes' if cursor else 'no'}, sort_by={sort_by})")
+    ratings = await run_blocking(
+        "get_player_ratings", _formatted, query_player_ratings, format, items_key="players",
+        limit=limit, cursor=cursor, fields=fields, sort_by=sort_by,
+    )
+    logger.info(f"Player ratings: served {_served_count(ratings)} players with unified ratings from all sources")
     return ratings
 
-@mcp.tool()
-async def get_player_ratings_by_source(ctx: Context, source: str) -> List[Dict]:
+@mcp.tool(description="Get player ratings from a specific source (e.g., 'Madden NFL', 'Pro Football Focus')." + RATINGS_QUERY_HELP)
+async def get_player_ratings_by_source(
+    ctx: Context,
+    source: str,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    fields: Optional[List[str]] = None,
+    sort_by: Optional[str] = None,
+    format: str = "records",
+) -> Union[List[Dict], Dict]:
     """Get player ratings from a specific source (e.g., 'Madden NFL', 'Pro Football Focus')."""
     logger.info(f"Tool called: get_player_ratings_by_source with source={source}")
-    ratings = get_ratings_by_source(source)
-    logger.info(f"Player ratings by source '{source}': served {len(ratings)} players")
+    ratings = await run_blocking(
+        "get_player_ratings_by_source", _formatted, query_player_ratings, format, "source", source,
+        items_key="players",
+        limit=limit, cursor=cursor, fields=fields, sort_by=sort_by,
+    )
+    logger.info(f"Player ratings by source '{source}': served {_served_count(ratings)} players")
     return ratings
 
-@mcp.tool()
-async def get_player_ratings_by_position(ctx: Context, position: str) -> List[Dict]:
+@mcp.tool(description="Get player ratings filtered by position (e.g., 'QB', 'RB', 'WR', 'TE', 'K', 'DEF') with ratings from all sources." + RATINGS_QUERY_HELP)
+async def get_player_ratings_by_position(
+    ctx: Context,
+    position: str,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    fields: Optional[List[str]] = None,
+    sort_by: Optional[str] = None,
+    format: str = "records",
+) -> Union[List[Dict], Dict]:
     """Get player ratings filtered by position (e.g., 'QB', 'RB', 'WR', 'TE', 'K', 'DEF') with ratings from all sources."""
     logger.info(f"Tool called: get_player_ratings_by_position with position={position}")
-    ratings = get_ratings_by_position(position)
-    logger.info(f"Player ratings by position '{position}': served {len(ratings)} players")
+    ratings = await run_blocking(
+        "get_player_ratings_by_position", _formatted, query_player_ratings, format, "position", position,
+        items_key="players",
+        limit=limit, cursor=cursor, fields=fields, sort_by=sort_by,
+    )
+    logger.info(f"Player ratings by position '{position}': served {_served_count(ratings)} players")
     return ratings
 
-@mcp.tool()
-async def get_player_ratings_by_team(ctx: Context, team: str) -> List[Dict]:
+@mcp.tool(description="Get player ratings filtered by team name with ratings from all sources." + RATINGS_QUERY_HELP)
+async def get_player_ratings_by_team(
+    ctx: Context,
+    team: str,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    fields: Optional[List[str]] = None,
+    sort_by: Optional[str] = None,
+    format: str = "records",
+) -> Union[List[Dict], Dict]:
     """Get player ratings filtered by team name with ratings from all sources."""
     logger.info(f"Tool called: get_player_ratings_by_team with team={team}")
-    ratings = get_ratings_by_team(team)
-    logger.info(f"Player ratings by team '{team}': served {len(ratings)} players")
+    ratings = await run_blocking(
+        "get_player_ratings_by_team", _formatted, query_player_ratings, format, "team", team,
+        items_key="players",
+        limit=limit, cursor=cursor, fields=fields, sort_by=sort_by,
+    )
+    logger.info(f"Player ratings by team '{team}': served {_served_count(ratings)} players")
     return ratings
 
-
-
 @mcp.tool()
 async def get_player_ratings_stats(ctx: Context) -> Dict:
     """Get statistics about the combined player ratings dataset (Madden + PFF)."""
     logger.info("Tool called: get_player_ratings_stats")
-    stats = get_player_ratings_stats()
+    stats = await run_blocking("get_player_ratings_stats", get_player_ratings_stats)
     logger.info("Player ratings stats: served dataset statistics")
     return stats
 
 # Offensive Line Ranking Tools
-@mcp.tool()
-async def get_ol_rankings(ctx: Context) -> List[Dict]:
+@mcp.tool(description="Get all PFF offensive line rankings (cached, refreshed every 48h)." + FORMAT_HELP)
+async def get_ol_rankings(ctx: Context, format: str = "records") -> Union[List[Dict], Dict]:
     """Get all PFF offensive line rankings (cached, refreshed every 48h)."""
-    logger.info("Tool called: get_ol_rankings")
-    rankings = get_all_ol_rankings()
-    logger.info(f"OL rankings: served {len(rankings)} team rankings (cache status logged by resource)")
+    logger.info(f"Tool called: get_ol_rankings (format={format})")
+    rankings = await run_blocking("get_ol_rankings", _formatted, get_all_ol_rankings, format)
+    logger.info(f"OL rankings: served {_served_count(rankings)} team rankings (cache status logged by resource)")
     return rankings
 
 @mcp.tool()
 async def get_ol_rankings_by_team(ctx: Context, team: str) -> Dict:
     """Get offensive line ranking for a specific team."""
     logger.info(f"Tool called: get_ol_rankings_by_team with team={team}")
-    ranking = get_ol_rankings_by_team_cached(team)
+    ranking = await run_blocking("get_ol_rankings_by_team", get_ol_rankings_by_team_cached, team)
     if ranking:
         logger.info(f"OL ranking for '{team}': found (rank {ranking.get('rank', 'N/A')})")
     else:
         logger.info(f"OL ranking for '{team}': team not found")
     return ranking or {"error": f"Team '{team}' not found in OL rankings"}
 
-@mcp.tool()
-async def get_top_ol_rankings(ctx: Context, top_n: int = 10) -> List[Dict]:
+@mcp.tool(description="Get top N offensive line rankings (e.g., top_n=10 for top 10 teams)." + FORMAT_HELP)
+async def get_top_ol_rankings(ctx: Context, top_n: int = 10, format: str = "records") -> Union[List[Dict], Dict]:
     """Get top N offensive line rankings (e.g., top_n=10 for top 10 teams)."""
     logger.info(f"Tool called: get_top_ol_rankings with top_n={top_n}")
-    rankings = get_top_ol_rankings_cached(top_n)
-    logger.info(f"Top {top_n} OL rankings: served {len(rankings)} team rankings")
+    rankings = await run_blocking("get_top_ol_rankings", _formatted, get_top_ol_rankings_cached, format, top_n)
+    logger.info(f"Top {top_n} OL rankings: served {_served_count(rankings)} team rankings")
     return rankings
 
-@mcp.tool()
-async def get_ol_rankings_by_rank_range(ctx: Context, min_rank: int, max_rank: int) -> List[Dict]:
+@mcp.tool(description="Get offensive line rankings within a specific rank range (e.g., min_rank=1, max_rank=10)." + FORMAT_HELP)
+async def get_ol_rankings_by_rank_range(
+    ctx: Context, min_rank: int, max_rank: int, format: str = "records"
+) -> Union[List[Dict], Dict]:
     """Get offensive line rankings within a specific rank range (e.g., min_rank=1, max_rank=10)."""
     logger.info(f"Tool called: get_ol_rankings_by_rank_range with range {min_rank}-{max_rank}")
-    rankings = get_ol_rankings_by_rank_range_cached(min_rank, max_rank)
-    logger.info(f"OL rankings by rank range {min_rank}-{max_rank}: served {len(rankings)} team rankings")
+    rankings = await run_blocking(
+        "get_ol_rankings_by_rank_range", _formatted, get_ol_rankings_by_rank_range_cached, format, min_rank, max_rank
+    )
+    logger.info(f"OL rankings by rank range {min_rank}-{max_rank}: served {_served_count(rankings)} team rankings")
     return rankings
 
 @mcp.tool()
 async def get_ol_rankings_stats(ctx: Context) -> Dict:
     """Get statistics about the offensive line rankings dataset."""
     logger.info("Tool called: get_ol_rankings_stats")
-    stats = get_ol_rankings_stats()
+    stats = await run_blocking("get_ol_rankings_stats", get_ol_rankings_stats)
     logger.info("OL rankings stats: served dataset statistics")
     return stats
 
+@mcp.tool()
+async def get_server_metrics(ctx: Context) -> Dict:
+    """Get server metrics: cache hits/misses/stale serves, scrape, parse and decode timings, tool latency and response sizes, and response cache and combined ratings memo usage."""
+    logger.info("Tool called: get_server_metrics")
+    return {
+        **metrics.snapshot(),
+        "response_cache": response_cache.get_response_cache().info(),
+        "combine_cache": get_combine_cache_info(),
+    }
+
+# Network transports: one long-lived process shared by many clients, so caches,
+# indexes and the HTTP connection pool stay warm across sessions
+HTTP_TRANSPORTS = ("http", "streamable-http", "sse")
+DEFAULT_HTTP_HOST = "127.0.0.1"
+DEFAULT_HTTP_PORT = 8000
+
+def registered_tool_names() -> List[str]:
+    """Names of the registered tools, in registration order (call before the server's loop starts)."""
+    return list(asyncio.run(mcp.get_tools()))
+
+def run_server(
+    scheduler: Optional[bool] = None,
+    metrics_file: Optional[str] = None,
+    transport: str = "stdio",
+    host: str = DEFAULT_HTTP_HOST,
+    port: int = DEFAULT_HTTP_PORT,
+    workers: Optional[int] = None,
+):
+    """
+    Run the MCP server and release shared resources when it stops.
+    
+    Args:
+        scheduler: Keep caches warm with the background refresh scheduler
+            (defaults to SCHEDULER_ENABLED)
+        metrics_file: Periodically write Prometheus text metrics to this file
+            (defaults to METRICS_FILE)
+        transport: "stdio", or "http" (streamable HTTP) / "sse" to serve many
+            clients from this process
+        host: Interface to bind for HTTP transports
+        port: Port to bind for HTTP transports
+        workers: Worker threads for concurrent tool calls (defaults to MAX_WORKERS)
+    """
+    if transport != "stdio" and transport not in HTTP_TRANSPORTS:
+        raise ValueError(f"Unknown transport '{transport}', expected stdio or one of {', '.join(HTTP_TRANSPORTS)}")
+    if workers is not None:
+        set_max_workers(workers)
+    metrics_file = metrics_file or metrics.METRICS_FILE
+    if metrics_file:
+        metrics.start_metrics_dump(metrics_file)
+    if SCHEDULER_ENABLED if scheduler is None else scheduler:
+        start_scheduler()
+    try:
+        if transport == "stdio":
+            mcp.run()
+        else:
+            logger.info(f"Serving MCP over {transport} on {host}:{port}")
+            mcp.run(transport=transport, host=host, port=port)
+    finally:
+        stop_scheduler()
+        metrics.stop_metrics_dump(metrics_file)
+        shutdown_executor()
+        close_http_client()
+
 if __name__ == "__main__":
-    mcp.run()
+    run_server()
@@ -1,131 +1,10 @@
-from fastmcp import FastMCP, Context
-from app.scraper.nfl_injuries import fetch_nfl_injuries
-from app.cache.cache import get_cache, set_cache
-from app.resources.player_ratings_resource import (
-    get_all_player_ratings, 
-    get_player_ratings_by_source as get_ratings_by_source,
-    get_player_ratings_by_position as get_ratings_by_position,
-    get_player_ratings_by_team as get_ratings_by_team,
-    get_player_ratings_stats
-)
-from app.resources.ol_rankings_resource import (
-    get_all_ol_rankings,
-    get_ol_rankings_by_team_cached,
-    get_top_ol_rankings_cached,
-    get_ol_rankings_by_rank_range_cached,
-    get_ol_rankings_stats
-)
-from typing import List, Dict
+from app.server import DEFAULT_HTTP_HOST, DEFAULT_HTTP_PORT, HTTP_TRANSPORTS, registered_tool_names, run_server
+from app import profiling
 import logging
 import argparse
-import sys
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-mcp = FastMCP("FantasyFootballAssistant")
-
-@mcp.tool()
-async def get_nfl_injuries(ctx: Context) -> List[Dict]:
-    """Get the latest NFL injuries (cached, refreshed every 24h)."""
-    logger.info("Tool called: get_nfl_injuries")
-    injuries = get_cache()
-    if injuries is None:
-        logger.info("NFL injuries: CACHE MISS - fetching fresh data from website")
-        injuries = fetch_nfl_injuries()
-        set_cache(injuries)
-        logger.info(f"NFL injuries: CACHE UPDATED - stored {len(injuries)} injury records")
-    else:
-        logger.info(f"NFL injuries: CACHE HIT - serving {len(injuries)} cached injury records")
-    return injuries
-
-@mcp.tool()
-async def get_player_ratings(ctx: Context) -> List[Dict]:
-    """Get all player ratings from multiple sources (Madden NFL + PFF) with ratings from all available sources for each player."""
-    logger.info("Tool called: get_player_ratings")
-    ratings = get_all_player_ratings()
-    logger.info(f"Player ratings: served {len(ratings)} players with unified ratings from all sources")
-    return ratings
-
-@mcp.tool()
-async def get_player_ratings_by_source(ctx: Context, source: str) -> List[Dict]:
-    """Get player ratings from a specific source (e.g., 'Madden NFL', 'Pro Football Focus')."""
-    logger.info(f"Tool called: get_player_ratings_by_source with source={source}")
-    ratings = get_ratings_by_source(source)
-    logger.info(f"Player ratings by source '{source}': served {len(ratings)} players")
-    return ratings
-
-@mcp.tool()
-async def get_player_ratings_by_position(ctx: Context, position: str) -> List[Dict]:
-    """Get player ratings filtered by position (e.g., 'QB', 'RB', 'WR', 'TE', 'K', 'DEF') with ratings from all sources."""
-    logger.info(f"Tool called: get_player_ratings_by_position with position={position}")
-    ratings = get_ratings_by_position(position)
-    logger.info(f"Player ratings by position '{position}': served {len(ratings)} players")
-    return ratings
-
-@mcp.tool()
-async def get_player_ratings_by_team(ctx: Context, team: str) -> List[Dict]:
-    """Get player ratings filtered by team name with ratings from all sources."""
-    logger.info(f"Tool called: get_player_ratings_by_team with team={team}")
-    ratings = get_ratings_by_team(team)
-    logger.info(f"Player ratings by team '{team}': served {len(ratings)} players")
-    return ratings
-
-
-
-@mcp.tool()
-async def get_player_ratings_stats(ctx: Context) -> Dict:
-    """Get statistics about the combined player ratings dataset (Madden + PFF)."""
-    logger.info("Tool called: get_player_ratings_stats")
-    stats = get_player_ratings_stats()
-    logger.info("Player ratings stats: served dataset statistics")
-    return stats
-
-# Offensive Line Ranking Tools
-@mcp.tool()
-async def get_ol_rankings(ctx: Context) -> List[Dict]:
-    """Get all PFF offensive line rankings (cached, refreshed every 48h)."""
-    logger.info("Tool called: get_ol_rankings")
-    rankings = get_all_ol_rankings()
-    logger.info(f"OL rankings: served {len(rankings)} team rankings (cache status logged by resource)")
-    return rankings
-
-@mcp.tool()
-async def get_ol_rankings_by_team(ctx: Context, team: str) -> Dict:
-    """Get offensive line ranking for a specific team."""
-    logger.info(f"Tool called: get_ol_rankings_by_team with team={team}")
-    ranking = get_ol_rankings_by_team_cached(team)
-    if ranking:
-        logger.info(f"OL ranking for '{team}': found (rank {ranking.get('rank', 'N/A')})")
-    else:
-        logger.info(f"OL ranking for '{team}': team not found")
-    return ranking or {"error": f"Team '{team}' not found in OL rankings"}
-
-@mcp.tool()
-async def get_top_ol_rankings(ctx: Context, top_n: int = 10) -> List[Dict]:
-    """Get top N offensive line rankings (e.g., top_n=10 for top 10 teams)."""
-    logger.info(f"Tool called: get_top_ol_rankings with top_n={top_n}")
-    rankings = get_top_ol_rankings_cached(top_n)
-    logger.info(f"Top {top_n} OL rankings: served {len(rankings)} team rankings")
-    return rankings
-
-@mcp.tool()
-async def get_ol_rankings_by_rank_range(ctx: Context, min_rank: int, max_rank: int) -> List[Dict]:
-    """Get offensive line rankings within a specific rank range (e.g., min_rank=1, max_rank=10)."""
-    logger.info(f"Tool called: get_ol_rankings_by_rank_range with range {min_rank}-{max_rank}")
-    rankings = get_ol_rankings_by_rank_range_cached(min_rank, max_rank)
-    logger.info(f"OL rankings by rank range {min_rank}-{max_rank}: served {len(rankings)} team rankings")
-    return rankings
-
-@mcp.tool()
-async def get_ol_rankings_stats(ctx: Context) -> Dict:
-    """Get statistics about the offensive line rankings dataset."""
-    logger.info("Tool called: get_ol_rankings_stats")
-    stats = get_ol_rankings_stats()
-    logger.info("OL rankings stats: served dataset statistics")
-    return stats
-
 def parse_arguments():
     """Parse command line arguments, ignoring unknown ones that MCP inspector might pass."""
     parser = argparse.ArgumentParser(description="Fantasy Football MCP Server")
@@ -133,6 +12,16 @@ def parse_arguments():
     # Add any arguments your server might need
     parser.add_argument("--verbose", "-v", action="store_true", help="Enable verbose logging")
     parser.add_argument("--debug", action="store_true", help="Enable debug mode")
+    parser.add_argument("--transport", choices=("stdio",) + HTTP_TRANSPORTS, default="stdio", help="MCP transport; http/sse let many clients share one warm server (default: stdio)")
+    parser.add_argument("--host", default=DEFAULT_HTTP_HOST, help=f"Host to bind for http/sse (default: {DEFAULT_HTTP_HOST})")
+    parser.add_argument("--port", type=int, default=DEFAULT_HTTP_PORT, help=f"Port to bind for http/sse (default: {DEFAULT_HTTP_PORT})")
+    parser.add_argument("--workers", type=int, help="Worker threads for concurrent tool calls")
+    parser.add_argument("--metrics-file", type=str, help="Periodically write Prometheus text metrics to this file")
+    parser.add_argument("--profile-dir", type=str, help="Write cProfile/tracemalloc reports of sampled tool calls to this directory")
+    parser.add_argument("--profile-rate", type=float, default=1.0, help="Fraction of tool calls to profile (default: 1.0)")
+    parser.add_argument("--profile-tools", type=str, help="Comma-separated tool names to profile, plus refresh:<source> and parse:madden_ratings (default: all)")
+    parser.add_argument("--profile-memory", action="store_true", help="Also record tracemalloc top allocations per profiled call")
+    parser.add_argument("--no-scheduler", action="store_true", help="Disable background cache prewarming and refresh")
     
     # Parse known args only, ignore unknown ones
     args, unknown = parser.parse_known_args()
@@ -151,8 +40,23 @@ if __name__ == "__main__":
         logging.getLogger().setLevel(logging.DEBUG)
         logger.info("Verbose logging enabled")
     
+    if args.profile_dir:
+        profiling.configure(
+            args.profile_dir,
+            rate=args.profile_rate,
+            tools=[t.strip() for t in (args.profile_tools or "").split(",") if t.strip()],
+            memory=args.profile_memory,
+        )
+    
     logger.info("Starting Fantasy Football MCP Server...")
-    logger.info("Available tools: get_nfl_injuries, get_player_ratings, get_player_ratings_by_source, get_player_ratings_by_position, get_player_ratings_by_team, get_player_ratings_stats, get_ol_rankings, get_ol_rankings_by_team, get_top_ol_rankings, get_ol_rankings_by_rank_range, get_ol_rankings_stats")
+    logger.info(f"Available tools: {', '.join(registered_tool_names())}")
     
     # Run the MCP server
-    mcp.run()
+    run_server(
+        scheduler=False if args.no_scheduler else None,
+        metrics_file=args.metrics_file,
+        transport=args.transport,
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+    )
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Madden ratings page parsing benchmark: serial vs process pool.
+
+Parses a set of ratings pages the way a crawl does, once serially in-process
+and once through a process pool with results merged in page order, and
+reports pages per second for each. Serial parsing is measured with both the
+row-only fast path and the whole-page parser. The parsed players must be
+identical.
+
+Pages come from --fixtures DIR (saved EA ratings pages, *.html, parsed in
+file name order); without it, EA-shaped pages are synthesized: 100 player
+rows per page inside a page padded with navigation and script markup.
+
+Usage:
+    python benchmarks/madden_parse.py [--fixtures DIR] [--pages N] [--workers N] [--runs N]
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from app.scraper.madden_ratings import (  # noqa: E402
+    MADDEN_PARSE_WORKERS,
+    _parse_madden_ratings_html,
+    _parse_madden_ratings_html_full,
+)
+
+TEAMS = [
+    "Buffalo Bills", "Miami Dolphins", "New England Patriots", "New York Jets", "Baltimore Ravens",
+    "Cincinnati Bengals", "Cleveland Browns", "Pittsburgh Steelers", "Houston Texans", "Indianapolis Colts",
+    "Jacksonville Jaguars", "Tennessee Titans", "Denver Broncos", "Kansas City Chiefs", "Las Vegas Raiders",
+    "Los Angeles Chargers", "Dallas Cowboys", "New York Giants", "Philadelphia Eagles", "Washington Commanders",
+    "Chicago Bears", "Detroit Lions", "Green Bay Packers", "Minnesota Vikings", "Atlanta Falcons",
+    "Carolina Panthers", "New Orleans Saints", "Tampa Bay Buccaneers", "Arizona Cardinals", "Los Angeles Rams",
+    "San Francisco 49ers", "Seattle Seahawks",
+]
+POSITIONS = ["QB", "HB", "WR", "TE", "LT", "LG", "C", "RG", "RT", "LE", "DT", "RE", "MLB", "CB", "FS", "SS", "K", "P"]
+ROWS_PER_PAGE = 100
+
+
+def _row(rng, page, index):
+    stats = "".join(
+        '<td class="Table_cell__qBFwB"><div class="Table_statCell__jDTje" data-label="OVR">'
+        f'<span class="Table_statCellValue__zn5Cx">{rng.randint(40, 99)}</span></div></td>'
+        for _ in range(8)
+    )
+    return (
+        '<tr class="Table_row__eoyUr">'
+        '<td class="Table_cell__qBFwB" data-type="profile"><div class="Table_centerCell__Sr9MG">'
+        f'<a class="Table_profileCellAnchor__Zj6g4" href="/games/madden-nfl/ratings/player-ratings/{page}-{index}">'
+        '<div class="Table_profileCell__ZoaSs"><div class="Table_profileContent__0t2_u">'
+        f'<span class="Table_profileLabel__tuyG0">Player {page}-{index}</span></div></div></a></div></td>'
+        '<td class="Table_cell__qBFwB" data-type="profile"><a class="Table_centerCell__Sr9MG" href="/positions">'
+        f'<span class="Table_tag__vKZKn">{rng.choice(POSITIONS)}</span></a></td>'
+        '<td class="Table_cell__qBFwB"><a class="Table_centerCell__Sr9MG" href="/teams">'
+        f'<img alt="{rng.choice(TEAMS)}" class="Picture_image__L8suG" src="/teams/logo.png"/></a></td>'
+        f"{stats}</tr>"
+    )
+
+
+def synthesize_page(rng, page):
+    """An EA-shaped ratings page: markup around a table of player rows."""
+    nav = "".join(f'<li><a href="/games/madden-nfl/{i}">Link {i}</a></li>' for i in range(200))
+    script = "{" + ",".join(f'"k{i}":"{"x" * 40}"' for i in range(1500)) + "}"
+    rows = "".join(_row(rng, page, i) for i in range(ROWS_PER_PAGE))
+    return (
+        f"<html><head><title>Madden NFL Ratings</title></head><body><nav><ul>{nav}</ul></nav>"
+        f'<main><table class="Table_table__ab12"><thead><tr><th>Player</th><th>Team</th></tr></thead>'
+        f"<tbody>{rows}</tbody></table></main>"
+        f'<script id="__NEXT_DATA__" type="application/json">{script}</script></body></html>'
+    )
+
+
+def load_pages(fixtures, count):
+    if fixtures:
+        return [path.read_text(encoding="utf-8") for path in sorted(Path(fixtures).glob("*.html"))]
+    rng = random.Random(7)
+    return [synthesize_page(rng, page) for page in range(1, count + 1)]
+
+
+def parse_serial(pages, parse=_parse_madden_ratings_html):
+    return [parse(html) for html in pages]
+
+
+def parse_pooled(pool, pages):
+    # map yields in submission order: page order is kept
+    return list(pool.map(_parse_madden_ratings_html, pages))
+
+
+def _best(fn, runs):
+    samples, result = [], None
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Madden page parsing, serial vs process pool")
+    parser.add_argument("--fixtures", help="Directory of saved ratings pages (*.html)")
+    parser.add_argument("--pages", type=int, default=20, help="Synthesized pages (default: 20)")
+    parser.add_argument("--workers", type=int, default=max(MADDEN_PARSE_WORKERS, 1), help="Pool size (default: crawl setting)")
+    parser.add_argument("--runs", type=int, default=3, help="Runs per measurement (default: 3)")
+    args = parser.parse_args()
+
+    pages = load_pages(args.fixtures, args.pages)
+    size = sum(len(html) for html in pages) / len(pages) / 1024
+    print(f"{len(pages)} pages, {size:.0f} KiB each on average, {os.cpu_count()} CPUs")
+
+    full_seconds, full = _best(lambda: parse_serial(pages, _parse_madden_ratings_html_full), args.runs)
+    print(f"serial, whole page:  {len(pages) / full_seconds:6.1f} pages/s ({full_seconds:.2f}s)")
+    serial_seconds, serial = _best(lambda: parse_serial(pages), args.runs)
+    print(f"serial, fast path:   {len(pages) / serial_seconds:6.1f} pages/s ({serial_seconds:.2f}s)")
+    assert serial == full, "fast path results differ from whole-page parsing"
+
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        # Start every worker before timing, as a crawl overlaps startup with fetching
+        list(pool.map(_parse_madden_ratings_html, ["<table></table>"] * args.workers))
+        startup = time.perf_counter() - started
+        pooled_seconds, pooled = _best(lambda: parse_pooled(pool, pages), args.runs)
+    print(
+        f"pool ({args.workers} workers):    {len(pages) / pooled_seconds:6.1f} pages/s ({pooled_seconds:.2f}s, "
+        f"{startup:.2f}s worker startup)"
+    )
+    assert pooled == serial, "process pool results differ from serial parsing"
+    print(f"players per run:     {sum(len(players) for players in serial)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Response size benchmark for the tabular tools' output formats.
+
+Serializes the same tool results as the server does (pydantic_core JSON, as
+fastmcp sends text content) in the default record format and with
+format="columnar", and reports payload bytes and encode time for each:
+- player ratings: the bundled PFF CSV combined with synthesized Madden ratings
+- injuries and OL rankings: synthesized 32-team datasets
+
+No network access is needed.
+
+Usage:
+    python benchmarks/response_size.py [--runs N]
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import pydantic_core
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from app.columnar import encode_response  # noqa: E402
+from app.resources.pff_ratings_resource import PFF_CSV_PATH, _parse_pff_csv  # noqa: E402
+from app.resources.player_ratings_resource import _combine_sources  # noqa: E402
+
+TEAMS = [f"Team {i:02d}" for i in range(32)]
+POSITIONS = ["QB", "RB", "WR", "TE", "OL", "DL", "LB", "CB", "S", "K"]
+STATUSES = ["Out", "Questionable", "Doubtful", "Injured Reserve"]
+
+
+def ratings_dataset(rng):
+    """Combined ratings: real PFF rows, plus Madden ratings for most of them and extra Madden-only players."""
+    with open(PFF_CSV_PATH, newline="", encoding="utf-8") as f:
+        pff = _parse_pff_csv(f)
+    madden = [
+        {"name": p["name"], "position": p["position"], "team": p["team"], "overall": rng.randint(60, 99), "source": "Madden NFL"}
+        for p in pff if rng.random() < 0.8
+    ]
+    madden += [
+        {"name": f"Player {i}", "position": rng.choice(POSITIONS), "team": rng.choice(TEAMS), "overall": rng.randint(50, 90), "source": "Madden NFL"}
+        for i in range(1500)
+    ]
+    return _combine_sources(madden, pff)
+
+
+def injuries_dataset(rng):
+    return [
+        {"team": team, "injuries": [
+            {"player": f"{team} Player {i}", "position": rng.choice(POSITIONS), "injury": rng.choice(["Knee", "Ankle", "Hamstring", "Concussion"]),
+             "status": rng.choice(STATUSES), "updated": "Sep 1"}
+            for i in range(rng.randint(3, 12))
+        ]}
+        for team in TEAMS
+    ]
+
+
+def ol_dataset(rng):
+    return [
+        {"team": team, "rank": rank, "grade": round(rng.uniform(50, 90), 1), "summary": None, "source": "PFF"}
+        for rank, team in enumerate(TEAMS, 1)
+    ]
+
+
+def measure(result, fmt, runs):
+    """Median encode-plus-serialize time and the payload size."""
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        payload = pydantic_core.to_json(encode_response(result, fmt), fallback=str)
+        samples.append(time.perf_counter() - started)
+    return len(payload), statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare record and columnar response sizes")
+    parser.add_argument("--runs", type=int, default=5, help="Runs per measurement (default: 5)")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    datasets = [
+        ("player ratings", ratings_dataset(rng)),
+        ("injuries", injuries_dataset(rng)),
+        ("OL rankings", ol_dataset(rng)),
+    ]
+    for name, result in datasets:
+        record_bytes, record_seconds = measure(result, "records", args.runs)
+        columnar_bytes, columnar_seconds = measure(result, "columnar", args.runs)
+        print(
+            f"{name:15} ({len(result):5} rows): records {record_bytes / 1024:8.1f} KiB in {record_seconds * 1000:6.1f} ms, "
+            f"columnar {columnar_bytes / 1024:8.1f} KiB in {columnar_seconds * 1000:6.1f} ms "
+            f"({100 * (1 - columnar_bytes / record_bytes):.0f}% smaller)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark for the MCP server.
+
+Measures, in fresh interpreter processes:
+- import time of `app.server` (and which heavy optional modules it pulled in)
+- time-to-first-tool-list: spawning the stdio server, completing the MCP
+  handshake and receiving the tool list, as a desktop client launch would
+
+Usage:
+    python benchmarks/startup.py [--runs N]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Modules that should not be imported before the first tool call
+HEAVY_MODULES = ["pandas", "bs4"]
+
+IMPORT_PROBE = f"""
+import json, sys, time
+started = time.perf_counter()
+import app.server
+elapsed = time.perf_counter() - started
+print(json.dumps({{"seconds": elapsed, "loaded": [m for m in {HEAVY_MODULES!r} if m in sys.modules]}}))
+"""
+
+# The stdio server as launched by the client, without the background refresh
+# scheduler so the benchmark never scrapes
+SERVER_COMMAND = "from app.server import run_server; run_server(scheduler=False)"
+
+
+def measure_import() -> dict:
+    """Import app.server in a fresh interpreter."""
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_PROBE], cwd=ROOT, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+async def measure_first_tool_list() -> tuple:
+    """Spawn the stdio server and time the handshake plus the first tools/list."""
+    from fastmcp import Client
+    from fastmcp.client.transports import StdioTransport
+
+    transport = StdioTransport(
+        command=sys.executable,
+        args=["-c", SERVER_COMMAND],
+        cwd=str(ROOT),
+        env={**os.environ, "PYTHONPATH": str(ROOT)},
+        keep_alive=False,
+    )
+    started = time.perf_counter()
+    async with Client(transport) as client:
+        tools = await client.list_tools()
+        elapsed = time.perf_counter() - started
+    return elapsed, len(tools)
+
+
+def _summary(samples):
+    return f"median {statistics.median(samples) * 1000:.0f} ms, min {min(samples) * 1000:.0f} ms"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark MCP server startup")
+    parser.add_argument("--runs", type=int, default=5, help="Runs per measurement (default: 5)")
+    args = parser.parse_args()
+
+    imports = [measure_import() for _ in range(args.runs)]
+    print(f"import app.server:        {_summary([r['seconds'] for r in imports])}")
+    loaded = sorted({m for r in imports for m in r["loaded"]})
+    print(f"heavy modules at import:  {', '.join(loaded) or 'none'}")
+
+    listings = [asyncio.run(measure_first_tool_list()) for _ in range(args.runs)]
+    print(f"time to first tool list:  {_summary([seconds for seconds, _ in listings])} ({listings[0][1]} tools)")
+
+
+if __name__ == "__main__":
+    main()
@@ -47,10 +47,10 @@ def main():
     
     # Import and run the actual MCP server
     try:
-        from app.server_with_args import mcp
+        from app.server_with_args import registered_tool_names, run_server
         logger.info("Starting Fantasy Football MCP Server...")
-        logger.info("Available tools: get_nfl_injuries, get_player_ratings, get_player_ratings_by_source, get_player_ratings_by_position, get_player_ratings_by_team")
-        mcp.run()
+        logger.info(f"Available tools: {', '.join(registered_tool_names())}")
+        run_server()
     except ImportError as e:
         logger.error(f"Failed to import MCP server: {e}")
         sys.exit(1)
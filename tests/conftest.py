@@ -0,0 +1,39 @@
+import httpx
+import pytest
+from unittest.mock import patch
+from app.cache import cache, refresh, response_cache
+from app.cache.store import CacheStore
+from app.scraper import http_client
+
+@pytest.fixture(autouse=True)
+def cache_store(tmp_path, monkeypatch):
+    """Point the process-wide cache store and refresh locks at a fresh directory per test, with an empty response cache."""
+    store = CacheStore(str(tmp_path / "cache.sqlite3"))
+    monkeypatch.setattr(cache, "_store", store)
+    monkeypatch.setattr(refresh, "REFRESH_LOCK_DIR", str(tmp_path / "locks"))
+    response_cache.reset()
+    yield store
+    store.close()
+
+@pytest.fixture
+def mock_http(tmp_path, monkeypatch):
+    """Route the shared HTTP client through an httpx mock transport.
+
+    Call the fixture with a handler taking an httpx.Request and returning an
+    httpx.Response (or a coroutine producing one).
+    """
+    monkeypatch.setattr(http_client, "_validators", None)
+    patches = []
+    def install(handler):
+        http_client.close_http_client()
+        p = patch.object(
+            http_client,
+            "_build_client",
+            lambda: httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+        )
+        p.start()
+        patches.append(p)
+    yield install
+    for p in patches:
+        p.stop()
+    http_client.close_http_client()
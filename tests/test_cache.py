@@ -6,31 +6,25 @@ from app.cache import cache
 
 def test_injuries_cache_set_and_get(monkeypatch):
     """Test setting and getting injuries cache with TTL."""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        cache_file = os.path.join(tmpdir, "nfl_injuries.json")
-        monkeypatch.setattr(cache, "INJURIES_CACHE_FILE", cache_file)
-        monkeypatch.setattr(cache, "INJURIES_CACHE_TTL", 1)  # 1 second for test
-        
-        injuries = [{"team": "Test", "injuries": []}]
-        cache.set_injuries_cache(injuries)
-        assert cache.get_injuries_cache() == injuries
-        
-        time.sleep(2)
-        assert cache.get_injuries_cache() is None
+    monkeypatch.setattr(cache, "INJURIES_CACHE_TTL", 1)  # 1 second for test
+    
+    injuries = [{"team": "Test", "injuries": []}]
+    cache.set_injuries_cache(injuries)
+    assert cache.get_injuries_cache() == injuries
+    
+    time.sleep(2)
+    assert cache.get_injuries_cache() is None
 
 def test_ratings_cache_set_and_get(monkeypatch):
     """Test setting and getting ratings cache with TTL."""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        cache_file = os.path.join(tmpdir, "madden_ratings.json")
-        monkeypatch.setattr(cache, "RATINGS_CACHE_FILE", cache_file)
-        monkeypatch.setattr(cache, "RATINGS_CACHE_TTL", 1)  # 1 second for test
-        
-        ratings = [{"name": "Test Player", "overall": 85}]
-        cache.set_ratings_cache(ratings)
-        assert cache.get_ratings_cache() == ratings
-        
-        time.sleep(2)
-        assert cache.get_ratings_cache() is None
+    monkeypatch.setattr(cache, "RATINGS_CACHE_TTL", 1)  # 1 second for test
+    
+    ratings = [{"name": "Test Player", "overall": 85}]
+    cache.set_ratings_cache(ratings)
+    assert cache.get_ratings_cache() == ratings
+    
+    time.sleep(2)
+    assert cache.get_ratings_cache() is None
 
 def test_generic_cache_functions(monkeypatch):
     """Test the generic cache functions."""
@@ -63,11 +57,51 @@ def test_cache_file_creation(monkeypatch):
 
 def test_backward_compatibility(monkeypatch):
     """Test backward compatibility functions."""
+    monkeypatch.setattr(cache, "INJURIES_CACHE_TTL", 1)  # 1 second for test
+    
+    injuries = [{"team": "Test", "injuries": []}]
+    cache.set_cache(injuries)  # Old function name
+    assert cache.get_cache() == injuries  # Old function name
+
+def test_memory_tier_skips_reparse_of_unchanged_file(monkeypatch):
+    """Test that an unchanged cache file is decoded only once."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        cache_file = os.path.join(tmpdir, "test_cache.json")
+        with open(cache_file, "w") as f:
+            json.dump({"timestamp": time.time(), "data": {"test": "data"}}, f)
+        cache.clear_memory_cache()
+        
+        loads = []
+        real_load = json.load
+        def counting_load(f):
+            loads.append(f.name)
+            return real_load(f)
+        
+        assert cache.read_file_cached(cache_file, counting_load)[0]["data"] == {"test": "data"}
+        assert cache.read_file_cached(cache_file, counting_load)[0]["data"] == {"test": "data"}
+        assert len(loads) == 1
+
+def test_memory_tier_revalidates_on_file_change(monkeypatch):
+    """Test that rewriting a cache file is picked up by the memory tier."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        cache_file = os.path.join(tmpdir, "test_cache.json")
+        cache.set_cache_data({"version": 1}, cache_file)
+        assert cache.get_cache_data(cache_file, 60) == {"version": 1}
+        
+        # Rewrite behind the cache's back, as another process would
+        with open(cache_file, "w") as f:
+            json.dump({"timestamp": time.time(), "data": {"version": 22}}, f)
+        assert cache.get_cache_data(cache_file, 60) == {"version": 22}
+
+def test_failed_write_keeps_previous_file(monkeypatch):
+    """Test that a write failing mid-way leaves the old cache file intact."""
     with tempfile.TemporaryDirectory() as tmpdir:
-        cache_file = os.path.join(tmpdir, "nfl_injuries.json")
-        monkeypatch.setattr(cache, "INJURIES_CACHE_FILE", cache_file)
-        monkeypatch.setattr(cache, "INJURIES_CACHE_TTL", 1)  # 1 second for test
+        cache_file = os.path.join(tmpdir, "test_cache.json")
+        cache.set_cache_data({"version": 1}, cache_file)
+        
+        # Not JSON serializable: json.dump fails after opening the output
+        cache.set_cache_data({"version": object()}, cache_file)
         
-        injuries = [{"team": "Test", "injuries": []}]
-        cache.set_cache(injuries)  # Old function name
-        assert cache.get_cache() == injuries  # Old function name
+        cache.clear_memory_cache()
+        assert cache.get_cache_data(cache_file, 60) == {"version": 1}
+        assert os.listdir(tmpdir) == ["test_cache.json"]
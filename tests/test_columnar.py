@@ -0,0 +1,72 @@
+import json
+import pytest
+from fastmcp import Client
+from app import columnar
+from app import server
+
+PLAYERS = [
+    {"name": "A", "position": "QB", "team": "KC", "ratings": [
+        {"source": "Madden NFL", "overall": 90, "attributes": {"speed": 80}, "position_rank": None},
+        {"source": "Pro Football Focus", "overall_rank": 3, "adp": 1.5},
+    ]},
+    {"name": "B", "position": "QB", "team": "KC", "ratings": [{"source": "Pro Football Focus", "adp": 2.0, "bye_week": None}]},
+    {"name": "C", "position": "WR", "team": "KC", "ratings": [{"source": "Madden NFL", "overall": 84}]},
+    {"name": "D", "position": "WR", "team": "KC", "ratings": [{"source": "Madden NFL", "overall": 79}]},
+]
+
+def _without_nones(value):
+    if isinstance(value, dict):
+        return {k: _without_nones(v) for k, v in value.items() if v is not None}
+    if isinstance(value, list):
+        return [_without_nones(v) for v in value]
+    return value
+
+def test_round_trip_drops_only_nones():
+    """Test that decoding a columnar table restores the records minus null fields."""
+    table = columnar.to_columnar(PLAYERS)
+
+    assert columnar.from_columnar(table) == _without_nones(PLAYERS)
+    # Nested ratings become a child table pointing back at their player rows
+    assert table["children"]["ratings"]["parent"] == [0, 0, 1, 2, 3]
+    assert "attributes.speed" in table["children"]["ratings"]["columns"]
+
+def test_dictionary_encoding_and_null_elision():
+    """Test that repeated strings are coded and null cells do not take up space."""
+    table = columnar.to_columnar(PLAYERS)
+    ratings = table["children"]["ratings"]
+
+    assert table["dictionaries"]["team"] == ["KC"]
+    assert table["dictionaries"]["position"] == ["QB", "WR"]
+    # Unique names stay inline
+    assert "name" not in table["dictionaries"]
+    assert ratings["dictionaries"]["source"] == ["Madden NFL", "Pro Football Focus"]
+    # All-null fields are dropped and trailing nulls trimmed
+    assert "position_rank" not in ratings["columns"] and "bye_week" not in ratings["columns"]
+    assert all(row and row[-1] is not None for row in ratings["rows"])
+    assert len(json.dumps(table)) < len(json.dumps(PLAYERS))
+
+def test_encode_response_formats():
+    """Test records passthrough, page envelopes and format validation."""
+    assert columnar.encode_response(PLAYERS, "records") is PLAYERS
+    page = {"players": PLAYERS[:2], "total": 4, "next_cursor": "abc"}
+    encoded = columnar.encode_response(page, "columnar", items_key="players")
+    assert encoded["format"] == "columnar" and encoded["next_cursor"] == "abc"
+    assert columnar.from_columnar(encoded["players"]) == _without_nones(PLAYERS[:2])
+    with pytest.raises(ValueError):
+        columnar.encode_response(PLAYERS, "csv")
+
+@pytest.mark.asyncio
+async def test_tools_serve_columnar(monkeypatch):
+    """Test that the tabular tools accept format='columnar'."""
+    injuries = [{"team": "Chiefs", "injuries": [{"player": "X", "position": "WR", "status": "Out"}]}]
+    monkeypatch.setattr(server, "get_all_injuries", lambda: injuries)
+    monkeypatch.setattr(server, "query_player_ratings", lambda *args, **kwargs: {"players": PLAYERS, "total": 4})
+
+    async with Client(server.mcp) as client:
+        injury_result = await client.call_tool("get_nfl_injuries", {"format": "columnar"})
+        ratings_result = await client.call_tool("get_player_ratings", {"format": "columnar", "limit": 10})
+        records_result = await client.call_tool("get_nfl_injuries")
+
+    assert columnar.from_columnar(injury_result.data) == injuries
+    assert columnar.from_columnar(ratings_result.data["players"]) == _without_nones(PLAYERS)
+    assert records_result.structured_content["result"] == injuries
@@ -0,0 +1,42 @@
+import asyncio
+import threading
+import time
+from app import execution
+
+def test_run_blocking_runs_off_the_event_loop():
+    """Test that blocking calls run on a worker thread, not the loop thread."""
+    async def main():
+        loop_thread = threading.current_thread()
+        worker_thread = await execution.run_blocking("test_tool", threading.current_thread)
+        return loop_thread, worker_thread
+    
+    loop_thread, worker_thread = asyncio.run(main())
+    assert worker_thread is not loop_thread
+
+def test_slow_tool_does_not_block_cheap_tool(monkeypatch):
+    """Test that a slow tool hitting its limit leaves other tools responsive."""
+    monkeypatch.setitem(execution.TOOL_CONCURRENCY_LIMITS, "slow_tool", 1)
+    running = {"now": 0, "peak": 0}
+    lock = threading.Lock()
+    def slow():
+        with lock:
+            running["now"] += 1
+            running["peak"] = max(running["peak"], running["now"])
+        time.sleep(0.2)
+        with lock:
+            running["now"] -= 1
+        return "slow"
+    
+    async def main():
+        slow_calls = [asyncio.create_task(execution.run_blocking("slow_tool", slow)) for _ in range(3)]
+        await asyncio.sleep(0.05)
+        started = time.monotonic()
+        cheap = await execution.run_blocking("cheap_tool", lambda: "cheap")
+        cheap_latency = time.monotonic() - started
+        return cheap, cheap_latency, await asyncio.gather(*slow_calls)
+    
+    cheap, cheap_latency, slow_results = asyncio.run(main())
+    assert cheap == "cheap"
+    assert cheap_latency < 0.1
+    assert slow_results == ["slow"] * 3
+    assert running["peak"] == 1
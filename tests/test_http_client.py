@@ -0,0 +1,89 @@
+import asyncio
+import httpx
+from app.scraper import http_client
+
+def test_http_get_reuses_one_pooled_client(mock_http):
+    """Test that sync and async requests share the process-wide client."""
+    seen = []
+    def handler(request):
+        seen.append(str(request.url))
+        return httpx.Response(200, text="ok")
+    mock_http(handler)
+    
+    assert http_client.http_get("https://example.com/a").text == "ok"
+    first_client = http_client._client
+    
+    async def fetch():
+        return (await http_client.get("https://example.com/b")).text
+    assert http_client.run_http(fetch()) == "ok"
+    
+    assert http_client._client is first_client
+    assert seen == ["https://example.com/a", "https://example.com/b"]
+
+def test_per_host_limit_bounds_concurrent_requests(mock_http, monkeypatch):
+    """Test that requests to one host never exceed its connection limit."""
+    monkeypatch.setitem(http_client.HOST_CONNECTION_LIMITS, "example.com", 2)
+    active = {"now": 0, "peak": 0}
+    async def handler(request):
+        active["now"] += 1
+        active["peak"] = max(active["peak"], active["now"])
+        await asyncio.sleep(0.02)
+        active["now"] -= 1
+        return httpx.Response(200, text="ok")
+    mock_http(handler)
+    
+    async def fetch_many():
+        return await asyncio.gather(*(http_client.get(f"https://example.com/{i}") for i in range(6)))
+    responses = http_client.run_http(fetch_many())
+    
+    assert len(responses) == 6
+    assert active["peak"] == 2
+
+def test_close_http_client_stops_loop(mock_http):
+    """Test the shutdown hook closes the client and can be called repeatedly."""
+    mock_http(lambda request: httpx.Response(200, text="ok"))
+    http_client.http_get("https://example.com/")
+    client = http_client._client
+    
+    http_client.close_http_client()
+    http_client.close_http_client()
+    
+    assert client.is_closed
+    assert http_client._loop is None
+
+def test_conditional_get_revalidates_with_stored_validators(mock_http):
+    """Test that validators are replayed and a 304 is reported as None."""
+    requests = []
+    def handler(request):
+        requests.append(dict(request.headers))
+        if request.headers.get("if-none-match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, text="page", headers={"ETag": '"v1"', "Last-Modified": "Sun, 05 Oct 2025 10:00:00 GMT"})
+    mock_http(handler)
+    
+    first = http_client.http_get_if_modified("https://example.com/article")
+    assert first.text == "page"
+    assert "if-none-match" not in requests[0]
+    
+    assert http_client.http_get_if_modified("https://example.com/article") is None
+    assert requests[1]["if-none-match"] == '"v1"'
+    assert requests[1]["if-modified-since"] == "Sun, 05 Oct 2025 10:00:00 GMT"
+    
+    # Forgetting the validators makes the next request unconditional again
+    http_client.forget_validators("https://example.com/article")
+    assert http_client.http_get_if_modified("https://example.com/article").text == "page"
+    assert "if-none-match" not in requests[2]
+
+def test_unconditional_get_records_validators(mock_http):
+    """Test that the first, unconditional fetch already enables revalidation."""
+    requests = []
+    def handler(request):
+        requests.append(dict(request.headers))
+        if request.headers.get("if-none-match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, text="page", headers={"ETag": '"v1"'})
+    mock_http(handler)
+
+    assert http_client.http_get_if_modified("https://example.com/first", revalidate=False).text == "page"
+    assert "if-none-match" not in requests[0]
+    assert http_client.http_get_if_modified("https://example.com/first") is None
@@ -0,0 +1,63 @@
+import asyncio
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+import pytest
+from fastmcp import Client
+
+ROOT = Path(__file__).resolve().parent.parent
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+@pytest.fixture
+def http_server(tmp_path):
+    """Run the server over streamable HTTP in a subprocess."""
+    port = _free_port()
+    command = f"from app.server import run_server; run_server(scheduler=False, transport='http', port={port}, workers=4)"
+    process = subprocess.Popen(
+        [sys.executable, "-c", command],
+        cwd=ROOT,
+        env={"PATH": "", "PYTHONPATH": str(ROOT), "PIGSKIN_CACHE_DIR": str(tmp_path)},
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=0.5).close()
+                break
+            except OSError:
+                if process.poll() is not None or time.monotonic() > deadline:
+                    pytest.fail("HTTP server did not start")
+                time.sleep(0.1)
+        yield f"http://127.0.0.1:{port}/mcp/"
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+@pytest.mark.asyncio
+async def test_concurrent_clients_share_one_server(http_server):
+    """Test that several clients list tools and call tools on one HTTP server."""
+    async def session():
+        async with Client(http_server) as client:
+            tools = await client.list_tools()
+            await client.call_tool("get_server_metrics")
+            return {tool.name for tool in tools}
+    
+    results = await asyncio.gather(*(session() for _ in range(5)))
+    assert all("get_player_ratings" in names for names in results)
+    
+    async with Client(http_server) as client:
+        metrics = (await client.call_tool("get_server_metrics")).data
+    calls = {
+        s["labels"]["tool"]: s["value"]
+        for s in metrics["counters"]["tool_calls_total"] if s["labels"]["status"] == "ok"
+    }
+    # All sessions were served by the same process
+    assert calls["get_server_metrics"] == 5
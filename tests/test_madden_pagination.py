@@ -1,6 +1,11 @@
+import asyncio
+import httpx
 import pytest
-from unittest.mock import patch, Mock
-from app.scraper.madden_ratings import fetch_madden_ratings
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from app.resources import player_ratings_resource
+from app.scraper import madden_ratings
+from app.scraper.madden_ratings import fetch_madden_ratings, fetch_madden_ratings_async
 
 PAGE_BASE_HTML = '''
 <table>
@@ -31,29 +36,199 @@ PAGE_2_HTML = '''
 EMPTY_PAGE_HTML = """<table></table>"""
 
 
-def _make_response(html: str):
-    m = Mock()
-    m.status_code = 200
-    m.text = html
-    m.raise_for_status = Mock()
-    return m
+def _html_handler(handler):
+    """Adapt `handler(url) -> html` to an httpx transport handler."""
+    return lambda request: httpx.Response(200, text=handler(str(request.url)))
 
 
-@patch("httpx.get")
-def test_fetch_madden_ratings_paginates(mock_get):
-    def side_effect(url, timeout):
+def _page_html(name: str, position: str = "WR", team: str = "Kansas City Chiefs", overall: int = 80) -> str:
+    return f'''
+<table>
+  <tr class="Table_row__eoyUr">
+    <td>
+      <span class="Table_profileLabel__tuyG0">{name}</span>
+      <span class="Table_tag__vKZKn">{position}</span>
+      <img alt="{team}" />
+      <span class="Table_statCellValue__zn5Cx">{overall}</span>
+    </td>
+  </tr>
+</table>
+'''
+
+
+def test_fetch_madden_ratings_paginates(mock_http):
+    def side_effect(url):
         if url.endswith("ratings"):
-            return _make_response(PAGE_BASE_HTML)
+            return PAGE_BASE_HTML
         if url.endswith("page=2"):
-            return _make_response(PAGE_2_HTML)
+            return PAGE_2_HTML
         # page=3 or beyond returns empty
-        return _make_response(EMPTY_PAGE_HTML)
-
-    mock_get.side_effect = side_effect
+        return EMPTY_PAGE_HTML
 
+    mock_http(_html_handler(side_effect))
     players = fetch_madden_ratings()
     names = {p["name"] for p in players}
 
     assert "Player One" in names
     assert "Player Two" in names
     assert len(players) == 2
+
+
+def test_fetch_madden_ratings_keeps_page_order_when_pages_finish_out_of_order(mock_http):
+    last_page = 9
+    fetched = []
+
+    async def transport_handler(request):
+        page = int(request.url.params.get("page", 1))
+        fetched.append(page)
+        # Later pages answer first
+        await asyncio.sleep(0.01 * (last_page + 1 - page))
+        html = _page_html(f"Player {page}") if page <= last_page else EMPTY_PAGE_HTML
+        return httpx.Response(200, text=html)
+
+    mock_http(transport_handler)
+    players = asyncio.run(fetch_madden_ratings_async(concurrency=4))
+
+    assert [p["name"] for p in players] == [f"Player {page}" for page in range(1, last_page + 1)]
+    # Speculative fetches stop within one window of the first empty page
+    assert max(fetched) <= last_page + 4
+
+
+def test_fetch_madden_ratings_stops_at_first_empty_page(mock_http):
+    def side_effect(url):
+        if url.endswith("ratings"):
+            return _page_html("Base Player")
+        page = int(url.rsplit("=", 1)[1])
+        # A gap at page 4: later pages must be ignored, as in a serial crawl
+        return EMPTY_PAGE_HTML if page == 4 or page > 6 else _page_html(f"Player {page}")
+
+    mock_http(_html_handler(side_effect))
+    players = fetch_madden_ratings()
+
+    assert [p["name"] for p in players] == ["Base Player", "Player 2", "Player 3"]
+
+
+def _numbered_pages_handler(last_page):
+    def side_effect(url):
+        if url.endswith("ratings"):
+            return _page_html("Base Player", position="QB", team="Buffalo Bills")
+        page = int(url.rsplit("=", 1)[1])
+        return _page_html(f"Player {page}", overall=70 + page) if page <= last_page else EMPTY_PAGE_HTML
+    return _html_handler(side_effect)
+
+
+def test_parse_workers_match_in_process_parsing(mock_http, monkeypatch):
+    mock_http(_numbered_pages_handler(6))
+    monkeypatch.setattr(madden_ratings, "MADDEN_PARSE_WORKERS", 2)
+    pooled = fetch_madden_ratings()
+    monkeypatch.setattr(madden_ratings, "MADDEN_PARSE_WORKERS", 0)
+    serial = fetch_madden_ratings()
+
+    assert pooled == serial
+    assert [p["name"] for p in pooled] == ["Base Player"] + [f"Player {page}" for page in range(2, 7)]
+
+
+def test_unusable_parse_pool_falls_back_to_in_process_parsing(mock_http, monkeypatch):
+    def closed_pool(workers):
+        pool = ProcessPoolExecutor(max_workers=1)
+        pool.shutdown()
+        return pool
+
+    mock_http(_numbered_pages_handler(3))
+    monkeypatch.setattr(madden_ratings, "_start_parse_pool", closed_pool)
+
+    assert [p["name"] for p in fetch_madden_ratings()] == ["Base Player", "Player 2", "Player 3"]
+
+
+def test_failed_page_raises_and_next_crawl_resumes(mock_http, monkeypatch):
+    monkeypatch.setattr(madden_ratings, "MADDEN_PARSE_WORKERS", 0)
+    fetched = []
+    failing = {5}
+
+    def handler(request):
+        page = int(request.url.params.get("page", 1))
+        fetched.append(page)
+        if page in failing:
+            return httpx.Response(503, text="unavailable")
+        return httpx.Response(200, text=_page_html(f"Player {page}") if page <= 8 else EMPTY_PAGE_HTML)
+
+    mock_http(handler)
+    with pytest.raises(madden_ratings.MaddenPageError):
+        fetch_madden_ratings()
+
+    failing.clear()
+    fetched.clear()
+    players = fetch_madden_ratings()
+
+    assert [p["name"] for p in players] == [f"Player {page}" for page in range(1, 9)]
+    # Pages completed before the failure come from the page cache
+    assert 1 not in fetched and 2 not in fetched and 5 in fetched
+
+    # The finished crawl leaves no progress behind: the next one fetches every page
+    fetched.clear()
+    fetch_madden_ratings()
+    assert 1 in fetched and 2 in fetched
+
+
+def test_unchanged_pages_are_not_reparsed(mock_http, monkeypatch):
+    mock_http(_numbered_pages_handler(3))
+    monkeypatch.setattr(madden_ratings, "MADDEN_PARSE_WORKERS", 0)
+    first = fetch_madden_ratings()
+
+    parsed = []
+    parse = madden_ratings._parse_madden_ratings_html
+    monkeypatch.setattr(madden_ratings, "_parse_madden_ratings_html", lambda html: parsed.append(html) or parse(html))
+    assert fetch_madden_ratings() == first
+    # Only the empty pages past the end of the data are parsed again
+    assert parsed and all(html == EMPTY_PAGE_HTML for html in parsed)
+
+
+def test_not_found_page_ends_the_data(mock_http):
+    def handler(request):
+        page = int(request.url.params.get("page", 1))
+        if page > 3:
+            return httpx.Response(404, text="not found")
+        return httpx.Response(200, text=_page_html(f"Player {page}"))
+
+    mock_http(handler)
+    assert [p["name"] for p in fetch_madden_ratings()] == ["Player 1", "Player 2", "Player 3"]
+
+
+def test_base_page_without_players_is_an_error(mock_http, cache_store):
+    """A markup change that leaves no parseable rows must not replace the cached ratings."""
+    mock_http(_html_handler(lambda url: EMPTY_PAGE_HTML))
+    cached = [{"name": "Player One", "position": "QB", "team": "Buffalo Bills", "overall": 80, "source": "Madden NFL"}]
+    player_ratings_resource.set_madden_cache(cached)
+
+    with pytest.raises(madden_ratings.MaddenPageError):
+        player_ratings_resource._refresh_madden_ratings(max_age=0)
+    assert player_ratings_resource.get_madden_cache_entry().data == cached
+
+
+@pytest.mark.asyncio
+async def test_crawl_progress_batches_writes(cache_store, monkeypatch):
+    """Pages completed while a progress write is in flight are saved together."""
+    writes = []
+    set_entry = cache_store.set_entry
+    monkeypatch.setattr(cache_store, "set_entry", lambda *args, **kwargs: writes.append(1) or set_entry(*args, **kwargs))
+    progress = madden_ratings.CrawlProgress(0.0, [])
+
+    await asyncio.gather(*(progress.done(page) for page in range(2, 12)))
+
+    assert len(writes) < 10
+    saved = cache_store.get_entry(madden_ratings.MADDEN_PAGES_NAMESPACE, madden_ratings.CRAWL_PROGRESS_KEY)
+    assert saved.data["pages"] == [str(page) for page in range(2, 12)]
+
+
+@pytest.mark.asyncio
+async def test_in_process_parsing_stays_off_the_loop(monkeypatch):
+    """Without a parse pool, pages are parsed in a thread rather than on the HTTP loop."""
+    threads = []
+    parse = madden_ratings._parse_madden_ratings_html
+    monkeypatch.setattr(
+        madden_ratings, "_parse_madden_ratings_html", lambda html: threads.append(threading.current_thread()) or parse(html)
+    )
+    players = await madden_ratings._parse_in_pool(None, _page_html("Player One"))
+
+    assert [p["name"] for p in players] == ["Player One"]
+    assert threads and threading.current_thread() not in threads
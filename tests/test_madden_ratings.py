@@ -1,5 +1,6 @@
+import httpx
 import pytest
-from unittest.mock import patch, Mock
+from app.scraper import madden_ratings
 from app.scraper.madden_ratings import fetch_madden_ratings, extract_player_data
 
 MOCK_HTML = '''
@@ -41,27 +42,17 @@ MOCK_HTML = '''
 
 EMPTY_PAGE_HTML = """<table></table>"""
 
-@patch("httpx.get")
-def test_fetch_madden_ratings(mock_get):
+def test_fetch_madden_ratings(mock_http):
     """Test fetching Madden ratings from the website."""
-    def side_effect(url, timeout):
+    def handler(request):
         # Return the mock data for the base page, empty for any pagination
-        if url.endswith("ratings") and "page=" not in url:
-            mock_response = Mock()
-            mock_response.status_code = 200
-            mock_response.text = MOCK_HTML
-            mock_response.raise_for_status = Mock()
-            return mock_response
+        if "page" not in request.url.params:
+            return httpx.Response(200, text=MOCK_HTML)
         else:
             # Return empty page for any pagination attempts
-            mock_response = Mock()
-            mock_response.status_code = 200
-            mock_response.text = EMPTY_PAGE_HTML
-            mock_response.raise_for_status = Mock()
-            return mock_response
-    
-    mock_get.side_effect = side_effect
+            return httpx.Response(200, text=EMPTY_PAGE_HTML)
     
+    mock_http(handler)
     ratings = fetch_madden_ratings()
     
     assert isinstance(ratings, list)
@@ -72,14 +63,15 @@ def test_fetch_madden_ratings(mock_get):
     assert ratings[0]["overall"] == 88
     assert ratings[0]["source"] == "Madden NFL"
 
-@patch("httpx.get")
-def test_fetch_madden_ratings_http_error(mock_get):
+def test_fetch_madden_ratings_http_error(mock_http):
     """Test handling of HTTP errors."""
-    mock_get.side_effect = Exception("Network error")
+    def handler(request):
+        raise Exception("Network error")
     
-    # With pagination, errors are caught and return empty results
-    ratings = fetch_madden_ratings()
-    assert ratings == []
+    # A failed page is an error, never mistaken for the end of the data
+    mock_http(handler)
+    with pytest.raises(madden_ratings.MaddenPageError):
+        fetch_madden_ratings()
 
 def test_extract_player_data():
     """Test extracting player data from a table row."""
@@ -108,3 +100,33 @@ def test_extract_player_data_invalid_row():
     player_data = extract_player_data(row)
     
     assert player_data is None
+
+def test_fast_path_matches_full_parse():
+    """Test that the row-only parser extracts the same players as the whole-page parser."""
+    page = "<html><body><nav><a>Ratings</a></nav><table>" + MOCK_HTML + MOCK_HTML.replace("88", "91") + "</table></body></html>"
+    
+    fast = madden_ratings._parse_madden_rows_fast(page)
+    
+    assert fast == madden_ratings._parse_madden_ratings_html_full(page)
+    assert [p["overall"] for p in fast] == [88, 91]
+    assert madden_ratings._parse_madden_ratings_html(page) == fast
+
+def test_fast_path_falls_back_to_full_parse(monkeypatch):
+    """Test that a page where the fast path finds no rows is parsed in full."""
+    page = "<table>" + MOCK_HTML.replace("<tr ", "<TR ") + "</table>"
+    full_parses = []
+    full_parse = madden_ratings._parse_madden_ratings_html_full
+    monkeypatch.setattr(
+        madden_ratings, "_parse_madden_ratings_html_full", lambda html: full_parses.append(html) or full_parse(html)
+    )
+    
+    players = madden_ratings._parse_madden_ratings_html(page)
+    
+    assert len(full_parses) == 1
+    assert players[0]["name"] == "Devon Witherspoon"
+
+def test_team_from_alt_text():
+    """Test the team lookup table and its fallback for other alt texts."""
+    assert madden_ratings.team_from_alt_text("San Francisco 49ers") == "San Francisco 49ers"
+    assert madden_ratings.team_from_alt_text("Logo: Kansas City Chiefs") == "Kansas City Chiefs"
+    assert madden_ratings.team_from_alt_text("Player headshot") == "Unknown"
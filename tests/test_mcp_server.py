@@ -108,3 +108,10 @@ if __name__ == "__main__":
     
     # Then test the underlying functions
     asyncio.run(test_mcp_functions())
+
+def test_registered_tool_names():
+    """The startup log lists every registered tool, including ones added later."""
+    from app import server
+    names = server.registered_tool_names()
+    assert set(server.CACHED_TOOL_SOURCES) <= set(names)
+    assert "get_server_metrics" in names
@@ -0,0 +1,83 @@
+import json
+import time
+import pytest
+from fastmcp import Client
+from app import metrics
+from app.cache import refresh
+from app.cache.cache import CacheEntry
+
+@pytest.fixture
+def registry(monkeypatch):
+    """A fresh registry standing in for the process-wide one."""
+    fresh = metrics.MetricsRegistry()
+    for name in ("increment", "observe", "timed", "snapshot", "render_prometheus"):
+        monkeypatch.setattr(metrics, name, getattr(fresh, name))
+    return fresh
+
+def _series(snapshot, kind, name):
+    return {tuple(sorted(s["labels"].items())): s for s in snapshot[kind].get(name, [])}
+
+def test_counters_and_histograms():
+    """Test counting by label set and summarizing observations."""
+    registry = metrics.MetricsRegistry()
+    registry.increment("cache_requests_total", source="madden_ratings", result="hit")
+    registry.increment("cache_requests_total", source="madden_ratings", result="hit")
+    registry.increment("cache_requests_total", source="madden_ratings", result="miss")
+    registry.observe("parse_seconds", 0.2, source="madden_ratings")
+    registry.observe("parse_seconds", 0.4, source="madden_ratings")
+
+    snapshot = registry.snapshot()
+    counters = _series(snapshot, "counters", "cache_requests_total")
+    assert counters[(("result", "hit"), ("source", "madden_ratings"))]["value"] == 2
+    assert counters[(("result", "miss"), ("source", "madden_ratings"))]["value"] == 1
+    parse = _series(snapshot, "histograms", "parse_seconds")[(("source", "madden_ratings"),)]
+    assert parse["count"] == 2
+    assert parse["avg"] == pytest.approx(0.3)
+    assert parse["max"] == pytest.approx(0.4)
+    # Snapshots are served as tool output
+    json.dumps(snapshot)
+
+def test_prometheus_text_format(tmp_path):
+    """Test the Prometheus exposition of counters and cumulative histogram buckets."""
+    registry = metrics.MetricsRegistry()
+    registry.increment("tool_calls_total", tool="get_player_ratings", status="ok")
+    registry.observe("tool_response_bytes", 3000, tool="get_player_ratings")
+
+    text = registry.render_prometheus()
+    assert "# TYPE pigskin_tool_calls_total counter" in text
+    assert 'pigskin_tool_calls_total{status="ok",tool="get_player_ratings"} 1' in text
+    assert 'pigskin_tool_response_bytes_bucket{tool="get_player_ratings",le="1024"} 0' in text
+    assert 'pigskin_tool_response_bytes_bucket{tool="get_player_ratings",le="4096"} 1' in text
+    assert 'pigskin_tool_response_bytes_bucket{tool="get_player_ratings",le="+Inf"} 1' in text
+    assert 'pigskin_tool_response_bytes_count{tool="get_player_ratings"} 1' in text
+
+def test_write_prometheus_file(tmp_path, registry):
+    """Test dumping the process-wide metrics to a file."""
+    registry.increment("cache_requests_total", source="nfl_injuries", result="stale")
+    path = tmp_path / "metrics.prom"
+    metrics.write_prometheus(str(path))
+    assert 'pigskin_cache_requests_total{result="stale",source="nfl_injuries"} 1' in path.read_text()
+
+def test_serve_cached_counts_results(registry):
+    """Test that hits, stale serves and misses are counted per source."""
+    fresh = CacheEntry(["data"], time.time())
+    refresh.serve_cached("test_source", fresh, 60, 120, lambda: ["new"])
+    refresh.serve_cached("test_source", None, 60, 120, lambda: ["new"])
+
+    counters = _series(registry.snapshot(), "counters", "cache_requests_total")
+    assert counters[(("result", "hit"), ("source", "test_source"))]["value"] == 1
+    assert counters[(("result", "miss"), ("source", "test_source"))]["value"] == 1
+    assert _series(registry.snapshot(), "histograms", "refresh_seconds")[(("source", "test_source"),)]["count"] == 1
+
+@pytest.mark.asyncio
+async def test_get_server_metrics_tool(registry):
+    """Test that tool calls are recorded and exposed through get_server_metrics."""
+    from app.server import mcp
+    async with Client(mcp) as client:
+        await client.call_tool("get_server_metrics")
+        result = await client.call_tool("get_server_metrics")
+
+    calls = _series(result.data, "counters", "tool_calls_total")
+    assert calls[(("status", "ok"), ("tool", "get_server_metrics"))]["value"] == 1
+    sizes = _series(result.data, "histograms", "tool_response_bytes")
+    assert sizes[(("tool", "get_server_metrics"),)]["min"] > 0
@@ -0,0 +1,47 @@
+import pytest
+from app import pagination
+
+PLAYERS = [
+    {"name": "A", "team": "KC", "ratings": [{"source": "Madden NFL", "overall": 80, "attributes": {}}, {"source": "PFF", "adp": 3.5}]},
+    {"name": "B", "team": "BUF", "ratings": [{"source": "PFF", "adp": 1.0, "overall": None}]},
+    {"name": "C", "team": "KC", "ratings": [{"source": "Madden NFL", "overall": 95}]},
+]
+
+def test_project_records_through_lists():
+    """Test that dotted paths select fields inside every list element."""
+    projected = pagination.project_records(PLAYERS, ["name", "ratings.overall"])
+    
+    assert projected[0] == {"name": "A", "ratings": [{"overall": 80}, {}]}
+    assert projected[2] == {"name": "C", "ratings": [{"overall": 95}]}
+    # Source records are untouched
+    assert "team" in PLAYERS[0]
+
+def test_sort_records_by_nested_path():
+    """Test sorting by a nested path, descending, with missing values last."""
+    assert [p["name"] for p in pagination.sort_records(PLAYERS, "-ratings.overall")] == ["C", "A", "B"]
+    assert [p["name"] for p in pagination.sort_records(PLAYERS, "ratings.overall")] == ["A", "C", "B"]
+    assert [p["name"] for p in pagination.sort_records(PLAYERS, "team")] == ["B", "A", "C"]
+
+def test_paginate_walks_all_pages():
+    """Test that following next_cursor visits every record exactly once."""
+    query = pagination.query_token("all")
+    seen = []
+    page = pagination.paginate(PLAYERS, "v1", query, limit=2, items_key="players")
+    seen += page["players"]
+    while page["next_cursor"]:
+        position = pagination.decode_cursor(page["next_cursor"], query)
+        page = pagination.paginate(PLAYERS, position["v"], query, position["l"], position["o"], items_key="players")
+        seen += page["players"]
+    
+    assert seen == PLAYERS
+    assert page["total"] == 3
+
+def test_cursor_rejects_other_queries_and_garbage():
+    """Test that cursors are bound to their query and validated."""
+    cursor = pagination.encode_cursor("v1", 2, pagination.query_token("team", "kc"), 2)
+    with pytest.raises(ValueError):
+        pagination.decode_cursor(cursor, pagination.query_token("team", "buf"))
+    with pytest.raises(ValueError):
+        pagination.decode_cursor("not-a-cursor", pagination.query_token("team", "kc"))
+    with pytest.raises(ValueError):
+        pagination.check_limit(0)
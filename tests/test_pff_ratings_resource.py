@@ -0,0 +1,66 @@
+import os
+import time
+import pytest
+from app.cache import cache
+from app.resources import pff_ratings_resource
+
+CSV_HEADER = "Draft-rankings-export-2025\n\nOverall Rank,Full Name,Team Abbreviation,Position,Position Rank,Bye Week,ADP,Projected Points,Auction Value\n"
+
+def _write_csv(path, rows):
+    with open(path, "w") as f:
+        f.write(CSV_HEADER)
+        for row in rows:
+            f.write(row + "\n")
+
+@pytest.fixture
+def pff_csv(tmp_path, monkeypatch):
+    path = tmp_path / "pff_ratings.csv"
+    monkeypatch.setattr(pff_ratings_resource, "PFF_CSV_PATH", path)
+    cache.clear_memory_cache()
+    return path
+
+def test_load_pff_ratings_converts_columns(pff_csv):
+    """Test that CSV columns map onto rating fields and missing values are dropped."""
+    _write_csv(pff_csv, [
+        '1,"Ja\'Marr Chase","CIN","wr",1,10,1.5,333.68,59',
+        '2,"Brandon Johnson","PIT","WR",192,5,170,16.94,"N/A"',
+    ])
+    
+    ratings = pff_ratings_resource.load_pff_ratings()
+    
+    assert ratings[0] == {
+        "name": "Ja'Marr Chase", "position": "WR", "team": "CIN", "overall_rank": 1,
+        "position_rank": 1, "bye_week": 10, "adp": 1.5, "projected_points": 333.68,
+        "auction_value": 59.0, "source": "Pro Football Focus",
+    }
+    assert "auction_value" not in ratings[1]
+    # A gappy int column is float, as pandas read it; a complete one stays int
+    assert type(ratings[0]["auction_value"]) is float and type(ratings[0]["bye_week"]) is int
+
+def test_load_pff_ratings_resolves_column_aliases(pff_csv):
+    """Test that alternate column names are accepted."""
+    with open(pff_csv, "w") as f:
+        f.write("export\nplayer,pos,team,rating\nJosh Allen,qb,BUF,3\n")
+    
+    ratings = pff_ratings_resource.load_pff_ratings()
+    
+    assert ratings == [{"name": "Josh Allen", "position": "QB", "team": "BUF", "overall_rank": 3, "source": "Pro Football Focus"}]
+
+def test_load_pff_ratings_memoized_until_file_changes(pff_csv, monkeypatch):
+    """Test that the CSV is parsed once and reloaded only after it changes."""
+    _write_csv(pff_csv, ['1,"Player A","CIN","WR",1,10,1.5,300,50'])
+    parses = []
+    real_parse = pff_ratings_resource._parse_pff_csv
+    def counting_parse(f):
+        parses.append(1)
+        return real_parse(f)
+    monkeypatch.setattr(pff_ratings_resource, "_parse_pff_csv", counting_parse)
+    
+    first = pff_ratings_resource.load_pff_ratings()
+    assert pff_ratings_resource.get_pff_ratings_by_position("WR") == first
+    assert pff_ratings_resource.load_pff_ratings() is first
+    assert len(parses) == 1
+    
+    _write_csv(pff_csv, ['1,"Player B","PIT","RB",1,5,2.5,250,40'])
+    assert pff_ratings_resource.load_pff_ratings()[0]["name"] == "Player B"
+    assert len(parses) == 2
@@ -1,10 +1,16 @@
 import pytest
+from concurrent.futures import ThreadPoolExecutor
 from unittest.mock import patch, Mock
+from app.resources import player_ratings_resource
 from app.resources.player_ratings_resource import (
     get_all_player_ratings,
     get_player_ratings_by_source,
     get_player_ratings_by_position,
-    get_player_ratings_by_team
+    get_player_ratings_by_team,
+    get_player_rating,
+    combine_player_ratings,
+    invalidate_player_ratings,
+    get_combine_cache_info
 )
 
 MOCK_RATINGS = [
@@ -31,76 +37,167 @@ MOCK_RATINGS = [
     }
 ]
 
-def test_get_all_player_ratings_cache_hit(monkeypatch):
-    """Test getting player ratings when cache has data."""
-    def mock_get_cache():
-        return MOCK_RATINGS
-    
-    def mock_set_cache(ratings):
-        pass
-    
-    monkeypatch.setattr("app.resources.player_ratings_resource.get_ratings_cache", mock_get_cache)
-    monkeypatch.setattr("app.resources.player_ratings_resource.set_ratings_cache", mock_set_cache)
-    
-    result = get_all_player_ratings()
-    assert result == MOCK_RATINGS
+MOCK_PFF_RATINGS = [
+    {
+        "name": "Patrick Mahomes",
+        "position": "QB",
+        "team": "KC",
+        "overall_rank": 40,
+        "source": "Pro Football Focus"
+    },
+    {
+        "name": "Puka Nacua",
+        "position": "WR",
+        "team": "LAR",
+        "overall_rank": 8,
+        "source": "Pro Football Focus"
+    }
+]
 
-def test_get_all_player_ratings_cache_miss(monkeypatch):
-    """Test getting player ratings when cache is empty."""
-    def mock_get_cache():
-        return None
-    
-    def mock_set_cache(ratings):
-        pass
-    
+@pytest.fixture
+def sources(monkeypatch):
+    """Serve mock Madden and PFF data under a controllable data version."""
+    state = {"madden": MOCK_RATINGS, "pff": MOCK_PFF_RATINGS, "version": ("v1",), "madden_calls": 0, "fresh": True}
     def mock_get_all_madden_ratings():
-        return MOCK_RATINGS
-    
-    monkeypatch.setattr("app.resources.player_ratings_resource.get_ratings_cache", mock_get_cache)
-    monkeypatch.setattr("app.resources.player_ratings_resource.set_ratings_cache", mock_set_cache)
-    monkeypatch.setattr("app.resources.player_ratings_resource.get_all_madden_ratings", mock_get_all_madden_ratings)
-    
+        state["madden_calls"] += 1
+        return state["madden"]
+    monkeypatch.setattr(player_ratings_resource, "get_all_madden_ratings", mock_get_all_madden_ratings)
+    monkeypatch.setattr(player_ratings_resource, "get_all_pff_ratings", lambda: state["pff"])
+    monkeypatch.setattr(player_ratings_resource, "_ratings_data_version", lambda: state["version"])
+    monkeypatch.setattr(player_ratings_resource, "_madden_is_fresh", lambda: state["fresh"])
+    monkeypatch.setattr(player_ratings_resource, "_snapshot", None)
+    monkeypatch.setattr(player_ratings_resource, "_snapshot_history", player_ratings_resource.OrderedDict())
+    monkeypatch.setattr(player_ratings_resource, "_combined", None)
+    monkeypatch.setattr(player_ratings_resource, "_combine_counters", {"recombinations": 0, "memo_hits": 0, "invalidations": 0})
+    return state
+
+def test_get_all_player_ratings_combines_sources(sources):
+    """Test that Madden and PFF ratings are merged per player."""
     result = get_all_player_ratings()
-    assert result == MOCK_RATINGS
+    
+    assert len(result) == 4
+    mahomes = next(p for p in result if p["name"] == "Patrick Mahomes")
+    assert [r["source"] for r in mahomes["ratings"]] == ["Madden NFL", "Pro Football Focus"]
+    assert mahomes["team"] == "KC"
 
-def test_get_player_ratings_by_source(monkeypatch):
+def test_get_all_player_ratings_rebuilt_only_on_version_change(sources):
+    """Test that the combined dataset is reused until the data version changes."""
+    first = get_all_player_ratings()
+    assert get_all_player_ratings() is first
+    assert sources["madden_calls"] == 1
+    
+    sources["madden"] = MOCK_RATINGS[:1]
+    sources["version"] = ("v2",)
+    assert len(get_all_player_ratings()) == 3
+    assert sources["madden_calls"] == 2
+
+def test_expired_madden_goes_through_the_cache(sources):
+    """Test that the memo does not hide expired Madden data from its refresh."""
+    first = get_all_player_ratings()
+    sources["fresh"] = False
+    # Same data version: the sources are re-read (refreshing them) but not recombined
+    assert get_all_player_ratings() is first
+    assert get_all_player_ratings() is first
+    assert sources["madden_calls"] == 3
+    assert get_combine_cache_info()["recombinations"] == 1
+
+def test_cold_start_memoized_under_loaded_version(sources, monkeypatch):
+    """Test that a cold start memoizes under the version of the data it loaded."""
+    sources["version"] = (None,)
+    def cold_madden():
+        sources["version"] = ("v1",)
+        return sources["madden"]
+    monkeypatch.setattr(player_ratings_resource, "get_all_madden_ratings", cold_madden)
+    first = combine_player_ratings()
+    assert combine_player_ratings() is first
+    assert get_combine_cache_info()["recombinations"] == 1
+
+def test_get_player_ratings_by_source(sources):
     """Test filtering player ratings by source."""
-    def mock_get_all_ratings():
-        return MOCK_RATINGS
-    
-    monkeypatch.setattr("app.resources.player_ratings_resource.get_all_player_ratings", mock_get_all_ratings)
-    
     result = get_player_ratings_by_source("Madden NFL")
     assert len(result) == 3
-    assert all(rating["source"] == "Madden NFL" for rating in result)
+    assert all(len(player["ratings"]) == 1 and player["ratings"][0]["source"] == "Madden NFL" for player in result)
+    
+    result = get_player_ratings_by_source("pro football focus")
+    assert {player["name"] for player in result} == {"Patrick Mahomes", "Puka Nacua"}
     
     result = get_player_ratings_by_source("Unknown Source")
     assert len(result) == 0
 
-def test_get_player_ratings_by_position(monkeypatch):
+def test_get_player_ratings_by_position(sources):
     """Test filtering player ratings by position."""
-    def mock_get_all_ratings():
-        return MOCK_RATINGS
-    
-    monkeypatch.setattr("app.resources.player_ratings_resource.get_all_player_ratings", mock_get_all_ratings)
-    
-    result = get_player_ratings_by_position("QB")
+    result = get_player_ratings_by_position("qb")
     assert len(result) == 1
     assert result[0]["name"] == "Patrick Mahomes"
     
-    result = get_player_ratings_by_position("WR")
+    result = get_player_ratings_by_position("TE")
     assert len(result) == 0
 
-def test_get_player_ratings_by_team(monkeypatch):
+def test_get_player_ratings_by_team(sources):
     """Test filtering player ratings by team."""
-    def mock_get_all_ratings():
-        return MOCK_RATINGS
-    
-    monkeypatch.setattr("app.resources.player_ratings_resource.get_all_player_ratings", mock_get_all_ratings)
-    
     result = get_player_ratings_by_team("Seattle Seahawks")
     assert len(result) == 1
     assert result[0]["name"] == "Devon Witherspoon"
     
     result = get_player_ratings_by_team("Unknown Team")
     assert len(result) == 0
+
+def test_get_player_rating_by_key(sources):
+    """Test looking up a single player by normalized name and position."""
+    player = get_player_rating("  patrick mahomes ", "qb")
+    assert player is not None
+    assert player["name"] == "Patrick Mahomes"
+    assert get_player_rating("Patrick Mahomes", "WR") is None
+
+def test_combine_player_ratings_memoized_by_version(sources):
+    """Test that recombination only runs for a new version or after invalidation."""
+    first = combine_player_ratings()
+    assert combine_player_ratings() is first
+    assert get_all_player_ratings() is first
+    assert get_combine_cache_info()["recombinations"] == 1
+    
+    invalidate_player_ratings()
+    assert combine_player_ratings() is not first
+    
+    sources["version"] = ("v2",)
+    combine_player_ratings()
+    info = get_combine_cache_info()
+    assert info["recombinations"] == 3
+    assert info["invalidations"] == 1
+    assert info["memo_hits"] >= 2
+
+def test_combine_counters_exact_under_concurrent_calls(sources):
+    """Test that memo hits from concurrent callers are all counted."""
+    combine_player_ratings()
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        list(pool.map(lambda _: combine_player_ratings(), range(2000)))
+    info = get_combine_cache_info()
+    assert info["memo_hits"] == 2000
+    assert info["recombinations"] == 1
+
+def test_query_player_ratings_pages_from_stable_snapshot(sources):
+    """Test that a cursor keeps paging the snapshot it started on across a refresh."""
+    first = player_ratings_resource.query_player_ratings(limit=2, sort_by="name", fields=["name"])
+    assert first["players"] == [{"name": "Christian McCaffrey"}, {"name": "Devon Witherspoon"}]
+    assert first["total"] == 4
+    
+    # Background refresh: new data version with an extra player
+    sources["madden"] = MOCK_RATINGS + [{"name": "Aaron Rodgers", "position": "QB", "team": "PIT", "overall": 80, "source": "Madden NFL"}]
+    sources["version"] = ("v2",)
+    
+    second = player_ratings_resource.query_player_ratings(cursor=first["next_cursor"], sort_by="name", fields=["name"])
+    assert second["players"] == [{"name": "Patrick Mahomes"}, {"name": "Puka Nacua"}]
+    assert second["next_cursor"] is None
+    assert second["version"] == first["version"]
+    
+    fresh = player_ratings_resource.query_player_ratings(limit=2, sort_by="name", fields=["name"])
+    assert fresh["players"][0] == {"name": "Aaron Rodgers"}
+    assert fresh["version"] != first["version"]
+
+def test_query_player_ratings_filters_without_paging(sources):
+    """Test that filters with only projection and sorting return a plain list."""
+    result = player_ratings_resource.query_player_ratings("position", "qb", fields=["name", "ratings.source"])
+    
+    assert result == [{"name": "Patrick Mahomes", "ratings": [{"source": "Madden NFL"}, {"source": "Pro Football Focus"}]}]
+    with pytest.raises(ValueError):
+        player_ratings_resource.query_player_ratings("team", "kc", cursor="bogus")
@@ -0,0 +1,67 @@
+import asyncio
+import pytest
+from app import execution, profiling
+from app.cache import refresh
+from app.scraper import madden_ratings
+
+@pytest.fixture
+def profile_dir(tmp_path, monkeypatch):
+    """Enable profiling into a temporary directory for one test."""
+    for name in ("PROFILE_DIR", "PROFILE_RATE", "PROFILE_TOOLS", "PROFILE_MEMORY"):
+        monkeypatch.setattr(profiling, name, getattr(profiling, name))
+    profiling.configure(str(tmp_path), tools=["slow_tool"], memory=True)
+    return tmp_path
+
+def _work(n):
+    data = [str(i) * 10 for i in range(n)]
+    return len(data)
+
+def test_profiled_call_writes_reports(profile_dir):
+    """Test that a sampled tool call writes cProfile and tracemalloc reports."""
+    result = asyncio.run(execution.run_blocking("slow_tool", _work, 20000))
+    
+    assert result == 20000
+    assert len(list(profile_dir.glob("*-slow_tool.prof"))) == 1
+    report = next(profile_dir.glob("*-slow_tool.txt")).read_text()
+    assert "tool: slow_tool" in report
+    assert "_work" in report
+    assert "tracemalloc: top allocation sites" in report
+
+def test_sampling_by_tool_and_rate(profile_dir, monkeypatch):
+    """Test that only selected tools are profiled, at the configured rate."""
+    assert profiling.should_profile("slow_tool")
+    assert not profiling.should_profile("other_tool")
+    
+    monkeypatch.setattr(profiling, "PROFILE_RATE", 0.0)
+    assert not profiling.should_profile("slow_tool")
+    
+    monkeypatch.setattr(profiling, "PROFILE_DIR", None)
+    monkeypatch.setattr(profiling, "PROFILE_RATE", 1.0)
+    assert not profiling.should_profile("slow_tool")
+
+def test_errors_propagate_and_are_reported(profile_dir):
+    """Test that a failing call still raises and records the error in its report."""
+    def fail():
+        raise ValueError("boom")
+    
+    with pytest.raises(ValueError):
+        profiling.profile_call("slow_tool", fail)
+    assert "raised: ValueError('boom')" in next(profile_dir.glob("*.txt")).read_text()
+
+def test_refreshes_and_page_parses_are_profiled(tmp_path, monkeypatch):
+    """Test that refreshes and Madden page parses, including in worker processes, write reports."""
+    for name in ("PROFILE_DIR", "PROFILE_RATE", "PROFILE_TOOLS", "PROFILE_MEMORY"):
+        monkeypatch.setattr(profiling, name, getattr(profiling, name))
+    profiling.configure(str(tmp_path))
+
+    assert refresh.refresh_once("test_source", lambda: _work(1000)) == 1000
+    assert "_work" in next(tmp_path.glob("*-refresh_test_source.txt")).read_text()
+
+    html = '<table><tr class="Table_row__eoyUr"><td><span class="Table_profileLabel__tuyG0">A</span></td></tr></table>'
+    pool = madden_ratings._start_parse_pool(1)
+    try:
+        asyncio.run(madden_ratings._parse_in_pool(pool, html))
+    finally:
+        pool.shutdown()
+    report = next(tmp_path.glob("*-parse_madden_ratings.txt")).read_text()
+    assert "_parse_madden_ratings_html" in report
@@ -0,0 +1,98 @@
+import threading
+import time
+import pytest
+from app.cache import refresh
+from app.cache.locks import FileLock
+from app.cache.refresh import SingleFlight
+
+def _run_concurrently(n, target):
+    results = [None] * n
+    def worker(i):
+        try:
+            results[i] = target()
+        except Exception as e:
+            results[i] = e
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results
+
+def test_single_flight_coalesces_concurrent_calls():
+    """Test that concurrent callers share one execution and its result."""
+    flights = SingleFlight()
+    calls = []
+    def slow_fetch():
+        calls.append(1)
+        time.sleep(0.2)
+        return ["fresh"]
+    
+    results = _run_concurrently(5, lambda: flights.do("madden_ratings", slow_fetch))
+    
+    assert len(calls) == 1
+    assert all(r == ["fresh"] for r in results)
+    assert not flights.in_flight("madden_ratings")
+
+def test_single_flight_propagates_errors_to_all_waiters():
+    """Test that a failed refresh raises in every waiting caller."""
+    flights = SingleFlight()
+    calls = []
+    def failing_fetch():
+        calls.append(1)
+        time.sleep(0.2)
+        raise RuntimeError("scrape failed")
+    
+    results = _run_concurrently(4, lambda: flights.do("ol_rankings", failing_fetch))
+    
+    assert len(calls) == 1
+    assert all(isinstance(r, RuntimeError) for r in results)
+    
+    # A later call starts a new flight
+    assert flights.do("ol_rankings", lambda: "recovered") == "recovered"
+
+def test_file_lock_is_exclusive(tmp_path):
+    """Test that a second holder of the same lock file waits or times out."""
+    path = str(tmp_path / "source.lock")
+    holder = FileLock(path)
+    assert holder.acquire()
+    
+    contender = FileLock(path)
+    assert contender.acquire(timeout=0.2) is False
+    
+    holder.release()
+    assert contender.acquire(timeout=1)
+    contender.release()
+
+def test_refresh_holds_cross_process_lock(tmp_path):
+    """Test that a refresh runs while holding its source's lock file."""
+    observed = []
+    def fetch():
+        observed.append(refresh.refresh_lock("madden_ratings").acquire(timeout=0))
+        return ["fresh"]
+    
+    assert refresh.refresh_once("madden_ratings", fetch) == ["fresh"]
+    assert observed == [False]
+    # Released once the refresh is done
+    lock = refresh.refresh_lock("madden_ratings")
+    assert lock.acquire(timeout=0)
+    lock.release()
+
+def test_waiting_process_reads_published_result(tmp_path):
+    """Test that a refresh blocked on another holder uses the result it published."""
+    published = []
+    def fetch():
+        # Mirrors the resources' refreshes: re-check the cache before scraping
+        if published:
+            return published[0]
+        return ["scraped"]
+    
+    other_process = refresh.refresh_lock("nfl_injuries")
+    other_process.acquire()
+    def finish_other_refresh():
+        time.sleep(0.2)
+        published.append(["published"])
+        other_process.release()
+    threading.Thread(target=finish_other_refresh).start()
+    
+    assert refresh.refresh_once("nfl_injuries", fetch) == ["published"]
@@ -1,17 +1,24 @@
+import time
 import pytest
 from unittest.mock import patch
+from app.cache.cache import CacheEntry
+from app.cache import refresh
+from app import metrics
+from app import server
+from fastmcp import Client
 from app.resources import nfl_injuries_resource
 
 def test_get_all_injuries_cache_hit(monkeypatch):
-    monkeypatch.setattr(nfl_injuries_resource, "get_injuries_cache", lambda: ["cached"])
-    monkeypatch.setattr(nfl_injuries_resource, "fetch_nfl_injuries", lambda: ["fresh"])
+    monkeypatch.setattr(nfl_injuries_resource, "get_injuries_cache_entry", lambda: CacheEntry(["cached"], time.time()))
+    monkeypatch.setattr(nfl_injuries_resource, "fetch_nfl_injuries", lambda conditional=False: ["fresh"])
     monkeypatch.setattr(nfl_injuries_resource, "set_injuries_cache", lambda x: None)
     result = nfl_injuries_resource.get_all_injuries()
     assert result == ["cached"]
 
 def test_get_all_injuries_cache_miss(monkeypatch):
-    monkeypatch.setattr(nfl_injuries_resource, "get_injuries_cache", lambda: None)
-    monkeypatch.setattr(nfl_injuries_resource, "fetch_nfl_injuries", lambda: ["fresh"])
+    monkeypatch.setattr(nfl_injuries_resource, "get_injuries_cache_entry", lambda: None)
+    monkeypatch.setattr(nfl_injuries_resource, "get_injuries_cache", lambda max_age=None: None)
+    monkeypatch.setattr(nfl_injuries_resource, "fetch_nfl_injuries", lambda conditional=False: ["fresh"])
     called = {}
     def fake_set_cache(x):
         called["set_cache"] = x
@@ -19,3 +26,161 @@ def test_get_all_injuries_cache_miss(monkeypatch):
     result = nfl_injuries_resource.get_all_injuries()
     assert result == ["fresh"]
     assert called["set_cache"] == ["fresh"]
+
+def test_get_all_injuries_serves_stale_and_refreshes_in_background(monkeypatch):
+    stale_age = nfl_injuries_resource.INJURIES_CACHE_TTL + 60
+    monkeypatch.setattr(nfl_injuries_resource, "get_injuries_cache_entry", lambda: CacheEntry(["stale"], time.time() - stale_age))
+    monkeypatch.setattr(nfl_injuries_resource, "get_injuries_cache", lambda max_age=None: None)
+    monkeypatch.setattr(nfl_injuries_resource, "fetch_nfl_injuries", lambda conditional=False: ["fresh"])
+    called = {}
+    def fake_set_cache(x):
+        called["set_cache"] = x
+    monkeypatch.setattr(nfl_injuries_resource, "set_injuries_cache", fake_set_cache)
+    
+    result = nfl_injuries_resource.get_all_injuries()
+    assert result == ["stale"]
+    
+    # Wait for the background refresh to publish
+    for _ in range(50):
+        if not refresh._refresh_flights.in_flight("nfl_injuries"):
+            break
+        time.sleep(0.05)
+    assert called["set_cache"] == ["fresh"]
+
+def test_get_all_injuries_blocks_past_max_staleness(monkeypatch):
+    too_old = nfl_injuries_resource.INJURIES_CACHE_MAX_STALENESS + 60
+    monkeypatch.setattr(nfl_injuries_resource, "get_injuries_cache_entry", lambda: CacheEntry(["ancient"], time.time() - too_old))
+    monkeypatch.setattr(nfl_injuries_resource, "get_injuries_cache", lambda max_age=None: None)
+    monkeypatch.setattr(nfl_injuries_resource, "fetch_nfl_injuries", lambda conditional=False: ["fresh"])
+    monkeypatch.setattr(nfl_injuries_resource, "set_injuries_cache", lambda x: None)
+    assert nfl_injuries_resource.get_all_injuries() == ["fresh"]
+
+def test_refresh_injuries_not_modified_extends_cache(monkeypatch):
+    stale_entry = CacheEntry(["cached"], time.time() - nfl_injuries_resource.INJURIES_CACHE_MAX_STALENESS - 60)
+    monkeypatch.setattr(nfl_injuries_resource, "get_injuries_cache_entry", lambda: stale_entry)
+    monkeypatch.setattr(nfl_injuries_resource, "get_injuries_cache", lambda max_age=None: None)
+    conditional_calls = []
+    def fake_fetch(conditional=False):
+        conditional_calls.append(conditional)
+        return None
+    monkeypatch.setattr(nfl_injuries_resource, "fetch_nfl_injuries", fake_fetch)
+    touched = []
+    monkeypatch.setattr(nfl_injuries_resource, "touch_injuries_cache", lambda: touched.append(True))
+    monkeypatch.setattr(nfl_injuries_resource, "set_injuries_cache", lambda x: pytest.fail("cache rewritten"))
+    
+    assert nfl_injuries_resource.get_all_injuries() == ["cached"]
+    assert conditional_calls == [True]
+    assert touched == [True]
+
+def _team(team, *injuries):
+    return {"team": team, "injuries": [dict(zip(("player", "position", "status"), injury)) for injury in injuries]}
+
+def test_injury_changes_are_logged_per_team(cache_store, monkeypatch):
+    """Test that refreshes rewrite only changed teams and log player-level changes by version."""
+    scrapes = iter([
+        [_team("Chiefs", ("A", "WR", "Out")), _team("Bills", ("B", "QB", "Questionable"))],
+        [_team("Chiefs", ("A", "WR", "Questionable"), ("C", "TE", "Out")), _team("Bills", ("B", "QB", "Questionable"))],
+        [_team("Chiefs", ("C", "TE", "Out")), _team("Bills", ("B", "QB", "Questionable"))],
+    ])
+    monkeypatch.setattr(nfl_injuries_resource, "fetch_nfl_injuries", lambda conditional=False: next(scrapes))
+    written = []
+    monkeypatch.setattr(metrics, "increment", lambda name, value=1, **labels: written.append((name, value)))
+
+    nfl_injuries_resource._refresh_injuries(max_age=0)
+    baseline = nfl_injuries_resource.query_injury_changes()
+    assert baseline["full"] and len(baseline["changes"]) == 2
+
+    nfl_injuries_resource._refresh_injuries(max_age=0)
+    # Only the Chiefs' record was rewritten
+    assert ("records_written_total", 1) in written
+    first = nfl_injuries_resource.query_injury_changes(since=baseline["version"])
+    assert not first["full"] and first["version"] == baseline["version"] + 1
+    assert first["changes"] == [
+        {"change": "changed", "team": "Chiefs", "player": "A", "position": "WR", "status": "Questionable",
+         "previous": {"status": "Out"}, "version": first["version"]},
+        {"change": "added", "team": "Chiefs", "player": "C", "position": "TE", "status": "Out", "version": first["version"]},
+    ]
+
+    nfl_injuries_resource._refresh_injuries(max_age=0)
+    second = nfl_injuries_resource.query_injury_changes(since=first["version"])
+    assert [(c["change"], c["player"]) for c in second["changes"]] == [("removed", "A")]
+    # Asking from the baseline returns both refreshes' changes, oldest first
+    assert len(nfl_injuries_resource.query_injury_changes(since=baseline["version"])["changes"]) == 3
+    assert nfl_injuries_resource.query_injury_changes(since=second["version"])["changes"] == []
+
+def test_injury_changes_refresh_during_full_read_is_not_lost(cache_store, monkeypatch):
+    """Test that a refresh landing while the full list is read is delivered on the next call."""
+    scrapes = iter([[_team("Chiefs", ("A", "WR", "Out"))], [_team("Chiefs", ("A", "WR", "Questionable"))]])
+    monkeypatch.setattr(nfl_injuries_resource, "fetch_nfl_injuries", lambda conditional=False: next(scrapes))
+    nfl_injuries_resource._refresh_injuries(max_age=0)
+    old_injuries = nfl_injuries_resource.get_all_injuries()
+
+    def refresh_lands_during_read():
+        # A background refresh publishes after the old list was read
+        monkeypatch.setattr(nfl_injuries_resource, "get_all_injuries", lambda: None)
+        nfl_injuries_resource._refresh_injuries(max_age=0)
+        return old_injuries
+    monkeypatch.setattr(nfl_injuries_resource, "get_all_injuries", refresh_lands_during_read)
+    full = nfl_injuries_resource.query_injury_changes()
+    assert full["full"] and full["changes"][0]["status"] == "Out"
+
+    update = nfl_injuries_resource.query_injury_changes(since=full["version"])
+    assert [(c["change"], c["status"]) for c in update["changes"]] == [("changed", "Questionable")]
+
+def test_injury_changes_past_history_return_everything(cache_store, monkeypatch):
+    """Test that a version older than the kept history gets the full injury list."""
+    monkeypatch.setattr(nfl_injuries_resource, "INJURY_CHANGE_HISTORY", 1)
+    statuses = iter(["Out", "Questionable", "Doubtful"])
+    monkeypatch.setattr(
+        nfl_injuries_resource, "fetch_nfl_injuries", lambda conditional=False: [_team("Chiefs", ("A", "WR", next(statuses)))]
+    )
+    for _ in range(3):
+        nfl_injuries_resource._refresh_injuries(max_age=0)
+
+    result = nfl_injuries_resource.query_injury_changes(since=1)
+    assert result["full"] and result["version"] == 3
+    assert result["changes"] == [{"change": "added", "team": "Chiefs", "player": "A", "position": "WR", "status": "Doubtful"}]
+    assert not nfl_injuries_resource.query_injury_changes(since=2)["full"]
+
+INJURIES = [
+    {"team": "Kansas City Chiefs", "injuries": [
+        {"player": "Xavier Worthy", "position": "WR", "status": "Questionable", "status_update": "Long update..."},
+        {"player": "Isiah Pacheco", "position": "RB", "status": "Injured Reserve", "status_update": "Long update..."},
+    ]},
+    {"team": "Buffalo Bills", "injuries": [
+        {"player": "Keon Coleman", "position": "WR", "status": "Questionable", "status_update": "Long update..."},
+    ]},
+]
+
+def test_injury_indexes(monkeypatch):
+    """Test team, status, position and player lookups on the indexed injuries."""
+    monkeypatch.setattr(nfl_injuries_resource, "get_all_injuries", lambda: INJURIES)
+
+    chiefs = nfl_injuries_resource.get_injuries_by_team("Kansas City Chiefs")
+    assert [i["player"] for i in chiefs] == ["Xavier Worthy", "Isiah Pacheco"]
+    assert nfl_injuries_resource.get_injuries_by_team(" chiefs ") == chiefs
+    assert "status_update" not in chiefs[0]
+    assert nfl_injuries_resource.get_injuries_by_team("Chiefs", details=True)[0]["status_update"] == "Long update..."
+
+    questionable_wrs = nfl_injuries_resource.get_injuries_by_status("questionable", position="wr")
+    assert [(i["team"], i["player"]) for i in questionable_wrs] == [("Kansas City Chiefs", "Xavier Worthy"), ("Buffalo Bills", "Keon Coleman")]
+    assert [i["player"] for i in nfl_injuries_resource.get_injuries_by_status("IR")] == ["Isiah Pacheco"]
+    assert nfl_injuries_resource.get_injuries_by_status("Out") == []
+
+    result = nfl_injuries_resource.get_injury_status_for_players(["keon coleman", "Patrick Mahomes"])
+    assert [i["player"] for i in result["injuries"]] == ["Keon Coleman"]
+    assert result["not_listed"] == ["Patrick Mahomes"]
+
+    # Indexes are reused until the injuries change
+    snapshot = nfl_injuries_resource.get_injuries_snapshot()
+    assert nfl_injuries_resource.get_injuries_snapshot() is snapshot
+
+@pytest.mark.asyncio
+async def test_injury_query_tools(monkeypatch):
+    """Test that the indexed injury tools are served over MCP."""
+    monkeypatch.setattr(nfl_injuries_resource, "get_all_injuries", lambda: INJURIES)
+    async with Client(server.mcp) as client:
+        by_status = await client.call_tool("get_injuries_by_status", {"status": "Questionable", "position": "WR"})
+        players = await client.call_tool("get_injury_status_for_players", {"players": ["Xavier Worthy"]})
+    assert len(by_status.structured_content["result"]) == 2
+    assert players.data["injuries"][0]["status"] == "Questionable"
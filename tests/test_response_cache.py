@@ -0,0 +1,105 @@
+import threading
+import time
+import pytest
+from fastmcp import Client
+from app import server
+from app.cache import refresh, response_cache
+from app.cache.cache import OL_RANKINGS_NAMESPACE, RATINGS_NAMESPACE
+from app.resources import player_ratings_resource
+
+RANKINGS = [{"rank": 1, "team": "Philadelphia Eagles"}, {"rank": 2, "team": "Detroit Lions"}]
+
+@pytest.fixture
+def ol_tool(cache_store, monkeypatch):
+    """Serve OL rankings from the store, counting how often the tool body runs."""
+    calls = []
+    def get_all_ol_rankings():
+        calls.append(1)
+        return cache_store.get_entry(OL_RANKINGS_NAMESPACE).data
+    monkeypatch.setattr(server, "get_all_ol_rankings", get_all_ol_rankings)
+    return calls
+
+def test_lru_eviction_by_size():
+    """Test that the least recently used responses are evicted past the byte cap."""
+    cache = response_cache.ResponseCache(max_bytes=100)
+    cache.put(("s", "a"), "A", 40)
+    cache.put(("s", "b"), "B", 40)
+    assert cache.get(("s", "a")) == "A"
+    cache.put(("s", "c"), "C", 40)
+
+    assert cache.get(("s", "b")) is None
+    assert cache.get(("s", "a")) == "A" and cache.get(("s", "c")) == "C"
+    assert cache.info()["bytes"] == 80
+    # A response larger than the whole cache is never stored
+    assert not cache.put(("s", "d"), "D", 101)
+    assert cache.invalidate("s") == 2 and cache.info()["entries"] == 0
+
+def test_normalize_arguments():
+    """Test that argument order and explicit None values do not split cache keys."""
+    assert response_cache.normalize_arguments({"b": 1, "a": None, "c": "x"}) == response_cache.normalize_arguments({"c": "x", "b": 1})
+
+@pytest.mark.asyncio
+async def test_repeated_calls_hit_until_refresh(cache_store, ol_tool):
+    """Test that identical calls are served from the cache until the source refreshes."""
+    cache_store.set_records(OL_RANKINGS_NAMESPACE, RANKINGS, ttl=3600, position_field=None)
+    async with Client(server.mcp) as client:
+        first = await client.call_tool("get_ol_rankings")
+        second = await client.call_tool("get_ol_rankings")
+        assert len(ol_tool) == 1
+        assert second.structured_content == first.structured_content
+
+        # Other arguments are other responses
+        await client.call_tool("get_ol_rankings", {"format": "columnar"})
+        assert len(ol_tool) == 2
+
+        updated = RANKINGS + [{"rank": 3, "team": "Denver Broncos"}]
+        refresh.refresh_once(
+            OL_RANKINGS_NAMESPACE,
+            lambda: cache_store.set_records(OL_RANKINGS_NAMESPACE, updated, ttl=3600, position_field=None),
+        )
+        third = await client.call_tool("get_ol_rankings")
+        assert len(ol_tool) == 3
+        assert third.structured_content["result"] == updated
+
+@pytest.mark.asyncio
+async def test_expired_data_bypasses_cache(cache_store, ol_tool):
+    """Test that responses are not cached while the source's data is expired."""
+    cache_store.set_records(OL_RANKINGS_NAMESPACE, RANKINGS, ttl=0, position_field=None)
+    async with Client(server.mcp) as client:
+        await client.call_tool("get_ol_rankings")
+        await client.call_tool("get_ol_rankings")
+    assert len(ol_tool) == 2
+    assert response_cache.get_response_cache().info()["entries"] == 0
+
+@pytest.mark.asyncio
+async def test_expired_ratings_schedule_a_refresh(cache_store, monkeypatch):
+    """Test that a ratings tool call on expired Madden data starts a background refresh."""
+    madden = [{"name": "Patrick Mahomes", "position": "QB", "team": "Kansas City Chiefs", "overall": 95, "source": "Madden NFL"}]
+    cache_store.set_records(RATINGS_NAMESPACE, madden, ttl=player_ratings_resource.CACHE_TTL_HOURS * 3600)
+    monkeypatch.setattr(player_ratings_resource, "_combined", None)
+    async with Client(server.mcp) as client:
+        # Combine once while fresh, so the memo holds this data version
+        await client.call_tool("get_player_ratings", {"limit": 1})
+        expired = time.time() - player_ratings_resource.CACHE_TTL_HOURS * 3600 - 60
+        with cache_store._connect() as conn:
+            conn.execute("UPDATE entries SET timestamp = ? WHERE namespace = ?", (expired, RATINGS_NAMESPACE))
+        response_cache.invalidate()
+
+        scheduled = []
+        monkeypatch.setattr(refresh, "refresh_in_background", lambda source, fn: scheduled.append(source) or True)
+        result = await client.call_tool("get_player_ratings", {"limit": 1})
+    assert scheduled == [RATINGS_NAMESPACE]
+    assert len(result.structured_content["result"]["players"]) == 1
+
+@pytest.mark.asyncio
+async def test_version_reads_run_off_the_event_loop(cache_store, ol_tool, monkeypatch):
+    """Test that cached tool calls read data versions on a worker thread, not the event loop."""
+    cache_store.set_records(OL_RANKINGS_NAMESPACE, RANKINGS, ttl=3600, position_field=None)
+    threads = []
+    def version():
+        threads.append(threading.current_thread())
+        return "v1"
+    monkeypatch.setitem(response_cache._version_functions, OL_RANKINGS_NAMESPACE, version)
+    async with Client(server.mcp) as client:
+        await client.call_tool("get_ol_rankings")
+    assert threads and threading.current_thread() not in threads
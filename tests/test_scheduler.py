@@ -0,0 +1,135 @@
+import threading
+import time
+from app.cache.cache import CacheEntry
+from app.scheduler import RefreshScheduler, ScheduledSource
+
+class FakeSource:
+    """A cached source whose refreshes re-check the cache like the real ones."""
+
+    def __init__(self, name, ttl, age=None, fail=False):
+        self.name = name
+        self.ttl = ttl
+        self.entry = None if age is None else CacheEntry(["cached"], time.time() - age)
+        self.fail = fail
+        self.refreshes = []
+        self.scrapes = 0
+        self.warmed = threading.Event()
+        self.refreshed = threading.Event()
+
+    def get_entry(self):
+        return self.entry
+
+    def refresh(self, max_age=None):
+        self.refreshes.append(max_age)
+        try:
+            if self.entry is not None and self.entry.age <= max_age:
+                return self.entry.data
+            if self.fail:
+                raise RuntimeError("scrape failed")
+            self.scrapes += 1
+            self.entry = CacheEntry(["fresh"], time.time())
+            return self.entry.data
+        finally:
+            self.refreshed.set()
+
+    def as_scheduled(self):
+        return ScheduledSource(self.name, self.ttl, self.get_entry, self.refresh, self.warmed.set)
+
+def make_scheduler(sources, **kwargs):
+    options = dict(jitter=0, prewarm_jitter=0, retry_delay=60, poll_interval=0.05)
+    options.update(kwargs)
+    return RefreshScheduler([s.as_scheduled() for s in sources], **options)
+
+def test_prewarms_cold_sources_at_startup():
+    """Test that sources with nothing cached are refreshed right away."""
+    cold = FakeSource("cold_source", ttl=3600)
+    scheduler = make_scheduler([cold])
+    scheduler.start()
+    try:
+        assert cold.refreshed.wait(2)
+        assert cold.warmed.wait(2)
+    finally:
+        scheduler.stop(timeout=2)
+    assert cold.scrapes == 1
+
+def test_fresh_sources_are_warmed_not_refreshed():
+    """Test that a fresh source only has its derived state built at startup."""
+    fresh = FakeSource("fresh_source", ttl=3600, age=10)
+    scheduler = make_scheduler([fresh])
+    scheduler.start()
+    try:
+        assert fresh.warmed.wait(2)
+        time.sleep(0.2)
+    finally:
+        scheduler.stop(timeout=2)
+    assert fresh.refreshes == []
+
+def test_refreshes_ahead_of_ttl():
+    """Test that an entry past the refresh-ahead age is refreshed before it expires."""
+    aging = FakeSource("aging_source", ttl=100, age=85)
+    scheduler = make_scheduler([aging], refresh_ahead=0.8)
+    scheduler.start()
+    try:
+        assert aging.refreshed.wait(2)
+    finally:
+        scheduler.stop(timeout=2)
+    assert aging.scrapes == 1
+    assert aging.refreshes[0] == 80
+
+def test_jitter_scaled_to_short_ttl():
+    """Test that the refresh head start never exceeds a tenth of a short TTL."""
+    # A game-week TTL of 10 minutes against the default 30 minute jitter
+    fresh = FakeSource("short_ttl_source", ttl=600, age=60)
+    scheduler = make_scheduler([fresh], jitter=1800, refresh_ahead=0.8)
+    source = fresh.as_scheduled()
+    for _ in range(20):
+        scheduler._head_start.clear()
+        assert 360 <= scheduler._due_in(source) <= 420
+
+    # Once due, cached data younger than the capped head start is not kept
+    aging = FakeSource("short_ttl_aging_source", ttl=600, age=500)
+    scheduler = make_scheduler([aging], jitter=1800, refresh_ahead=0.8)
+    scheduler.start()
+    try:
+        assert aging.refreshed.wait(2)
+    finally:
+        scheduler.stop(timeout=2)
+    assert aging.refreshes[0] == 420
+    assert aging.scrapes == 1
+
+def test_failed_refresh_is_retried_later():
+    """Test that a failing source is not retried before the retry delay."""
+    failing = FakeSource("failing_source", ttl=3600, fail=True)
+    scheduler = make_scheduler([failing], retry_delay=60)
+    scheduler.start()
+    try:
+        assert failing.refreshed.wait(2)
+        time.sleep(0.3)
+    finally:
+        scheduler.stop(timeout=2)
+    assert len(failing.refreshes) == 1
+
+def test_concurrency_limit():
+    """Test that no more than the configured number of refreshes run at once."""
+    running = []
+    peak = []
+    lock = threading.Lock()
+    class SlowSource(FakeSource):
+        def refresh(self, max_age=None):
+            with lock:
+                running.append(1)
+                peak.append(len(running))
+            time.sleep(0.2)
+            with lock:
+                running.pop()
+            return super().refresh(max_age)
+
+    sources = [SlowSource(f"source_{i}", ttl=3600) for i in range(4)]
+    scheduler = make_scheduler(sources, concurrency=2)
+    scheduler.start()
+    try:
+        for source in sources:
+            assert source.refreshed.wait(3)
+    finally:
+        scheduler.stop(timeout=2)
+    assert max(peak) == 2
@@ -1,10 +1,14 @@
+import httpx
 import pytest
 from unittest.mock import patch
+from app.cache.cache import OL_RANKINGS_NAMESPACE
+from app.resources import ol_rankings_resource
 from app.scraper.nfl_injuries import fetch_nfl_injuries
+from app.scraper.pff_ol_rankings import OLRankingsError, fetch_pff_ol_rankings
 
 MOCK_HTML = '''<div class="Table__Title">Team A</div><div class="Table__Scroller"><table><tbody><tr><td>Player 1</td><td>QB</td><td>Knee</td><td>Out</td><td>2024-06-01</td></tr></tbody></table></div>'''
 
-@patch("httpx.get")
+@patch("app.scraper.nfl_injuries.http_get_if_modified")
 def test_fetch_nfl_injuries(mock_get):
     mock_get.return_value.status_code = 200
     mock_get.return_value.text = MOCK_HTML
@@ -12,3 +16,19 @@ def test_fetch_nfl_injuries(mock_get):
     assert isinstance(injuries, list)
     assert injuries[0]["team"] == "Team A"
     assert injuries[0]["injuries"][0]["player"] == "Player 1"
+
+def test_fetch_pff_ol_rankings_failures_raise(mock_http, cache_store):
+    """A failed or empty OL scrape raises instead of replacing the cached rankings."""
+    mock_http(lambda request: httpx.Response(200, text="<html><body>Redesigned page</body></html>"))
+    with pytest.raises(OLRankingsError):
+        fetch_pff_ol_rankings()
+
+    mock_http(lambda request: httpx.Response(503, text="unavailable"))
+    with pytest.raises(OLRankingsError):
+        fetch_pff_ol_rankings()
+
+    cached = [{"rank": 1, "team": "Philadelphia Eagles"}]
+    cache_store.set_records(OL_RANKINGS_NAMESPACE, cached, ttl=0, position_field=None)
+    with pytest.raises(OLRankingsError):
+        ol_rankings_resource._refresh_ol_rankings(max_age=0)
+    assert cache_store.get_entry(OL_RANKINGS_NAMESPACE).data == cached
@@ -0,0 +1,113 @@
+import sqlite3
+import time
+from app.cache import store as store_module
+from app.cache.store import CacheStore
+
+def make_store(tmp_path):
+    return CacheStore(str(tmp_path / "store.sqlite3"))
+
+def test_entry_round_trip_and_ttl(tmp_path):
+    """Test storing a document and reading it back within and past its TTL."""
+    store = make_store(tmp_path)
+    store.set_entry("docs", {"a": 1}, ttl=60)
+    
+    assert store.get_entry("docs").data == {"a": 1}
+    assert store.get_fresh("docs") == {"a": 1}
+    assert store.get_fresh("docs", ttl=-1) is None
+    assert store.get_entry("missing") is None
+
+def test_records_subset_reads(tmp_path):
+    """Test that record lists can be read back filtered by team and position."""
+    store = make_store(tmp_path)
+    players = [
+        {"name": "A", "team": "Chiefs", "position": "QB"},
+        {"name": "B", "team": "Chiefs", "position": "wr"},
+        {"name": "C", "team": "Bills", "position": "QB"},
+    ]
+    store.set_records("ratings", players)
+    
+    assert store.get_entry("ratings").data == players
+    assert [p["name"] for p in store.get_records("ratings", team="chiefs")] == ["A", "B"]
+    assert [p["name"] for p in store.get_records("ratings", position="WR")] == ["B"]
+    assert [p["name"] for p in store.get_records("ratings", team="Bills", position="qb")] == ["C"]
+
+def test_entries_shared_across_store_instances(tmp_path):
+    """Test that a write is visible to another connection and decoded by hash."""
+    writer = make_store(tmp_path)
+    reader = make_store(tmp_path)
+    writer.set_records("ratings", [{"name": "A"}])
+    first = reader.get_entry("ratings")
+    assert first.data == [{"name": "A"}]
+    
+    # Same content hash: the decoded entry is reused
+    assert reader.get_entry("ratings").data is first.data
+    
+    writer.set_records("ratings", [{"name": "B"}])
+    assert reader.get_entry("ratings").data == [{"name": "B"}]
+
+def test_entry_read_is_one_snapshot(tmp_path):
+    """Test that a write landing between the meta and payload reads isn't mixed in."""
+    writer = make_store(tmp_path)
+    reader = make_store(tmp_path)
+    writer.set_records("ratings", [{"name": "A"}])
+    conn = reader._connect()
+    def write_mid_read(statement):
+        if statement.startswith("SELECT payload FROM records"):
+            conn.set_trace_callback(None)
+            writer.set_records("ratings", [{"name": "B"}])
+    conn.set_trace_callback(write_mid_read)
+    
+    first = reader.get_entry("ratings")
+    assert first.data == [{"name": "A"}]
+    reader.clear_memory()
+    assert reader.get_entry("ratings").data == [{"name": "B"}]
+
+def test_unchanged_records_only_restamp(tmp_path):
+    """Test that rewriting identical records keeps the hash and moves the timestamp."""
+    store = make_store(tmp_path)
+    store.set_records("ratings", [{"name": "A"}])
+    before = store.get_meta("ratings")
+    time.sleep(0.01)
+    store.set_records("ratings", [{"name": "A"}])
+    after = store.get_meta("ratings")
+    
+    assert after.content_hash == before.content_hash
+    assert after.timestamp > before.timestamp
+
+def test_changed_records_only_are_rewritten(tmp_path):
+    """Test that only records whose hash changed are written, tracked per team."""
+    store = make_store(tmp_path)
+    teams = [{"team": "Chiefs", "injuries": []}, {"team": "Bills", "injuries": []}, {"team": "Jets", "injuries": []}]
+    store.set_records("injuries", teams, position_field=None)
+    before = store.get_record_hashes("injuries")
+    
+    updated = [teams[0], {"team": "Bills", "injuries": [{"player": "X"}]}]
+    store.set_records("injuries", updated, position_field=None)
+    after = store.get_record_hashes("injuries")
+    
+    assert after == {"chiefs": before["chiefs"], "bills": store_module.record_hash(updated[1])}
+    assert store.get_records("injuries") == updated
+
+def test_records_table_migration(tmp_path):
+    """Test that a database without per-record hashes gains the column."""
+    path = str(tmp_path / "old.sqlite3")
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE records (namespace TEXT NOT NULL, key TEXT NOT NULL, idx INTEGER NOT NULL, "
+        "team TEXT, position TEXT, payload TEXT NOT NULL, PRIMARY KEY (namespace, key, idx))"
+    )
+    conn.close()
+    
+    store = CacheStore(path)
+    store.set_records("ratings", [{"name": "A", "team": "Chiefs"}])
+    assert store.get_record_hashes("ratings") == {"chiefs": store_module.record_hash({"name": "A", "team": "Chiefs"})}
+
+def test_touch_and_delete(tmp_path):
+    """Test restamping and removing an entry."""
+    store = make_store(tmp_path)
+    assert store.touch("docs") is False
+    store.set_entry("docs", [1, 2])
+    assert store.touch("docs") is True
+    
+    store.delete("docs")
+    assert store.get_entry("docs") is None